@@ -41,6 +41,8 @@ def _cmdlinehelp():
     print()
     print("Run rivtcalc at the command line in the 'calc' folder with:")
     print("     python  -m rivtcalc cddss_calcfilename.py")
+    print("or build every calc in the project with:")
+    print("     python  -m rivtcalc batch [project folder] [-j workers]")
     print("where cddcc_ calcname.py is the calc file in the folder")
     print("and **ddss** is the calc number")
     print()
@@ -55,6 +57,10 @@ def _cmdlinehelp():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from rivtcalc.rv_batch import main
+
+        sys.exit(main(sys.argv[2:]))
     try:
         _calcfileS = sys.argv[1]  # calc file argument
         _cwdS = os.getcwd()  # get calc folder
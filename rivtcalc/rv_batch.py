@@ -0,0 +1,257 @@
+#! python
+"""builds every calc in a project
+
+The batch command finds the cddss_*.py calc files in the project calcs
+folder and runs them in a process pool. Each calc runs as it would from
+the command line: the calc state is reset, the calc numbers are derived
+from the file name and D() writes the docs to the same folders as a single
+run. Per-calc run time and failures are summarized in a table. A calc
+that kills its worker process is reported as failed and the other calcs
+are run again in a fresh pool.
+
+PDF docs are not compiled in the calc workers. Each worker queues its tex
+file and, when all calcs have run, the queue is compiled with one LaTeX job
+per CPU (rv_pipe.compile_pdfs) and the compile times are listed.
+
+    python -m rivtcalc batch [project folder] [-j workers]
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import runpy
+import argparse
+import traceback
+import contextlib
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import rivtcalc.rv_pipe as _rv_pipe
+
+_calcrgx = re.compile(r"^c\d{4}_.+\.py$")  # calc file name
+
+
+def find_project(startP: Path) -> Path:
+    """return project folder containing startP
+
+    The project folder is the first folder, from startP up, that contains
+    a calcs folder.
+
+    Args:
+        startP (Path): folder in the project
+
+    Returns:
+        Path: project folder, startP if there is no calcs folder
+    """
+    startP = Path(startP).resolve()
+    for dirP in [startP] + list(startP.parents):
+        if Path(dirP, "calcs").is_dir():
+            return dirP
+
+    return startP
+
+
+def find_calcs(projP: Path) -> list:
+    """return calc files in the project calcs folder
+
+    Calc files are in calc subfolders (calcs/cddss_name/cddss_name.py) and
+    have names of the form cddss_name.py. The scripts folder is skipped.
+
+    Args:
+        projP (Path): project folder
+
+    Returns:
+        list: calc file paths sorted by calc number
+    """
+    calcsP = Path(projP, "calcs")
+    calcL = []
+    for dirP in sorted(calcsP.iterdir()):
+        if not dirP.is_dir() or dirP.name == "scripts":
+            continue
+        for fileP in sorted(dirP.iterdir()):
+            if _calcrgx.match(fileP.name) and fileP.is_file():
+                calcL.append(fileP)
+
+    return sorted(calcL, key=lambda iP: iP.name)
+
+
+def run_calc(calcS: str) -> tuple:
+    """run one calc file in this process
+
+    Args:
+        calcS (str): calc file path
+
+    Returns:
+        tuple: (calc name, status, seconds, message, queued pdf jobs)
+    """
+    import rivtcalc.rv_calc as _rv_calc
+    import rivtcalc.rv_eval as _rv_eval
+    import rivtcalc.rv_sym as _rv_sym
+
+    calcP = Path(calcS)
+    t1F = time.perf_counter()
+    _rv_calc._reset_calc(calcP)
+    argvL = sys.argv
+    sys.argv = [str(calcP)]
+    outO = io.StringIO()
+    statusS, msgS = "ok", ""
+    _rv_pipe.defer_pdf()
+    try:
+        os.chdir(calcP.parent)
+        with contextlib.redirect_stdout(outO), contextlib.redirect_stderr(outO):
+            runpy.run_path(str(calcP), run_name="__main__")
+    except SystemExit as exitO:
+        if exitO.code not in (None, 0):
+            statusS, msgS = "failed", "exit " + str(exitO.code)
+    except Exception:
+        statusS = "failed"
+        msgS = traceback.format_exc().strip().split("\n")[-1]
+    finally:
+        sys.argv = argvL
+        _rv_eval.save_cache()
+        _rv_calc.rivtcalcD.deps.save()
+        _rv_sym.save_cache()
+        jobL = _rv_pipe.queued_pdfs()
+        _rv_pipe.defer_pdf(False)
+    if statusS == "ok" and "restored from build cache" in outO.getvalue():
+        statusS = "cached"
+
+    return calcP.stem, statusS, time.perf_counter() - t1F, msgS, jobL
+
+
+def summary(resL: list, wallF: float) -> str:
+    """return summary table of batch results
+
+    Args:
+        resL (list): run_calc results
+        wallF (float): batch wall time in seconds
+
+    Returns:
+        str: summary table
+    """
+    hdrS = "{:<32} {:<7} {:>9}  {}".format("calc", "status", "sec", "message")
+    rptL = [hdrS, "-" * len(hdrS)]
+    for nameS, statusS, secF, msgS in (i[:4] for i in resL):
+        rptL.append(
+            "{:<32} {:<7} {:>9.2f}  {}".format(nameS, statusS, secF, msgS))
+    rptL.append("-" * len(hdrS))
+    failI = sum(1 for i in resL if i[1] == "failed")
+    rptL.append(
+        "calcs: {}   failed: {}   calc sec: {:.2f}   wall sec: {:.2f}".format(
+            len(resL), failI, sum(i[2] for i in resL), wallF))
+
+    return "\n".join(rptL)
+
+
+def _crashed(calcS: str) -> tuple:
+    """return run_calc result for a calc whose worker process died"""
+
+    return (Path(calcS).stem, "failed", 0.0,
+            "worker process exited - calc not completed", [])
+
+
+def batch(projP: Path, workersI: int = None) -> list:
+    """build all calcs in a project in parallel
+
+    Workers are reused across calcs so that imports stay loaded; run_calc
+    resets the calc state. A calc that kills its worker (os._exit, a crash
+    in an extension module) breaks the pool and every calc still queued on
+    it. The unfinished calcs are then run again in a fresh one worker pool,
+    in calc order, where the first broken calc is the one that died: it is
+    reported as failed and the calcs after it go back to a parallel pool.
+
+    Args:
+        projP (Path): project folder
+        workersI (int): number of worker processes, cpu count if None
+
+    Returns:
+        list: run_calc results in calc order
+    """
+    calcL = [str(iP) for iP in find_calcs(projP)]
+    workersI = workersI or os.cpu_count() or 1
+    resD = {}
+    todoL = calcL
+    serialB = False
+    while todoL:
+        poolI = 1 if serialB else min(workersI, len(todoL))
+        brokeL = []
+        with concurrent.futures.ProcessPoolExecutor(poolI) as poolO:
+            futD = {poolO.submit(run_calc, calcS): calcS for calcS in todoL}
+            for futO in concurrent.futures.as_completed(futD):
+                calcS = futD[futO]
+                try:
+                    resD[calcS] = futO.result()
+                except BrokenProcessPool:
+                    brokeL.append(calcS)
+        todoL = [calcS for calcS in calcL if calcS in brokeL]
+        if todoL and poolI == 1:
+            # calcs run in order - the first broken calc killed the worker
+            resD[todoL[0]] = _crashed(todoL[0])
+            todoL = todoL[1:]
+            serialB = False
+        else:
+            serialB = bool(todoL)
+
+    return [resD[calcS] for calcS in calcL]
+
+
+def build_pdfs(resL: list, workersI: int = None) -> list:
+    """compile the pdf docs queued by a batch build
+
+    The build cache entry of a calc is stored again after its pdf is
+    written so that the pdf is restored with the other docs.
+
+    Args:
+        resL (list): run_calc results
+        workersI (int): concurrent LaTeX jobs, cpu count if None
+
+    Returns:
+        list: rv_pipe.compile_pdf results in calc order
+    """
+    import rivtcalc.rv_cache as _rv_cache
+
+    jobL = [jobT for i in resL for jobT in i[4]]
+    pdfL = _rv_pipe.compile_pdfs(jobL, workersI)
+    for jobT, pdfT in zip(jobL, pdfL):
+        if pdfT[1] == "ok" and jobT[2] is not None:
+            cacheS, keyS, outL = jobT[2]
+            _rv_cache.BuildCache(Path(cacheS)).store(keyS, outL)
+
+    return pdfL
+
+
+def main(argL: list = None) -> int:
+    """command line entry point
+
+    Args:
+        argL (list): command line arguments after "batch"
+
+    Returns:
+        int: exit code, 1 if any calc failed
+    """
+    parserO = argparse.ArgumentParser(
+        prog="python -m rivtcalc batch",
+        description="build every cddss_*.py calc in a project")
+    parserO.add_argument(
+        "folder", nargs="?", default=os.getcwd(),
+        help="project folder or a folder in the project (default: cwd)")
+    parserO.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="worker processes (default: cpu count)")
+    argsO = parserO.parse_args(argL)
+
+    projP = find_project(Path(argsO.folder))
+    print("BATCH project folder: ", projP)
+    t1F = time.perf_counter()
+    resL = batch(projP, argsO.jobs)
+    if not resL:
+        print("BATCH no calc files found in ", Path(projP, "calcs"))
+        return 1
+    print(summary(resL, time.perf_counter() - t1F))
+    pdfL = build_pdfs(resL, argsO.jobs)
+    if pdfL:
+        print(_rv_pipe.pdf_report(pdfL))
+
+    return int(any(i[1] == "failed" for i in resL + pdfL))
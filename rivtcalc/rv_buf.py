@@ -0,0 +1,105 @@
+#! python
+"""buffers formatted calc output
+
+OutBuf collects the utf and reST calc output as a list of chunks, so
+appending with += does not copy the calc string. In streaming mode each
+chunk is written to a temporary file next to the output file as it is
+appended and no text is held in memory. The output file is replaced by the
+temporary file when the buffer is saved, so a calc that fails part way
+leaves the docs of the last good run in place."""
+
+import os
+import shutil
+from pathlib import Path
+
+
+class OutBuf:
+    """calc output buffer"""
+
+    def __init__(self, fileP=None):
+        """buffer in memory or streamed to a file
+
+        Args:
+            fileP (Path): output file for streaming mode, None for memory
+        """
+        self._chunkL = []
+        self._sizeI = 0
+        self.fileP = None if fileP is None else Path(fileP)
+        self._fileO = None
+        if self.fileP is not None:
+            self._tmpP = Path(self.fileP.parent, self.fileP.name + ".tmp")
+            self._fileO = open(self._tmpP, "w", encoding="UTF-8", newline="")
+
+    @property
+    def streamB(self) -> bool:
+        """True if output is written to a file as it is appended"""
+        return self._fileO is not None
+
+    def write(self, textS: str):
+        """append text
+
+        Args:
+            textS (str): formatted text
+        """
+        if not textS:
+            return
+        self._sizeI += len(textS)
+        if self._fileO is not None:
+            self._fileO.write(textS)
+        else:
+            self._chunkL.append(textS)
+
+    def __iadd__(self, textS):
+        if isinstance(textS, OutBuf):
+            for chunkS in textS._chunkL:
+                self.write(chunkS)
+        else:
+            self.write(str(textS))
+        return self
+
+    def __len__(self):
+        return self._sizeI
+
+    def getvalue(self) -> str:
+        """return buffered text (empty in streaming mode)
+
+        Returns:
+            str: text appended in memory mode
+        """
+        if len(self._chunkL) > 1:
+            self._chunkL = ["".join(self._chunkL)]
+        return self._chunkL[0] if self._chunkL else ""
+
+    __str__ = getvalue
+
+    def close(self):
+        """flush and close the stream file and replace the output file"""
+        if self._fileO is not None:
+            self._fileO.close()
+            os.replace(self._tmpP, self.fileP)
+            self._fileO = None
+
+    def discard(self):
+        """close and delete the stream file, keeping the output file"""
+        if self._fileO is not None:
+            self._fileO.close()
+            os.remove(self._tmpP)
+            self._fileO = None
+
+    def save(self, fileP: Path):
+        """write output to a file
+
+        A streamed buffer replaces its output file and is copied if fileP is
+        another file. A buffer in memory is written.
+
+        Args:
+            fileP (Path): output file
+        """
+        fileP = Path(fileP)
+        if self.fileP is not None:
+            self.close()
+            if fileP != self.fileP:
+                shutil.copyfile(self.fileP, fileP)
+            return
+        with open(fileP, "w", encoding="UTF-8", newline="") as f1:
+            f1.write(self.getvalue())
@@ -0,0 +1,241 @@
+#! python
+"""caches calc builds by content hash
+
+A build key is the hash of every input that changes the output of D(): the
+calc source, the data and image files it references, the Python modules it
+imports from the calc folders, the units file, the style file, the rivtcalc
+source (including unum) and the doc options. The outputs of a build are copied into a
+cache entry under the d00_docs folder. When a later build has the same key
+the outputs are restored from the entry and the calc is not evaluated.
+
+Entries are stored in d00_docs/rvcache/<key>/ with a manifest.json. The
+total size of the cache is bounded; the least recently used entries are
+evicted first."""
+
+import os
+import re
+import ast
+import sys
+import json
+import time
+import shutil
+import hashlib
+from pathlib import Path
+
+MAXBYTES = 200 * 2 ** 20  # cache size limit
+_filergx = re.compile(  # file names referenced in a calc
+    r"[\w\-./\\]+\.(?:csv|xlsx|xls|txt|png|jpg|jpeg|gif|svg|tex|py)\b",
+    re.IGNORECASE)
+
+
+def file_hash(fileP: Path) -> str:
+    """return sha256 hex digest of a file
+
+    Args:
+        fileP (Path): file to hash
+
+    Returns:
+        str: hex digest
+    """
+    hashO = hashlib.sha256()
+    with open(fileP, "rb") as f1:
+        for blockB in iter(lambda: f1.read(2 ** 20), b""):
+            hashO.update(blockB)
+
+    return hashO.hexdigest()
+
+
+def calc_inputs(calcS: str, folderD: dict) -> list:
+    """return files referenced by a calc
+
+    File names in the calc source are resolved against the folders used by
+    the rivt commands (calc subfolder, doc subfolder, d00_docs and calcs).
+    Names that do not resolve to a file are ignored.
+
+    Args:
+        calcS (str): calc source
+        folderD (dict): project folders
+
+    Returns:
+        list: sorted file paths
+    """
+    dirL = [
+        folderD["cpathcur"],
+        folderD["dpathcur"],
+        folderD["dpath0"],
+        folderD["cpath"],
+    ]
+    fileL = set()
+    for nameS in set(_filergx.findall(calcS)):
+        for dirP in dirL:
+            fileP = Path(dirP, nameS.strip())
+            if fileP.is_file() and fileP != folderD["cfull"]:
+                fileL.add(fileP)
+                break
+
+    return sorted(fileL)
+
+
+def _imports(srcS: str) -> set:
+    try:
+        treeO = ast.parse(srcS)
+    except (SyntaxError, ValueError):
+        return set()
+    nameS = set()
+    for nodeO in ast.walk(treeO):
+        if isinstance(nodeO, ast.Import):
+            nameS.update(i.name for i in nodeO.names)
+        elif isinstance(nodeO, ast.ImportFrom) and nodeO.module \
+                and not nodeO.level:
+            nameS.add(nodeO.module)
+            nameS.update(nodeO.module + "." + i.name for i in nodeO.names)
+
+    return nameS
+
+
+def calc_modules(calcS: str, folderD: dict) -> list:
+    """return Python modules in the calc folders imported by a calc
+
+    Imports are followed into the modules found, so helpers imported by a
+    helper module are included. Modules outside the calc subfolder and the
+    calcs folder (rivtcalc, site packages) are not returned.
+
+    Args:
+        calcS (str): calc source
+        folderD (dict): project folders
+
+    Returns:
+        list: sorted module file paths
+    """
+    dirL = [folderD["cpathcur"], folderD["cpath"]]
+    fileL, todoL = set(), [calcS]
+    while todoL:
+        for modS in _imports(todoL.pop()):
+            partL = modS.split(".")
+            for dirP in dirL:
+                fileP = Path(dirP, *partL).with_suffix(".py")
+                if not fileP.is_file():
+                    fileP = Path(dirP, *partL, "__init__.py")
+                if fileP.is_file():
+                    if fileP not in fileL:
+                        fileL.add(fileP)
+                        todoL.append(fileP.read_text(encoding="UTF-8",
+                                                     errors="replace"))
+                    break
+
+    return sorted(fileL)
+
+
+class BuildCache:
+    """size bounded cache of calc build outputs"""
+
+    def __init__(self, cacheP: Path, maxbytesI: int = MAXBYTES):
+        """build cache in a folder
+
+        Args:
+            cacheP (Path): cache folder
+            maxbytesI (int): cache size limit in bytes
+        """
+        self.cacheP = Path(cacheP)
+        self.maxbytesI = maxbytesI
+
+    def key(self, fileL: list, optL: list) -> str:
+        """return build key for input files and doc options
+
+        Args:
+            fileL (list): input file paths
+            optL (list): doc options (doc types, style, title ...)
+
+        Returns:
+            str: build key
+        """
+        hashO = hashlib.sha256()
+        hashO.update(sys.version.encode("UTF-8"))
+        for optS in optL:
+            hashO.update(repr(optS).encode("UTF-8"))
+        for fileP in fileL:
+            hashO.update(str(fileP).encode("UTF-8"))
+            hashO.update(file_hash(fileP).encode("UTF-8"))
+
+        return hashO.hexdigest()[:32]
+
+    def restore(self, keyS: str) -> list:
+        """copy cached outputs to their folders
+
+        Args:
+            keyS (str): build key
+
+        Returns:
+            list: restored files, None if the key is not cached
+        """
+        entryP = Path(self.cacheP, keyS)
+        try:
+            with open(Path(entryP, "manifest.json"), "r") as f1:
+                manD = json.load(f1)
+        except (OSError, ValueError):
+            return None
+        outL = []
+        for nameS, outS in manD["outputs"].items():
+            srcP = Path(entryP, nameS)
+            if not srcP.is_file():
+                return None  # incomplete entry - rebuild
+            outL.append((srcP, Path(outS)))
+        for srcP, outP in outL:
+            os.makedirs(outP.parent, exist_ok=True)
+            shutil.copy2(srcP, outP)
+        os.utime(Path(entryP, "manifest.json"))  # mark as recently used
+
+        return [i[1] for i in outL]
+
+    def store(self, keyS: str, outL: list):
+        """copy build outputs to a cache entry and evict old entries
+
+        Args:
+            keyS (str): build key
+            outL (list): output file paths
+        """
+        entryP = Path(self.cacheP, keyS)
+        shutil.rmtree(entryP, ignore_errors=True)
+        os.makedirs(entryP, exist_ok=True)
+        outD = {}
+        for i, outP in enumerate(outL):
+            outP = Path(outP)
+            if not outP.is_file():
+                continue
+            nameS = str(i) + "_" + outP.name
+            shutil.copy2(outP, Path(entryP, nameS))
+            outD[nameS] = str(outP)
+        with open(Path(entryP, "manifest.json"), "w") as f1:
+            json.dump({"time": time.time(), "outputs": outD}, f1, indent=1)
+        self.evict(keyS)
+
+    def evict(self, keepS: str = ""):
+        """remove least recently used entries above the size limit
+
+        Folders without a manifest, such as the table cache, are not build
+        entries and are never removed.
+
+        Args:
+            keepS (str): key of entry that is never removed
+        """
+        if not self.cacheP.is_dir():
+            return
+        entryL = []
+        totalI = 0
+        for entryP in self.cacheP.iterdir():
+            if not entryP.is_dir():
+                continue
+            try:
+                usedF = Path(entryP, "manifest.json").stat().st_mtime
+            except OSError:  # not a build entry
+                continue
+            sizeI = sum(f.stat().st_size for f in entryP.iterdir())
+            entryL.append((usedF, sizeI, entryP))
+            totalI += sizeI
+        for usedF, sizeI, entryP in sorted(entryL):
+            if totalI <= self.maxbytesI:
+                break
+            if entryP.name == keepS:
+                continue
+            shutil.rmtree(entryP, ignore_errors=True)
+            totalI -= sizeI
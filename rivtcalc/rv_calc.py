@@ -208,6 +208,7 @@ import warnings
 import re
 import importlib.util
 import shutil
+import copy
 import numpy as np
 from pathlib import Path
 from collections import deque
@@ -215,90 +216,36 @@ from typing import List, Set, Dict, Tuple, Optional
 from contextlib import suppress
 import rivtcalc.rv_utf as _rv_utf
 import rivtcalc.rv_rst as _rv_rst
+import rivtcalc.rv_proj as _rv_proj
+import rivtcalc.rv_parse as _rv_parse
+import rivtcalc.rv_lazy as _rv_lazy
+import rivtcalc.rv_cache as _rv_cache
+import rivtcalc.rv_eval as _rv_eval
+import rivtcalc.rv_sym as _rv_sym
+import rivtcalc.rv_table as _rv_table
+import rivtcalc.rv_pipe as _rv_pipe
+import rivtcalc.rv_docu as _rv_docu
+from rivtcalc.rv_buf import OutBuf
 
 # import rivt.rivt_reprt as _reprt
 # import rivt.rivt_chk as _rchk
 
-try:
-    # print("argv1", sys.argv[1])
-    _calcfileS = sys.argv[1]
-except:
-    # print("argv0", sys.argv[0])
-    _calcfileS = sys.argv[0]
-if ".py" not in _calcfileS:
-    import __main__
-    # print(dir(__main__))
-    _calcfileS = __main__.__file__
-
-_cwdS = os.getcwd()
-_cfull = Path(_calcfileS)  # calc file full path
-_cfileS = _cfull.name  # calc file name
-_cnameS = _cfileS.split(".py")[0]  # calc file basename
-_cnumS = _cnameS[1:5]
-_rivpath = Path("rivtcalc.rivt_lib.py").parent  # rivtlib program path
-_ppath = _cfull.parent.parent.parent  # project folder path
-_cpath = Path(_ppath / "calcs")  # calc folder path
-_dpath = Path(_ppath / "docs")  # doc folder path
-_manpath = Path(_ppath / "manage")   # manage folder path
-_reppath = Path(_ppath / "reports")  # reports folder path
-_dpath0 = Path(_dpath / "d00_docs")  # doc config folder
-_pdffile = Path(_dpath / ".".join((_cnameS, "pdf")))  # pdf output
-utfcalcS = """"""  # utf calc string
-rstcalcS = """"""  # reST calc string
+_rivpath = Path(__file__).parent  # rivtlib program path
+utfcalcS = OutBuf()  # utf calc output
+rstcalcS = OutBuf()  # reST calc output
 exportS = """"""  # values string export
-rivtcalcD = {}  # values dictonary
+rivtcalcD = _rv_eval.Namespace()  # calc values namespace
 _rstflagB = False  # reST generation flag
-_calcdirS = ""
-_docdirS = ""
-_mandirS = ""
-_repdirS = ""
-for root, dir, file in os.walk(_cpath):  # set calc directory
-    for i in dir:
-        if _cfileS[0:5] == i[0:5]:
-            _calcdirS = i
-            for root, dir, file in os.walk(_dpath):  # set doc directory
-                for i in dir:
-                    print(i)
-                    if "".join(["d", _cfileS[1:3]]) == i[0:3]:
-                        _docdirS = i
-for root, dir, file in os.walk(_manpath):  # set manage directory
-    for i in dir:
-        if "".join(["m", _cfileS[1:3]]) == i[0:3]:
-            _mandirS = i
-            for root, dir, file in os.walk(_reppath):  # set report directory
-                for i in dir:
-                    if "".join(["r", _cfileS[1:3]]) == i[0:3]:
-                        _repdirS = i
-
-_rstfile = Path(_dpath0 / ".".join((_cnameS, "rst")))  # rst output
-_cpathcur = Path(_cpath / _calcdirS)  # calc folder path
-_dpathcur = Path(_dpath / _docdirS)  # doc folder path
-_manpathcur = Path(_manpath / _mandirS)  # manage folder path
-_reppathcur = Path(_reppath / _repdirS)  # report folder path
-print("INFO: calc directory is ", _cpathcur)
-print("INFO: doc directory is ", _dpathcur)
-print("INFO: manage directory is ", _manpathcur)
-print("INFO: report directory is ", _reppathcur)
-
-# folder paths
-_foldD = {
-    "ppath": _ppath,
-    "docpath": _dpath,
-    "cpath": Path(_ppath, "calcs"),
-    "cpathcur": _cpathcur,
-    "dpath": Path(_ppath, "docs"),
-    "dpath0": Path(_ppath, "docs", "d00_docs"),
-    "dpathcur": _dpathcur,
-    "spath": Path(_cpath, "scripts"),
-    "kpath": Path(_cpath, "scripts", "sketches"),
-    "hpath": Path(_dpath, "html"),
-}
-# section settings
+_initB = False  # calc initialized flag
+
+# folder paths - resolved on first use
+_foldD = _rv_proj.ProjectD()
+# section settings - calc numbers set on first use
 _setsectD = {
-    "fnumS": _cnameS[0:5],
-    "cnumS": _cnameS[1:5],
-    "dnumS": _cnameS[1:3],
-    "sdnumS": _cnameS[3:5],
+    "fnumS": "",
+    "cnumS": "",
+    "dnumS": "",
+    "sdnumS": "",
     "snameS": "",
     "snumS": "",
     "swidthI": 80,
@@ -320,70 +267,146 @@ _setcmdD = {
     "subB": False,
     "saveB": False,
 }
+_set0T = copy.deepcopy((_setsectD, _setcmdD))  # settings for a new calc
 
-# temp files
-_rvbak = Path(_cpathcur / ".".join((_cnameS, "bak")))
-_logfile = Path(_dpath0 / ".".join((_cnameS, "logging")))
-# logs and checks
-with open(_cfull, "r") as f2:
-    calcbak = f2.read()
-with open(_rvbak, "w") as f3:
-    f3.write(calcbak)  # write backup
-warnings.filterwarnings("ignore")
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s %(name)-12s %(levelname)-8s %(message)s",
-    datefmt="%m-%d %H:%M",
-    filename=_logfile,
-    filemode="w",
-)
-logconsole = logging.StreamHandler()
-logconsole.setLevel(logging.INFO)
-formatter = logging.Formatter("%(levelname)-8s %(message)s")
-logconsole.setFormatter(formatter)
-logging.getLogger("").addHandler(logconsole)
-_rshortP = Path(*Path(_cfull).parts[-3:])
-_bshortP = Path(*Path(_rvbak).parts[-4:])
-_lshortP = Path(*Path(_logfile).parts[-4:])
-logging.info(f"""calc: {_rshortP}""")
-logging.info(f"""backup: {_bshortP}""")
-logging.info(f"""logging: {_lshortP}""")
-print(" ")
-# todo: write check code on folder structure
-# todo: check for units file in c0000_calcs, supplement default units
-
-
-def _init_utf(rxS: str):
-    """return rivt-string utf class instance
+
+def _reset_calc(calcfileP=None):
+    """clear calc state so another calc can run in the same process
+
+    Args:
+        calcfileP (Path): next calc file, read from the command line if None
+    """
+    global utfcalcS, rstcalcS, exportS, rivtcalcD, _rstflagB, _initB
+    global _setsectD, _setcmdD
+
+    utfcalcS = OutBuf()
+    rstcalcS = OutBuf()
+    exportS = """"""
+    rivtcalcD = _rv_eval.Namespace()
+    _rstflagB = False
+    _initB = False
+    _foldD.reset(calcfileP)
+    _setsectD, _setcmdD = copy.deepcopy(_set0T)
+    for handlerO in logging.root.handlers[:]:  # log to the next calc file
+        logging.root.removeHandler(handlerO)
+        handlerO.close()
+
+
+def _dep_stamp() -> str:
+    """return version stamp of the code that formats assignments
+
+    Returns:
+        str: python version and rivtcalc module times
+    """
+    stampL = [sys.version]
+    for fileP in sorted(_rivpath.glob("rv_*.py")):
+        stampL.append(str(fileP.stat().st_mtime_ns))
+
+    return " ".join(stampL)
+
+
+def _init_calc():
+    """set calc numbers, write calc backup and start log
+
+    Runs once, on the first rivt function call, so that importing the API
+    does not touch the project folders.
+    """
+    global _initB
+
+    if _initB:
+        return
+    _initB = True
+    cnameS = _foldD.cnameS
+    _setsectD.update({
+        "fnumS": cnameS[0:5],
+        "cnumS": cnameS[1:5],
+        "dnumS": cnameS[1:3],
+        "sdnumS": cnameS[3:5],
+    })
+    print("INFO: calc directory is ", _foldD["cpathcur"])
+    _rv_eval.load_cache(_rv_eval.cache_file(_foldD["cfull"]))
+    rivtcalcD.deps.load(  # assignment results of the previous run
+        Path(_foldD["dpath0"], "rvcache", cnameS + ".dep"), _dep_stamp())
+    _rv_sym.load_cache(Path(_foldD["dpath0"], "rvcache", "sympy.rvs"))
+    _rv_table.set_cache(Path(_foldD["dpath0"], "rvcache", "tables"))
+
+    # temp files
+    rvbakP = Path(_foldD["cpathcur"] / ".".join((cnameS, "bak")))
+    logfileP = Path(_foldD["dpath0"] / ".".join((cnameS, "logging")))
+    # logs and checks
+    with open(_foldD["cfull"], "r") as f2:
+        calcbak = f2.read()
+    with open(rvbakP, "w") as f3:
+        f3.write(calcbak)  # write backup
+    warnings.filterwarnings("ignore")
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s %(name)-12s %(levelname)-8s %(message)s",
+        datefmt="%m-%d %H:%M",
+        filename=logfileP,
+        filemode="w",
+    )
+    logconsole = logging.StreamHandler()
+    logconsole.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(levelname)-8s %(message)s")
+    logconsole.setFormatter(formatter)
+    logging.getLogger("").addHandler(logconsole)
+    rshortP = Path(*Path(_foldD["cfull"]).parts[-3:])
+    bshortP = Path(*Path(rvbakP).parts[-4:])
+    lshortP = Path(*Path(logfileP).parts[-4:])
+    logging.info(f"""calc: {rshortP}""")
+    logging.info(f"""backup: {bshortP}""")
+    logging.info(f"""logging: {lshortP}""")
+    print(" ")
+    # todo: write check code on folder structure
+    # todo: check for units file in c0000_calcs, supplement default units
+
+
+def _init_nodes(rxS: str, typeS: str) -> list:
+    """parse rivt-string to nodes and format section heading
 
     Args:
         rxS (str): rivt-string
+        typeS (str): rivt-string type
+
+    Returns:
+        list: rivt-string nodes
+    """
+    _init_calc()
+    nodeL = _rv_parse.parse_rivt(rxS, typeS)
+    _section(nodeL[0].lineS)
+    return nodeL
+
+
+def _init_utf(nodeL: list):
+    """return rivt-string utf class instance
+
+    The instance writes to utfcalcS, so tables stream to the utf file.
+
+    Args:
+        nodeL (list): rivt-string nodes
 
     Returns:
         class instance: utf string-type instance
     """
-    sectS, strS = rxS.split("\n", 1)
-    _section(sectS)
-    strL = strS.split("\n")
     ucalc = _rv_utf.OutputUTF(
-        strL, _foldD, _setcmdD, _setsectD, rivtcalcD, exportS)
+        nodeL, _foldD, _setcmdD, _setsectD, rivtcalcD, exportS, utfcalcS)
     return ucalc
 
 
-def _init_rst(rxS: str):
+def _init_rst(nodeL: list):
     """return rivt-string reST class
 
+    The instance writes to rstcalcS, so tables stream to the reST file.
+
     Args:
-        rxStr (str): rivt-string
+        nodeL (list): rivt-string nodes
 
     Returns:
         class instance: reST string-type instance
     """
-    sectS, strS = rxS.split("\n", 1)
-    _section(sectS)
-    strL = strS.split("\n")
     rstcalc = _rv_rst.Rivt2rSt(
-        strL, _foldD, _setcmdD, _setsectD, rivtcalcD, exportS)
+        nodeL, _foldD, _setcmdD, _setsectD, rivtcalcD, exportS, rstcalcS)
     return rstcalc
 
 
@@ -406,34 +429,33 @@ def _section(hdrS: str):
         snumSS = _setsectD["snumS"] = hdrS[hdrS.find("[") + 1: hdrS.find("]")]
         cnumSS = str(_setsectD["cnumS"])
         widthI = int(_setsectD["swidthI"])
+        headS = (
+            " "
+            + nameSS
+            + (cnumSS + " - " + ("[" + snumSS + "]")
+               ).rjust(widthI - len(nameSS) - 1)
+        )
+        bordrS = widthI * "_"
+        utfS = "\n" + bordrS + "\n\n" + headS + "\n" + bordrS + "\n"
+        print(utfS)
+        utfcalcS += utfS
         if _rstflagB:
             # draw horizontal line
             headS = (
                 ".. raw:: latex"
                 + "\n\n"
-                + "   ?x?vspace{.2in}"
-                + "   ?x?textbf{"
+                + "   \\vspace{.2in}"
+                + "   \\textbf{"
                 + nameSS
                 + "}"
-                + "   ?x?hfill?x?textbf{SECTION "
+                + "   \\hfill\\textbf{SECTION "
                 + snumSS
                 + "}\n"
-                + "   ?x?newline"
-                + "   ?x?vspace{.05in}   {?x?color{black}?x?hrulefill}"
+                + "   \\newline"
+                + "   \\vspace{.05in}   {\\color{black}\\hrulefill}"
                 + "\n\n"
             )
             rstcalcS += headS
-        else:
-            headS = (
-                " "
-                + nameSS
-                + (cnumSS + " - " + ("[" + snumSS + "]")
-                   ).rjust(widthI - len(nameSS) - 1)
-            )
-            bordrS = widthI * "_"
-            utfS = "\n" + bordrS + "\n\n" + headS + "\n" + bordrS + "\n"
-            print(utfS)
-            utfcalcS += utfS
 
 
 def R(rxS: str):
@@ -444,14 +466,12 @@ def R(rxS: str):
     """
     global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD
 
+    nodeL = _init_nodes(rxS, "repository")
+    rcalc = _init_utf(nodeL)
+    rcalcS, _setsectD = rcalc.r_utf()
     if _rstflagB:
-        rcalc = _init_rst(rxS)
+        rcalc = _init_rst(nodeL)
         rcalcS, _setsectD = rcalc.r_rst()
-        rstcalcS += rcalcS
-    else:
-        rcalc = _init_utf(rxS)
-        rcalcS, _setsectD = rcalc.r_utf()
-        utfcalcS += rcalcS
 
 
 def I(rxS: str):
@@ -462,14 +482,12 @@ def I(rxS: str):
     """
     global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD
 
+    nodeL = _init_nodes(rxS, "insert")
+    icalc = _init_utf(nodeL)
+    icalcS, _setsectD, _setcmdD = icalc.i_utf()
     if _rstflagB:
-        rcalc = _init_rst(rxS)
+        rcalc = _init_rst(nodeL)
         rcalcS, _setsectD, _setcmdD = rcalc.i_rst()
-        rstcalcS += rcalcS
-    else:
-        icalc = _init_utf(rxS)
-        icalcS, _setsectD, _setcmdD = icalc.i_utf()
-        utfcalcS += icalcS
 
 
 def V(rxS: str):
@@ -480,14 +498,12 @@ def V(rxS: str):
     """
     global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD, exportS
 
+    nodeL = _init_nodes(rxS, "values")
+    vcalc = _init_utf(nodeL)
+    vcalcS, _setsectD, _setcmdD, rivtcalcD, exportS = vcalc.v_utf()
     if _rstflagB:
-        rcalc = _init_rst(rxS)
+        rcalc = _init_rst(nodeL)
         rcalcS, _setsectD, _setcmdD, rivtcalcD, exportS = rcalc.v_rst()
-        rstcalcS += rcalcS
-    else:
-        vcalc = _init_utf(rxS)
-        vcalcS, _setsectD, _setcmdD, rivtcalcD, exportS = vcalc.v_utf()
-        utfcalcS += vcalcS
 
 
 def T(rxS: str):
@@ -498,14 +514,12 @@ def T(rxS: str):
     """
     global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD
 
+    nodeL = _init_nodes(rxS, "table")
+    tcalc = _init_utf(nodeL)
+    tcalcS, _setsectD, _setcmdD, rivtcalcD = tcalc.t_utf()
     if _rstflagB:
-        rcalc = _init_rst(rxS)
-        rcalcS, _setsectD = rcalc.t_rst()
-        rstcalcS += rcalcS
-    else:
-        tcalc = _init_utf(rxS)
-        tcalcS, _setsectD, _setcmdD, rivtcalcD = tcalc.t_utf()
-        utfcalcS += tcalcS
+        rcalc = _init_rst(nodeL)
+        rcalcS, _setsectD, _setcmdD, rivtcalcD = rcalc.t_rst()
 
 
 def S(rxS: str):
@@ -527,207 +541,145 @@ def C(rxS: str):
     pass
 
 
-def gen_utf8(cmdS: str, filepathS: str, calctitleS: str):
-    """write utf-calc to numbered calc folder and exit
+def gen_utf8(filepathS: str):
+    """write utf-calc to calc folder
 
     Args:
-        cmdS (str): rivt file
-        filepathS (str): write path (default to read path)
-        calctitleS (str): calculation title
+        filepathS (str): calc subfolder (default to calc folder)
     """
 
     global utfcalcS
+    cnameS = _foldD.cnameS
 
-    utfcalcS = """"""
-    exec(cmdS, globals(), locals())
-
-    utffile = Path(_cpath / _setsectD["fnumS"] / ".".join([_cnameS, "txt"]))
     if filepathS == "default":  # check file write location
-        utfpthS = Path(utffile)
+        utfpthS = Path(_foldD["cpathcur"] / ".".join([cnameS, "txt"]))
     else:
-        utfpthS = Path(_cpath / filepathS / ".".join((_cnameS, "txt")))
+        utfpthS = Path(_foldD["cpath"] / filepathS / ".".join((cnameS, "txt")))
 
-    with open(utfpthS, "wb") as f1:
-        f1.write(utfcalcS.encode("UTF-8"))
+    utfcalcS.save(utfpthS)
     print("INFO: utf calc written to calc folder", flush=True)
-    print("INFO: program complete")
 
-    os._exit(1)
 
-
-def gen_pdf(texfileP):
+def gen_pdf(texfileP, cacheT=None):
     """write pdf calc to doc folder and open
 
+    The tex file is compiled in its own build folder by the pdf queue. In a
+    batch build the job is queued and compiled with the other calcs.
+
     Args:
-        texfileP (path): doc config folder
+        texfileP (path): tex file in d00_docs folder
+        cacheT (tuple): (cache folder, key, outputs) stored again by a batch
+            build after the pdf is written
     """
 
     global rstcalcS, _rstflagB
+    cnameS = _foldD.cnameS
+    dpath0P = _foldD["dpath0"]
 
-    os.chdir(_dpath0)
-    time.sleep(1)  # cleanup tex files
-    os.system("latexmk -c")
-    time.sleep(1)
-
-    pdfmkS = (
-        "perl.exe c:/texlive/2020/texmf-dist/scripts/latexmk/latexmk.pl "
-        + "-pdf -xelatex -quiet -f "
-        + str(texfileP)
-    )
-
-    os.system(pdfmkS)
-    print("\nINFO: pdf file written: " + ".".join([_cnameS, "pdf"]))
-
-    dnameS = _cnameS.replace("c", "d", 1)
-    docpdfP = Path(_dpath / ".".join([dnameS, "pdf"]))
-    doclocalP = Path(_dpath0 / ".".join([_cnameS, "pdf"]))
-    time.sleep(2)  # move pdf to doc folder
-    shutil.move(doclocalP, docpdfP)
-    os.chdir(_dpathcur)
-    print("INFO: pdf file moved to docs folder", flush=True)
-    print("INFO: program complete")
+    dnameS = cnameS.replace("c", "d", 1)
+    docpdfP = Path(_foldD["dpath"] / ".".join([dnameS, "pdf"]))
+    if _rv_pipe.queue_pdf(texfileP, docpdfP, cacheT):
+        print("INFO: pdf file queued: " + str(docpdfP), flush=True)
+        return
+    resL = _rv_pipe.compile_pdfs([(texfileP, docpdfP)])
+    logging.info(_rv_pipe.pdf_report(resL))
+    if resL[0][1] != "ok":
+        print("\nINFO: pdf file not written: " + resL[0][3])
+        return
+    print("\nINFO: pdf file written to docs folder: " + str(docpdfP))
 
-    cfgP = Path(_dpath0 / "rv_cfg.txt")  # read pdf display program
+    cfgP = Path(dpath0P / "rv_cfg.txt")  # read pdf display program
     with open(cfgP) as f2:
         cfgL = f2.readlines()
         cfg1S = cfgL[0].split("|")
         cfg2S = cfg1S[1].strip()
-    cmdS = cfg2S + " " + str(Path(_dpath) / ".".join([dnameS, "pdf"]))
+    cmdS = cfg2S + " " + str(docpdfP)
     # print(cmdS)
     subprocess.run(cmdS)
 
-    os._exit(1)
-
 
 def gen_html(stylefileS):
+    """write html calc to html folder
+
+    Args:
+        stylefileS (str): css style file in d00_docs folder
+
+    Returns:
+        bool: True if the html file was written
+    """
 
     global rstcalcS, _rstflagB
-    pass
+    cnameS = _foldD.cnameS
+    dpath0P = _foldD["dpath0"]
 
+    if stylefileS.strip().endswith(".css"):
+        style_path = Path(dpath0P / stylefileS.strip())
+    else:
+        style_path = Path(_rivpath / "docs" / "rivet_html.css")
+    print("INFO: style sheet " + str(style_path))
+    rstfileP = Path(dpath0P / ".".join([cnameS, "rst"]))
+    os.makedirs(_foldD["hpath"], exist_ok=True)
+    htmlfileP = Path(_foldD["hpath"] / ".".join([cnameS, "html"]))
+    if _rv_docu.rst2html(rstfileP, htmlfileP, style_path):
+        logging.warning("html file not written " + str(htmlfileP))
+        print("INFO: html file not written - see log")
+        return False
+    print("INFO: html file written " + str(htmlfileP))
+
+    return True
+
+
+def gen_tex(stylefileS, calctitleS, startpageS):
+    """write tex calc to d00_docs folder
 
-def gen_tex(doctypeS, stylefileS, calctitleS, startpageS):
+    Args:
+        stylefileS (str): LaTeX style file in d00_docs folder
+        calctitleS (str): calc title in page header
+        startpageS (str): first page number
+
+    Returns:
+        Path: tex file, None if it was not written
+    """
 
     global rstcalcS, _rstflagB
+    cnameS = _foldD.cnameS
+    dpath0P = _foldD["dpath0"]
 
     pdfD = {
-        "cpdfP": Path(_dpath0 / ".".join([_cnameS, "pdf"])),
-        "chtml": Path(_dpath0 / ".".join([_cnameS, "html"])),
-        "trst": Path(_dpath0 / ".".join([_cnameS, "rst"])),
-        "ttex1": Path(_dpath0 / ".".join([_cnameS, "tex"])),
-        "auxfile": Path(_dpath0 / ".".join([_cnameS, ".aux"])),
-        "outfile": Path(_dpath0 / ".".join([_cnameS, ".out"])),
-        "texmak2": Path(_dpath0 / ".".join([_cnameS, ".fls"])),
-        "texmak3": Path(_dpath0 / ".".join([_cnameS, ".fdb_latexmk"])),
+        "cpdfP": Path(dpath0P / ".".join([cnameS, "pdf"])),
+        "chtml": Path(dpath0P / ".".join([cnameS, "html"])),
+        "trst": Path(dpath0P / ".".join([cnameS, "rst"])),
+        "ttex1": Path(dpath0P / ".".join([cnameS, "tex"])),
+        "auxfile": Path(dpath0P / ".".join([cnameS, ".aux"])),
+        "outfile": Path(dpath0P / ".".join([cnameS, ".out"])),
+        "texmak2": Path(dpath0P / ".".join([cnameS, ".fls"])),
+        "texmak3": Path(dpath0P / ".".join([cnameS, ".fdb_latexmk"])),
     }
     if stylefileS == "default":
         stylefileS = "pdf_style.sty"
     else:
         stylefileS == stylefileS.strip()
-    style_path = Path(_dpath0 / stylefileS)
+    style_path = Path(dpath0P / stylefileS)
     print("INFO: style sheet " + str(style_path))
-    pythoncallS = "python "
-    if sys.platform == "linux":
-        pythoncallS = "python3 "
-    elif sys.platform == "darwin":
-        pythoncallS = "python3 "
-
-    rst2xeP = Path(rivpath / "scripts" / "rst2xetex.py")
     texfileP = pdfD["ttex1"]
-    tex1S = "".join(
-        [
-            pythoncallS,
-            str(rst2xeP),
-            " --embed-stylesheet ",
-            " --documentclass=report ",
-            " --documentoptions=12pt,notitle,letterpaper ",
-            " --stylesheet=",
-            str(style_path) + " ",
-            str(_rstfile) + " ",
-            str(texfileP),
-        ]
-    )
-
-    os.chdir(_dpath0)
-    os.system(tex1S)
+    if _rv_docu.rst2tex(pdfD["trst"], texfileP, style_path, calctitleS,
+                        startpageS, _setsectD["fnumS"]):
+        logging.warning("tex file not written " + str(texfileP))
+        print("INFO: tex file not written - see log")
+        return None
     print("INFO: tex file written " + str(texfileP))
 
-    # fix escape sequences
-    fnumS = _setsectD["fnumS"]
-    with open(texfileP, "r", encoding="utf-8", errors="ignore") as texin:
-        texf = texin.read()
-    texf = texf.replace("?x?", """\\""")
-    texf = texf.replace(
-        """fancyhead[L]{\leftmark}""",
-        """fancyhead[L]{\\normalsize  """ + calctitleS + "}",
-    )
-    texf = texf.replace("x*x*x", fnumS)
-    texf = texf.replace("""\\begin{tabular}""", "%% ")
-    texf = texf.replace("""\\end{tabular}""", "%% ")
-    texf = texf.replace(
-        """\\begin{document}""",
-        """\\begin{document}\n\\setcounter{page}{""" + startpageS + "}\n",
-    )
-
-    # texf = texf.replace(
-    #     """\\begin{document}""",
-    #     """\\renewcommand{\contentsname}{"""
-    #     + self.calctitle
-    #     + "}\n"
-    #     + """\\begin{document}"""
-    #     + "\n"
-    #     + """\\makeatletter"""
-    #     + """\\renewcommand\@dotsep{10000}"""
-    #     + """\\makeatother"""
-    #     + """\\tableofcontents"""
-    #     + """\\listoftables"""
-    #     + """\\listoffigures"""
-    # )
+    return texfileP
 
-    time.sleep(1)
-    with open(texfileP, "w", encoding="utf-8") as texout:
-        texout.write(texf)
-    print("INFO: tex file updated")
 
-    if doctypeS == "pdf":
-        gen_pdf(texfileP)
-
-    os._exit(1)
-
-
-def gen_rst(cmdS, doctypeS, stylefileS, calctitleS, startpageS):
-    """write calc rSt file to d00_docs folder
-
-    Args:
-        cmdS (str): [description]
-        doctypeS ([type]): [description]
-        stylefileS ([type]): [description]
-        calctitleS ([type]): [description]
-        startpageS ([type]): [description]
-    """
+def gen_rst():
+    """write reST calc to d00_docs folder"""
 
     global rstcalcS, _rstflagB
 
-    _rstflagB = True
-    rstcalcS = """"""
-    exec(cmdS, globals(), locals())
-    docdir = os.getcwd()
-    with open(_rstfile, "wb") as f1:
-        f1.write(rstcalcS.encode("UTF-8"))
-    print("INFO: rst calc written ", docdir, flush=True)
-
-    f1 = open(_rstfile, "r", encoding="utf-8", errors="ignore")
-    rstcalcL = f1.readlines()
-    f1.close()
-    print("INFO: rst file read: " + str(_rstfile))
-
-    if doctypeS == "tex" or doctypeS == "pdf":
-        gen_tex(doctypeS, stylefileS, calctitleS, startpageS)
-    elif doctypeS == "html":
-        gen_html()
-    else:
-        print("INFO: doc type not recognized")
-
-    os._exit(1)
+    rstfileP = Path(_foldD["dpath0"] / ".".join((_foldD.cnameS, "rst")))
+    rstcalcS.save(rstfileP)
+    print("INFO: rst calc written " + str(rstfileP), flush=True)
 
 
 def gen_report():
@@ -762,84 +714,220 @@ def gen_report():
     return """
 
 
+def _doc_types(doctypeS) -> set:
+    """return set of doc types
+
+    Args:
+        doctypeS (str or iterable): doc type, comma separated doc types or
+            a set of doc types
+
+    Returns:
+        set: lower case doc types
+    """
+    if isinstance(doctypeS, str):
+        typeL = doctypeS.replace(";", ",").split(",")
+    else:
+        typeL = list(doctypeS)
+
+    return {str(iS).strip().lower() for iS in typeL if str(iS).strip()}
+
+
+def _doc_files(typeL: set) -> list:
+    """return output files written by D() for doc types
+
+    Args:
+        typeL (set): doc types
+
+    Returns:
+        list: output file paths
+    """
+    cnameS = _foldD.cnameS
+    dpath0P = _foldD["dpath0"]
+    outL = [Path(_foldD["cpathcur"] / ".".join([cnameS, "csv"]))]
+    if "utf8" in typeL:
+        outL.append(Path(_foldD["cpathcur"] / ".".join([cnameS, "txt"])))
+    if typeL.intersection(["rst", "tex", "pdf", "html"]):
+        outL.append(Path(dpath0P / ".".join([cnameS, "rst"])))
+    if "html" in typeL:
+        outL.append(Path(_foldD["hpath"] / ".".join([cnameS, "html"])))
+    if typeL.intersection(["tex", "pdf"]):
+        outL.append(Path(dpath0P / ".".join([cnameS, "tex"])))
+    if "pdf" in typeL:
+        dnameS = cnameS.replace("c", "d", 1)
+        outL.append(Path(_foldD["dpath"] / ".".join([dnameS, "pdf"])))
+
+    return outL
+
+
+def _doc_inputs(cmdS: str, stylefileS: str) -> list:
+    """return input files that determine the D() outputs
+
+    Inputs are the calc file, files referenced in the calc, Python modules
+    it imports from the calc folders, the style file and the rivtcalc and
+    unum modules that evaluate units and format output.
+
+    Args:
+        cmdS (str): calc source
+        stylefileS (str): style file in d00_docs folder
+
+    Returns:
+        list: input file paths
+    """
+    fileL = [_foldD["cfull"]]
+    fileL += _rv_cache.calc_inputs(cmdS, _foldD)
+    fileL += _rv_cache.calc_modules(cmdS, _foldD)
+    styleL = [
+        Path(_foldD["dpath0"] / "pdf_style.sty"),
+        Path(_rivpath / "docs" / "rivet_html.css"),
+    ]
+    if stylefileS != "default":
+        styleL.append(Path(_foldD["dpath0"] / stylefileS.strip()))
+    fileL += [iP for iP in styleL if iP.is_file()]
+    fileL += sorted(_rivpath.rglob("*.py"))
+
+    return fileL
+
+
 def D(
     doctypeS="dev",
     stylefileS="default",
     calctitleS="RivtCalc Calculation",
     startpageS="1",
     clrS="clr",
+    cacheS="cache",
 ):
     """write RivtText to calc and doc files
 
-    Default skips writing any calc files.
-    Doc options include: utf8, html, pdf.
-    They write the following files to the calc file:
+    Default (dev) skips writing any calc files.
+    Doc types include: utf8, rst, tex, pdf, html and report. Several
+    types may be requested at once, either as a set or as a comma
+    separated string (e.g. "utf8, pdf"). The calc is evaluated once and
+    every requested file is written from that evaluation:
 
     cddnn_calcname.txt file is written to the calc subfolder
     cdnnn_values.csv file is written to calc subfolder
-    cddnn_calcname.rst calc file is written to calc subfolder
-    cddnn_calcname.tex file is written to calc subfolder
+    cddnn_calcname.rst calc file is written to d00_docs folder
+    cddnn_calcname.tex calc file is written to d00_docs folder
 
     .style files are read from d00_docs folder (default)
 
     pdf option writes PDF doc to the doc division folder.
     html option writes HTML files to the html folder.
 
+    Outputs are cached in d00_docs/rvcache by a hash of the calc, the files
+    it reads, the style file and the doc arguments. If nothing changed the
+    cached outputs are restored and the calc is not evaluated. cacheS set
+    to "nocache" forces a rebuild.
+
     """
     global utfcalcS, rstcalcS, _rstflagB
 
-    if doctypeS == "dev":
+    _init_calc()
+    typeL = _doc_types(doctypeS)
+    if not typeL or typeL == {"dev"}:
         return
+    cnameS = _foldD.cnameS
+    dpath0P = _foldD["dpath0"]
+    if "report" in typeL:
+        gen_report()
+    for typeS in typeL - {"dev", "utf8", "rst", "tex", "pdf", "html", "report"}:
+        print("INFO: doc type not recognized: " + typeS)
 
-    f1 = open(_cfull, "r")
+    f1 = open(_foldD["cfull"], "r")
     utfcalcL = f1.readlines()
     f1.close()
-    print("INFO calc file read: " + str(_cfull))
+    print("INFO calc file read: " + str(_foldD["cfull"]))
 
     indx = 0  # skip D() in calc list - avoid recursion
     for iS in enumerate(utfcalcL):
         if "rv.D" in iS[1]:
             indx = int(iS[0])
             break
-    rstcalcL = utfcalcL = utfcalcL[0:indx] + utfcalcL[indx + 1:]
+    utfcalcL = utfcalcL[0:indx] + utfcalcL[indx + 1:]
     cmdS = "".join(utfcalcL)
 
-    exprtfile = Path(_cpathcur / ".".join([_cnameS, "csv"]))
+    outL = _doc_files(typeL)
+    cacheO = _rv_cache.BuildCache(Path(dpath0P / "rvcache"))
+    keyS = cacheO.key(
+        _doc_inputs(cmdS, stylefileS),
+        [sorted(typeL), stylefileS, calctitleS, startpageS],
+    )
+    if cacheS == "cache" and cacheO.restore(keyS) is not None:
+        if "utf8" in typeL:
+            with open(outL[1], "r", encoding="UTF-8") as f1:
+                print(f1.read())
+        print("INFO: calc unchanged - docs restored from build cache")
+        print("INFO: program complete")
+        sys.exit(0)
+
+    _rv_pipe.reset()
+    docL = ["rst", "tex", "pdf", "html"]
+    _rstflagB = bool(typeL.intersection(docL))
+
+    # stream docs to files as the calc is evaluated
+    utfcalcS = OutBuf(outL[1] if "utf8" in typeL else None)
+    rstcalcS = OutBuf(Path(dpath0P / ".".join([cnameS, "rst"]))
+                      if _rstflagB else None)
+    rstcalcS += _rv_rst.TEXROLE
+    rivtcalcD.deps.restart()  # reuse assignments evaluated before D()
+    with _rv_pipe.stage("evaluate"):
+        try:
+            exec(cmdS, globals(), locals())  # evaluate calc once for all docs
+        except BaseException:  # keep docs of the last good run
+            utfcalcS.discard()
+            rstcalcS.discard()
+            raise
+
+    if _rstflagB and clrS == "clr":  # delete old temp files
+        fileL = [
+            Path(dpath0P, ".".join([cnameS, "pdf"])),
+            Path(dpath0P, ".".join([cnameS, "html"])),
+            Path(dpath0P, ".".join([cnameS, "rst"])),
+            Path(dpath0P, ".".join([cnameS, "tex"])),
+            Path(dpath0P, ".".join([cnameS, ".aux"])),
+            Path(dpath0P, ".".join([cnameS, ".out"])),
+            Path(dpath0P, ".".join([cnameS, ".fls"])),
+            Path(dpath0P, ".".join([cnameS, ".fdb_latexmk"])),
+        ]
+        for f in fileL:
+            try:
+                os.remove(f)
+            except:
+                pass
+        print("INFO: temporary Tex files deleted \n", flush=True)
+
+    exprtfile = Path(_foldD["cpathcur"] / ".".join([cnameS, "csv"]))
     str1 = """header string\n"""  # write values file
     str1 = str1 + exportS
     with open(exprtfile, "w") as expF:
         expF.write(str1)
     print("INFO  values file written to calc folder", flush=True)
 
-    if doctypeS == "utf8":
-        gen_utf8(cmdS, stylefileS, calctitleS)
-
-    elif doctypeS == "tex" or doctypeS == "pdf" or doctypeS == "html":
-        if clrS == "clr":  # delete temp files
-            fileL = [
-                Path(_dpath0, ".".join([_cnameS, "pdf"])),
-                Path(_dpath0, ".".join([_cnameS, "html"])),
-                Path(_dpath0, ".".join([_cnameS, "rst"])),
-                Path(_dpath0, ".".join([_cnameS, "tex"])),
-                Path(_dpath0, ".".join([_cnameS, ".aux"])),
-                Path(_dpath0, ".".join([_cnameS, ".out"])),
-                Path(_dpath0, ".".join([_cnameS, ".fls"])),
-                Path(_dpath0, ".".join([_cnameS, ".fdb_latexmk"])),
-            ]
-            os.chdir(_dpath0)
-            tmpS = os.getcwd()
-            if tmpS == str(_dpath0):
-                for f in fileL:
-                    try:
-                        os.remove(f)
-                    except:
-                        pass
-                time.sleep(1)
-            print("INFO: temporary Tex files deleted \n", flush=True)
-        gen_rst(cmdS, doctypeS, stylefileS, calctitleS, startpageS)
-
-    elif doctypeS == "report":
-        gen_report()
-
+    if "utf8" in typeL:
+        with _rv_pipe.stage("utf8"):
+            gen_utf8("default")
+    if _rstflagB:
+        with _rv_pipe.stage("rst"):
+            gen_rst()
+    docB = True  # html and tex docs written
+    if "html" in typeL:
+        with _rv_pipe.stage("html"):
+            docB = gen_html(stylefileS)
+    if "tex" in typeL or "pdf" in typeL:
+        with _rv_pipe.stage("tex"):
+            texfileP = gen_tex(stylefileS, calctitleS, startpageS)
+        docB = docB and texfileP is not None
+        if "pdf" in typeL and texfileP is not None:
+            with _rv_pipe.stage("pdf"):
+                gen_pdf(texfileP, (str(cacheO.cacheP), keyS, outL))
+    if docB:
+        with _rv_pipe.stage("build cache"):
+            cacheO.store(keyS, outL)
     else:
-        pass
+        print("INFO: docs not written - build cache not updated")
+    logging.info(_rv_pipe.report())
+    logging.info(rivtcalcD.deps.report())
+    logging.info(_rv_lazy.load_report())
+    print("INFO: program complete")
+
+    sys.exit(0 if docB else 1)  # calc was run by exec - skip remainder
@@ -0,0 +1,173 @@
+#! python
+"""converts reST calcs to LaTeX and HTML with docutils
+
+The conversion runs in the calc process through the docutils publisher
+instead of a new interpreter running scripts/rst2xetex.py or rst2html.py.
+Writer settings are built once for each writer and stylesheet and copied
+for each calc, writers are reused, and an embedded stylesheet is read once
+and kept until the file changes. A batch build converts every calc in its
+worker processes.
+
+The LaTeX translator writes the calc specific parts of the tex file: the
+calc title in the page header of the style file, the calc number for
+x*x*x in the style file and the first page number. Inline LaTeX from tags
+(the tex role) is written without a class wrapper so that environments
+may open and close in different roles."""
+
+import os
+import copy
+import logging
+from pathlib import Path
+from rivtcalc.rv_lazy import LazyModule
+
+_core = LazyModule("docutils.core", "tex and html docs")
+_nodes = LazyModule("docutils.nodes", "tex doc")
+_html = LazyModule("docutils.writers.html4css1", "html doc")
+_xetex = LazyModule("docutils.writers.xetex", "tex doc")
+
+_settingsD = {}  # (writer, options): docutils settings
+_writerD = {}  # writer name: writer
+_styleD = {}  # (translator, stylesheet): (mtime, embedded text)
+
+
+class _StyleCache:
+    """translator mixin keeping embedded stylesheets in memory"""
+
+    def stylesheet_call(self, path, *argL, **argD):
+        if not self.settings.embed_stylesheet:
+            return super().stylesheet_call(path, *argL, **argD)
+        keyT = (type(self).__name__, str(path))
+        try:
+            mtimeI = os.stat(path).st_mtime_ns
+        except OSError:  # missing file - docutils reports the error
+            return super().stylesheet_call(path, *argL, **argD)
+        hitT = _styleD.get(keyT)
+        if hitT is None or hitT[0] != mtimeI:
+            hitT = (mtimeI, super().stylesheet_call(path, *argL, **argD))
+            _styleD[keyT] = hitT
+
+        return hitT[1]
+
+
+class _CalcTex:
+    """LaTeX translator mixin for calc header, page and inline LaTeX"""
+
+    def __init__(self, document, *argL, **argD):
+        super().__init__(document, *argL, **argD)
+        pageS = getattr(self.settings, "start_page", "")
+        if pageS:
+            self.body_pre_docinfo.insert(
+                0, "\\setcounter{page}{" + pageS + "}\n")
+
+    def stylesheet_call(self, path, *argL, **argD):
+        styleS = super().stylesheet_call(path, *argL, **argD)
+        titleS = getattr(self.settings, "calc_title", None)
+        if titleS is not None:
+            styleS = styleS.replace(
+                "\\fancyhead[L]{\\leftmark}",
+                "\\fancyhead[L]{\\normalsize  " + titleS + "}")
+
+        return styleS.replace(
+            "x*x*x", getattr(self.settings, "calc_number", "x*x*x"))
+
+    def visit_raw(self, node):
+        if self.is_inline(node) and "latex" in node.get("format", "").split():
+            self.out.append(node.astext())  # tex role
+            raise _nodes.SkipNode
+        super().visit_raw(node)
+
+
+def _writer(nameS: str):
+    writerO = _writerD.get(nameS)
+    if writerO is not None:
+        return writerO
+    if nameS == "xetex":
+        class Translator(_CalcTex, _StyleCache, _xetex.XeLaTeXTranslator):
+            pass
+        writerO = _xetex.Writer()
+    else:
+        class Translator(_StyleCache, _html.HTMLTranslator):
+            pass
+        writerO = _html.Writer()
+    writerO.translator_class = Translator
+    _writerD[nameS] = writerO
+
+    return writerO
+
+
+def _settings(nameS: str, optD: dict):
+    keyT = (nameS, tuple(sorted(optD.items())))
+    settingsO = _settingsD.get(keyT)
+    if settingsO is None:
+        pubO = _core.Publisher(writer=_writer(nameS))
+        pubO.set_components("standalone", "restructuredtext", None)
+        settingsO = pubO.get_settings(**{
+            keyS: list(valO) if isinstance(valO, tuple) else valO
+            for keyS, valO in optD.items()})
+        _settingsD[keyT] = settingsO
+
+    return copy.deepcopy(settingsO)
+
+
+def _publish(nameS: str, rstP: Path, outP: Path, optD: dict,
+             calcD: dict = None) -> int:
+    settingsO = _settings(nameS, optD)
+    for keyS, valS in (calcD or {}).items():
+        setattr(settingsO, keyS, valS)  # read by the translator
+    try:
+        _core.publish_file(
+            source_path=str(rstP),
+            destination_path=str(outP),
+            writer=_writer(nameS),
+            settings=settingsO,
+        )
+    except SystemExit as exitO:  # docutils exits on severe errors
+        logging.warning("docutils " + nameS + " error: " + str(rstP))
+        return exitO.code if isinstance(exitO.code, int) else 1
+
+    return 0
+
+
+def rst2tex(rstP: Path, texP: Path, styleP: Path, titleS: str = None,
+            pageS: str = "", fnumS: str = "") -> int:
+    """write XeLaTeX file from reST file
+
+    Args:
+        rstP (Path): reST calc
+        texP (Path): tex file
+        styleP (Path): LaTeX style file, embedded in the tex file
+        titleS (str): calc title in the page header
+        pageS (str): first page number
+        fnumS (str): calc number for x*x*x in the style file
+
+    Returns:
+        int: 0 if the tex file was written
+    """
+    optD = {
+        "embed_stylesheet": True,
+        "documentclass": "report",
+        "documentoptions": "12pt,notitle,letterpaper",
+        "stylesheet": (str(styleP),),
+        "stylesheet_path": (),
+    }
+    calcD = {"calc_title": titleS, "start_page": pageS, "calc_number": fnumS}
+    return _publish("xetex", rstP, texP, optD, calcD)
+
+
+def rst2html(rstP: Path, htmlP: Path, styleP: Path) -> int:
+    """write HTML file from reST file
+
+    Args:
+        rstP (Path): reST calc
+        htmlP (Path): html file
+        styleP (Path): css file, embedded in the html file
+
+    Returns:
+        int: 0 if the html file was written
+    """
+    optD = {
+        "embed_stylesheet": True,
+        "stylesheet": (str(styleP),),
+        "stylesheet_path": (),
+    }
+    return _publish("html", rstP, htmlP, optD)
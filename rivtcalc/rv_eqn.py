@@ -0,0 +1,273 @@
+#! python
+"""renders simple equations without sympy
+
+Most V() equations are arithmetic on calc variables, such as M = w*L**2/8.
+They are parsed with the ast module and laid out as two dimensional UTF text
+and LaTeX in the same style as the sympy printers: subscripted digits, ⋅ for
+products, stacked fractions and raised exponents. Terms are written in
+source order.
+
+Supported are variable names, numbers, +, -, *, /, **, parentheses, sqrt of
+a one letter name and the trig functions. Products and quotients are
+flattened into one fraction; a quotient or reciprocal in a denominator,
+which sympy draws as a nested fraction, is not supported. Other expressions,
+and names that sympy prints as symbols (greek letters, pi, E, I ...),
+return None and are rendered by sympy."""
+
+import re
+import ast
+
+VERSION = 2  # changes to the layout invalidate cached renderings
+
+_ADD, _MUL, _POW, _ATOM = 1, 2, 3, 4  # precedence
+_SUBT = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
+_namergx = re.compile(r"^([A-Za-z]+)([0-9]*)$")
+_FUNCL = ("sin", "cos", "tan", "sinh", "cosh", "tanh")
+_SKIPL = (  # names with a sympy meaning or symbol
+    "alpha beta gamma delta epsilon zeta eta theta iota kappa lamda lambda "
+    "mu nu xi omicron pi rho sigma tau upsilon phi chi psi omega "
+    "E I N O Q S oo nan zoo").split()
+_MODL = (  # sympy symbol name modifiers
+    "mathring ddddot dddot ddot dot check breve acute grave tilde hat bar "
+    "vec prime prm bold bm abs norm avg").split()
+
+
+class _Skip(Exception):
+    """expression is outside the fast path subset"""
+
+
+class _Pict:
+    """block of text lines with a baseline"""
+
+    __slots__ = ("lineL", "baseI")
+
+    def __init__(self, lineL: list, baseI: int = 0):
+        self.lineL = lineL
+        self.baseI = baseI
+
+    @property
+    def width(self) -> int:
+        return len(self.lineL[0])
+
+    def __str__(self):
+        return "\n".join(self.lineL)
+
+
+def _hcat(*pictL) -> _Pict:
+    """join pictures left to right on a common baseline"""
+    upI = max(i.baseI for i in pictL)
+    downI = max(len(i.lineL) - i.baseI for i in pictL)
+    lineL = [""] * (upI + downI)
+    for pictO in pictL:
+        padS = " " * pictO.width
+        topI = upI - pictO.baseI
+        for i in range(len(lineL)):
+            j = i - topI
+            lineL[i] += pictO.lineL[j] if 0 <= j < len(pictO.lineL) else padS
+    return _Pict(lineL, upI)
+
+
+def _center(pictO: _Pict, widthI: int) -> list:
+    leftI = (widthI - pictO.width) // 2
+    rightI = widthI - pictO.width - leftI
+    return [" " * leftI + i + " " * rightI for i in pictO.lineL]
+
+
+def _frac(numO: _Pict, denO: _Pict) -> _Pict:
+    """stack numerator over denominator"""
+    widthI = max(numO.width, denO.width)
+    lineL = _center(numO, widthI) + ["─" * widthI] + _center(denO, widthI)
+    return _Pict(lineL, len(numO.lineL))
+
+
+def _power(baseO: _Pict, expO: _Pict) -> _Pict:
+    """raise exponent above the end of the base"""
+    lineL = [" " * baseO.width + i for i in expO.lineL]
+    lineL += [i + " " * expO.width for i in baseO.lineL]
+    return _Pict(lineL, len(expO.lineL) + baseO.baseI)
+
+
+def _paren(pictO: _Pict, texS: str) -> tuple:
+    if len(pictO.lineL) > 1:
+        raise _Skip  # sympy draws tall parentheses
+    return (_Pict(["(" + pictO.lineL[0] + ")"]),
+            r"\left(" + texS + r"\right)", _ATOM)
+
+
+def _name(nameS: str) -> tuple:
+    mO = _namergx.match(nameS)
+    if mO is None or nameS in _SKIPL:
+        raise _Skip
+    letS, digS = mO.groups()
+    if letS.lower() in _SKIPL or any(letS.endswith(i) for i in _MODL):
+        raise _Skip
+    if not digS:
+        return _Pict([nameS]), nameS, _ATOM
+    return (_Pict([letS + digS.translate(_SUBT)]),
+            letS + "_{" + digS + "}", _ATOM)
+
+
+def _number(valO) -> tuple:
+    if isinstance(valO, bool) or not isinstance(valO, (int, float)):
+        raise _Skip
+    numS = repr(valO)
+    if not numS.replace(".", "").isdigit():
+        raise _Skip  # exponent, inf or nan
+    return _Pict([numS]), numS, _ATOM
+
+
+def _factors(nodeO, numL: list, denL: list, divB: bool = False):
+    """flatten a product and quotient into numerator and denominator"""
+    if isinstance(nodeO, ast.BinOp) and isinstance(nodeO.op, ast.Mult):
+        _factors(nodeO.left, numL, denL, divB)
+        _factors(nodeO.right, numL, denL, divB)
+    elif isinstance(nodeO, ast.BinOp) and isinstance(nodeO.op, ast.Div):
+        if divB:
+            raise _Skip  # sympy draws a fraction in the denominator
+        _factors(nodeO.left, numL, denL, divB)
+        _factors(nodeO.right, numL, denL, not divB)
+    else:
+        if (isinstance(nodeO, ast.BinOp) and isinstance(nodeO.op, ast.Pow)
+                and isinstance(nodeO.right, ast.UnaryOp)):
+            raise _Skip  # reciprocal in a quotient
+        (denL if divB else numL).append(nodeO)
+
+
+def _product(nodeL: list, fracB: bool) -> tuple:
+    """render factors joined with ⋅"""
+    if not nodeL:
+        return _Pict(["1"]), "1", _ATOM
+    outL = [_expr(i) for i in nodeL]
+    if len(outL) == 1 and fracB:
+        return outL[0]  # lone factor of a fraction needs no parentheses
+    pictL, texL = [], []
+    for i, (pictO, texS, precI) in enumerate(outL):
+        if isinstance(nodeL[i], ast.UnaryOp):
+            if i > 0:
+                raise _Skip  # sympy prints a⋅-b
+        elif precI <= _ADD:
+            pictO, texS, precI = _paren(pictO, texS)
+        if i > 0:
+            pictL.append(_Pict(["⋅"]))
+        pictL.append(pictO)
+        texL.append(texS)
+    return _hcat(*pictL), r" \cdot ".join(texL), _MUL
+
+
+def _expr(nodeO) -> tuple:
+    """return (picture, LaTeX, precedence) of an expression node"""
+    if isinstance(nodeO, ast.Name):
+        return _name(nodeO.id)
+    if isinstance(nodeO, ast.Constant):
+        return _number(nodeO.value)
+    if isinstance(nodeO, ast.UnaryOp) and isinstance(nodeO.op, ast.USub):
+        if isinstance(nodeO.operand, ast.UnaryOp):
+            raise _Skip
+        pictO, texS, precI = _expr(nodeO.operand)
+        if precI <= _ADD:
+            pictO, texS, precI = _paren(pictO, texS)
+        return _hcat(_Pict(["-"]), pictO), "- " + texS, _ADD
+    if isinstance(nodeO, ast.BinOp):
+        opO = nodeO.op
+        if isinstance(opO, (ast.Add, ast.Sub)):
+            leftT = _expr(nodeO.left)
+            if isinstance(nodeO.right, ast.UnaryOp):
+                raise _Skip  # sympy prints a + -b as a - b
+            pictO, texS, precI = _expr(nodeO.right)
+            if isinstance(opO, ast.Sub) and precI <= _ADD:
+                pictO, texS, precI = _paren(pictO, texS)
+            opS = " + " if isinstance(opO, ast.Add) else " - "
+            return (_hcat(leftT[0], _Pict([opS]), pictO),
+                    leftT[1] + opS + texS, _ADD)
+        if isinstance(opO, (ast.Mult, ast.Div)):
+            numL, denL = [], []
+            _factors(nodeO, numL, denL)
+            if not denL:
+                return _product(numL, False)
+            numT = _product(numL, True)
+            denT = _product(denL, True)
+            if numT[2] == _ADD and isinstance(numL[0], ast.UnaryOp):
+                raise _Skip  # sympy moves the sign out of the fraction
+            return (_frac(numT[0], denT[0]),
+                    r"\frac{" + numT[1] + "}{" + denT[1] + "}", _MUL)
+        if isinstance(opO, ast.Pow):
+            if isinstance(nodeO.left, ast.Call):
+                raise _Skip  # sympy prints sin²(a)
+            pictO, texS, precI = _expr(nodeO.left)
+            if precI < _ATOM:
+                pictO, texS, precI = _paren(pictO, texS)
+            for subO in ast.walk(nodeO.right):
+                if isinstance(subO, (ast.UnaryOp, ast.Div, ast.Pow)):
+                    raise _Skip  # sympy prints roots and reciprocals
+            expT = _expr(nodeO.right)
+            return (_power(pictO, expT[0]),
+                    texS + "^{" + expT[1] + "}", _POW)
+    if isinstance(nodeO, ast.Call) and isinstance(nodeO.func, ast.Name):
+        if nodeO.keywords or len(nodeO.args) != 1:
+            raise _Skip
+        funcS = nodeO.func.id
+        argO = nodeO.args[0]
+        if funcS == "sqrt":
+            if not (isinstance(argO, ast.Name) and len(argO.id) == 1):
+                raise _Skip  # sympy draws a radical over longer arguments
+            _name(argO.id)
+            return _Pict(["√" + argO.id]), r"\sqrt{" + argO.id + "}", _ATOM
+        if funcS in _FUNCL:
+            pictO, texS, precI = _expr(argO)
+            if len(pictO.lineL) > 1:
+                raise _Skip
+            return (_Pict([funcS + "(" + pictO.lineL[0] + ")"]),
+                    "\\" + funcS + r"{\left(" + texS + r" \right)}", _ATOM)
+    raise _Skip
+
+
+def _parse(srcS: str):
+    try:
+        return ast.parse(srcS.strip(), mode="eval").body
+    except SyntaxError:
+        raise _Skip
+
+
+def render(varS: str, valS: str) -> tuple:
+    """return UTF and LaTeX layout of an equation
+
+    Args:
+        varS (str): variable
+        valS (str): expression
+
+    Returns:
+        tuple: (pretty string, LaTeX string), None if the equation is
+            outside the supported subset
+    """
+    try:
+        varO = _parse(varS)
+        if not isinstance(varO, ast.Name):
+            return None
+        varT = _expr(varO)
+        valT = _expr(_parse(valS))
+    except (_Skip, RecursionError):
+        return None
+    pictO = _hcat(varT[0], _Pict([" = "]), valT[0])
+
+    return str(pictO), varT[1] + " = " + valT[1]
+
+
+def names(valS: str) -> tuple:
+    """return variable names of an expression in the supported subset
+
+    Args:
+        valS (str): expression
+
+    Returns:
+        tuple: sorted names, None if the expression is not supported
+    """
+    try:
+        nodeO = _parse(valS)
+        _expr(nodeO)
+    except (_Skip, RecursionError):
+        return None
+    funcS = {id(i.func) for i in ast.walk(nodeO) if isinstance(i, ast.Call)}
+    nameS = {i.id for i in ast.walk(nodeO)
+             if isinstance(i, ast.Name) and id(i) not in funcS}
+
+    return tuple(sorted(nameS))
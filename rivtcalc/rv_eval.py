@@ -0,0 +1,565 @@
+#! python
+"""evaluates value-string assignments
+
+Each assignment is compiled once to a code object and evaluated once into
+the calc namespace. The values written to the calc are derived from that
+single result, so the right hand side (and any side effect in it) runs once.
+
+The calc namespace is a Namespace object wrapping one dictionary seeded with
+the numpy functions, the units and unum helpers that value-strings use and
+the modules available to table-strings (plt, sp, pd, la, csv, Path ...),
+with the heavy modules as rv_lazy proxies. It is
+passed explicitly to exec and eval; names written by each statement are
+recorded as a delta, so the cost per line does not depend on the number of
+calc variables.
+
+Each namespace has a DepGraph that records, per assignment, the variables it
+reads. The graph, the values and the formatted results are saved after a
+run. In the next run an assignment whose text and inputs are unchanged is
+not evaluated or formatted again; its value and text come from the previous
+run, so only assignments downstream of an edit are recomputed.
+
+Compiled code is also saved to the calc __pycache__ folder, keyed by source
+text, compile mode and Python version, so later runs of the calc do not
+compile rivt expressions again."""
+
+import io
+import os
+import re
+import sys
+import csv
+import atexit
+import logging
+import tempfile
+import textwrap
+import types
+import subprocess
+import pickle
+import marshal
+import hashlib
+import builtins
+import functools
+import importlib.util
+import numpy
+import numpy.linalg
+from pathlib import Path
+import rivtcalc.rv_unit as _rv_unit
+import rivtcalc.rv_lazy as _rv_lazy
+from rivtcalc.rv_unit import Unum, QArray, qarray
+
+_codeD = {}  # (source, mode): code object
+_usedD = {}  # code used since the cache file was loaded
+_cacheL = [None, False]  # [code cache file, unsaved code flag]
+_baseD = {}  # names in every calc namespace
+_graphL = [None]  # dependency graph saved at exit
+_FUNCT = (types.FunctionType, types.MethodType, functools.partial)
+_fmtT = (None, None)  # (precision, formatter) last set
+_NONE = object()  # missing name marker
+
+
+def compile_src(srcS: str, modeS: str = "eval"):
+    """return code object for source text, compiled once per process
+
+    Args:
+        srcS (str): Python expression or statement
+        modeS (str): compile mode, "eval" or "exec"
+
+    Returns:
+        code: compiled source
+    """
+    keyT = (srcS, modeS)
+    try:
+        codeO = _codeD[keyT]
+    except KeyError:
+        codeO = _codeD[keyT] = compile(srcS, "<rivt>", modeS)
+        _cacheL[1] = True
+    if keyT not in _usedD:
+        _usedD[keyT] = codeO
+        _cacheL[1] = True
+
+    return codeO
+
+
+def cache_file(calcP: Path) -> Path:
+    """return code cache file for a calc
+
+    Args:
+        calcP (Path): calc file
+
+    Returns:
+        Path: __pycache__/<calc name>.<python tag>.rvc in the calc folder
+    """
+    nameS = ".".join([calcP.stem, sys.implementation.cache_tag, "rvc"])
+
+    return Path(calcP.parent, "__pycache__", nameS)
+
+
+def load_cache(fileP: Path):
+    """read compiled code saved by an earlier run
+
+    Code used with the previous cache file is saved first. A cache written
+    by another Python version is ignored.
+
+    Args:
+        fileP (Path): code cache file
+    """
+    save_cache()
+    if _cacheL[0] is None:
+        atexit.register(save_cache)
+    _cacheL[:] = [Path(fileP), False]
+    _usedD.clear()
+    try:
+        with open(fileP, "rb") as f1:
+            magicB = f1.read(len(importlib.util.MAGIC_NUMBER))
+            if magicB != importlib.util.MAGIC_NUMBER:
+                return
+            codeD = marshal.load(f1)
+    except (OSError, EOFError, ValueError, TypeError):
+        return
+    for keyT, codeO in codeD.items():
+        _codeD.setdefault(keyT, codeO)
+    _usedD.update(codeD)
+
+
+def save_cache():
+    """write code used in this run to the code cache file
+
+    Only code used since the cache was loaded (or kept from the file) is
+    written, and only if new code was compiled.
+    """
+    fileP, newB = _cacheL
+    if fileP is None or not newB:
+        return
+    try:
+        os.makedirs(fileP.parent, exist_ok=True)
+        tmpP = fileP.with_suffix(".tmp")
+        with open(tmpP, "wb") as f1:
+            f1.write(importlib.util.MAGIC_NUMBER)
+            marshal.dump(_usedD, f1)
+        os.replace(tmpP, fileP)
+    except (OSError, ValueError):
+        return
+    _cacheL[1] = False
+
+
+def _tabulate(*argL, **argD):
+    """tabulate.tabulate for table-strings, loaded on first call"""
+    return _rv_lazy.tab.tabulate(*argL, **argD)
+
+
+def namespace() -> dict:
+    """return a new calc namespace dictionary
+
+    The namespace holds the numpy names, the rv_unit units, Unum, QArray,
+    qarray and unum (unum.utils), and the modules and names table-strings
+    use: os, sys, csv, re, io, textwrap, subprocess, tempfile, logging,
+    Path, StringIO, la (numpy.linalg), tabulate and the lazy sp, plt, mpimg,
+    htm and pd modules. Calc values are added to it.
+
+    Returns:
+        dict: calc namespace
+    """
+    if not _baseD:
+        _baseD["__builtins__"] = builtins
+        for nameS in numpy.__all__:
+            if hasattr(numpy, nameS):
+                _baseD[nameS] = getattr(numpy, nameS)
+        for nameS, valO in vars(_rv_unit).items():
+            if not nameS.startswith("_"):
+                _baseD[nameS] = valO
+        _baseD["unum"] = sys.modules["unum.utils"]
+        for modO in (os, sys, csv, re, io, textwrap, subprocess, tempfile,
+                     logging):
+            _baseD[modO.__name__] = modO
+        _baseD.update(
+            Path=Path, StringIO=io.StringIO, la=numpy.linalg,
+            tabulate=_tabulate, sp=_rv_lazy.sp, plt=_rv_lazy.plt,
+            mpimg=_rv_lazy.mpimg, htm=_rv_lazy.htm, pd=_rv_lazy.pd)
+
+    return dict(_baseD)
+
+
+def set_precision(precI: int):
+    """set numpy and unum display precision if it changed
+
+    Args:
+        precI (int): digits after the decimal point
+    """
+    global _fmtT
+
+    if _fmtT == (precI, Unum.formatter):
+        return
+    numpy.set_printoptions(precision=precI)
+    Unum.formatter.configure(value_format="%." + str(precI) + "f")
+    _fmtT = (precI, Unum.formatter)
+
+
+def fingerprint(valO) -> str:
+    """return hash of a pickled value
+
+    Functions are pickled by name, so an edited function would have the
+    same hash; they get no fingerprint.
+
+    Args:
+        valO (object): value
+
+    Returns:
+        str: hex digest, None if the value is a function or can not be
+        pickled
+    """
+    if isinstance(valO, _FUNCT):
+        return None
+    try:
+        return hashlib.sha1(pickle.dumps(valO, 4)).hexdigest()
+    except Exception:
+        return None
+
+
+def _save_graph():
+    if _graphL[0] is not None:
+        _graphL[0].save()
+
+
+class DepGraph:
+    """assignment dependency graph with results from the previous run
+
+    Nodes are keyed by (variable, n) where n counts earlier assignments to
+    the variable in the run. Each node holds the assignment text, the calc
+    variables it reads, the pickled value and the formatted results.
+    """
+
+    def __init__(self):
+        """empty graph"""
+        self.nodeD = {}  # nodes of this run
+        self.prevD = {}  # nodes of the previous run
+        self.cleanS = set()  # variables with the same value as last run
+        self.ownS = set()  # variables last written by an assignment
+        self.extD = {}  # fingerprints of other variables read this run
+        self.countD = {}  # assignments per variable in this run
+        self.fileP = None
+        self.reuseI = 0
+
+    def load(self, fileP: Path, stampS: str = ""):
+        """read the graph saved by the previous run
+
+        The graph becomes the one saved at exit. The graph loaded before it
+        (the previous calc in a batch worker) is saved and released.
+
+        Args:
+            fileP (Path): graph file
+            stampS (str): code version; a graph with another stamp is ignored
+        """
+        if _graphL[0] is None:
+            atexit.register(_save_graph)
+        elif _graphL[0] is not self:
+            _graphL[0].save()
+        _graphL[0] = self
+        self.fileP = Path(fileP)
+        self.stampS = stampS
+        try:
+            with open(self.fileP, "rb") as f1:
+                stampS, prevD = pickle.load(f1)
+        except Exception:
+            return
+        if stampS == self.stampS:
+            self.prevD = prevD
+
+    def save(self):
+        """write the graph of this run"""
+        if self.fileP is None or not self.nodeD:
+            return
+        try:
+            os.makedirs(self.fileP.parent, exist_ok=True)
+            tmpP = self.fileP.with_suffix(".tmp")
+            with open(tmpP, "wb") as f1:
+                pickle.dump((self.stampS, self.nodeD), f1, 4)
+            os.replace(tmpP, self.fileP)
+        except Exception:
+            return
+
+    def restart(self):
+        """start another evaluation of the calc in this process
+
+        Nodes of the current evaluation become the previous run.
+        """
+        if self.nodeD:
+            self.prevD = self.nodeD
+        self.nodeD = {}
+        self.cleanS, self.ownS = set(), set()
+        self.extD, self.countD = {}, {}
+        self.reuseI = 0
+
+    def sync(self, nsO):
+        """mark variables written outside of assignments as changed
+
+        Args:
+            nsO (Namespace): calc namespace
+        """
+        for nameS in nsO.delta():
+            self.cleanS.discard(nameS)
+            self.ownS.discard(nameS)
+            self.extD.pop(nameS, None)
+
+    def reads(self, nsO, srcL: list) -> tuple:
+        """return calc variables read by expressions
+
+        Args:
+            nsO (Namespace): calc namespace
+            srcL (list): expressions
+
+        Returns:
+            tuple: sorted variable names
+        """
+        nameS = set()
+        for srcS in srcL:
+            try:
+                nameS.update(compile_src(srcS.strip()).co_names)
+            except SyntaxError:
+                continue  # empty or not an expression (units "-")
+        return tuple(sorted(n for n in nameS if nsO.is_var(n)))
+
+    def _ext(self, nsO, nameS: str) -> str:
+        try:
+            return self.extD[nameS]
+        except KeyError:
+            fpS = self.extD[nameS] = fingerprint(nsO.get(nameS))
+            return fpS
+
+    def key(self, varS: str) -> tuple:
+        """return node key for the next assignment to a variable
+
+        Args:
+            varS (str): variable name
+
+        Returns:
+            tuple: (variable, n)
+        """
+        nI = self.countD.get(varS, 0)
+        self.countD[varS] = nI + 1
+        return (varS, nI)
+
+    def lookup(self, nsO, keyT: tuple, srcS: str, readT: tuple):
+        """return previous node if the assignment and its inputs are unchanged
+
+        Args:
+            nsO (Namespace): calc namespace
+            keyT (tuple): node key
+            srcS (str): assignment text and format settings
+            readT (tuple): variables read
+
+        Returns:
+            dict: previous node or None
+        """
+        self.sync(nsO)
+        prevD = self.prevD.get(keyT)
+        if prevD is None or prevD["srcS"] != srcS or prevD["readT"] != readT:
+            return None
+        for nameS in readT:
+            if nameS in self.cleanS:
+                continue
+            if nameS in self.ownS:
+                return None  # recomputed with a new value
+            fpS = self._ext(nsO, nameS)
+            if fpS is None or fpS != prevD["extD"].get(nameS):
+                return None  # changed, or no fingerprint to compare
+        try:
+            valO = pickle.loads(prevD["valB"])
+        except Exception:
+            return None
+        self.reuseI += 1
+        return dict(prevD, valO=valO)
+
+    def record(self, nsO, keyT, srcS, readT, valO, resD, textS, reuseB):
+        """add an assignment to the graph
+
+        Args:
+            nsO (Namespace): calc namespace
+            keyT (tuple): node key
+            srcS (str): assignment text and format settings
+            readT (tuple): variables read
+            valO (object): assigned value
+            resD (dict): formatted results
+            textS (str): formatted text
+            reuseB (bool): value was taken from the previous run
+        """
+        varS = keyT[0]
+        prevD = self.prevD.get(keyT)
+        fpS = prevD["fpS"] if reuseB else fingerprint(valO)
+        extD = {n: self._ext(nsO, n) for n in readT if n not in self.ownS}
+        try:
+            valB = prevD["valB"] if reuseB else pickle.dumps(valO, 4)
+            pickle.dumps(resD, 4)
+        except Exception:
+            valB, resD = None, {}
+        self.nodeD[keyT] = {
+            "srcS": srcS, "readT": readT, "valB": valB, "fpS": fpS,
+            "extD": extD, "resD": resD, "textS": textS}
+        nsO.delta()  # the assignment's own write
+        self.ownS.add(varS)
+        if fpS is not None and prevD is not None and prevD["fpS"] == fpS:
+            self.cleanS.add(varS)  # same value - downstream is unchanged
+        else:
+            self.cleanS.discard(varS)
+
+    def downstream(self, nameS: str) -> set:
+        """return variables that depend on a variable
+
+        Args:
+            nameS (str): variable name
+
+        Returns:
+            set: variable names that read nameS directly or indirectly
+        """
+        nodeD = self.nodeD or self.prevD
+        outS, todoL = set(), [nameS]
+        while todoL:
+            readS = todoL.pop()
+            for keyT, nodD in nodeD.items():
+                if readS in nodD["readT"] and keyT[0] not in outS:
+                    outS.add(keyT[0])
+                    todoL.append(keyT[0])
+        return outS
+
+    def report(self) -> str:
+        """return count of reused and evaluated assignments"""
+        return "assignments reused: {}   evaluated: {}".format(
+            self.reuseI, len(self.nodeD) - self.reuseI)
+
+
+class Namespace:
+    """calc namespace with tracked writes"""
+
+    def __init__(self):
+        """new namespace seeded with numpy, units and unum names"""
+        self.nsD = namespace()
+        self.deltaD = {}  # name: value written since last delta()
+        self.deps = DepGraph()
+
+    def eval(self, srcS: str):
+        """return value of an expression
+
+        Args:
+            srcS (str): Python expression
+
+        Returns:
+            object: expression value
+        """
+        return eval(compile_src(srcS.strip()), self.nsD)
+
+    def exec(self, srcS: str):
+        """execute statements and record the names they write
+
+        Only the names in the compiled code are checked, so the cost does
+        not grow with the namespace.
+
+        Args:
+            srcS (str): Python statements
+        """
+        codeO = compile_src(srcS.strip(), "exec")
+        nsD = self.nsD
+        nameT = codeO.co_names
+        oldL = [nsD.get(nameS, _NONE) for nameS in nameT]
+        exec(codeO, nsD)
+        for nameS, oldO in zip(nameT, oldL):
+            newO = nsD.get(nameS, _NONE)
+            if newO is not oldO:
+                self.deltaD[nameS] = None if newO is _NONE else newO
+
+    def bind(self, varS: str, valO):
+        """assign a value to a name or target
+
+        Args:
+            varS (str): variable name or assignment target
+            valO (object): value
+        """
+        varS = varS.strip()
+        if varS.isidentifier():
+            self[varS] = valO
+            return
+        self.nsD["_rv_valO"] = valO  # subscript or attribute target
+        self.exec(varS + " = _rv_valO")
+        del self.nsD["_rv_valO"]
+        self.deltaD.pop("_rv_valO", None)
+
+    def delta(self) -> dict:
+        """return names written since the last call and clear the record
+
+        Returns:
+            dict: name: value (None if deleted)
+        """
+        deltaD, self.deltaD = self.deltaD, {}
+        return deltaD
+
+    def is_var(self, nameS: str) -> bool:
+        """return True if name is a calc variable
+
+        Args:
+            nameS (str): name
+
+        Returns:
+            bool: name is in the namespace and is not a seeded name
+        """
+        valO = self.nsD.get(nameS, _NONE)
+        return valO is not _NONE and _baseD.get(nameS, _NONE) is not valO
+
+    def values(self) -> dict:
+        """return calc variables (names not in a new namespace)
+
+        Returns:
+            dict: name: value
+        """
+        return {
+            k: v for k, v in self.nsD.items()
+            if _baseD.get(k, _NONE) is not v and not k.startswith("_")
+        }
+
+    def __getitem__(self, nameS):
+        return self.nsD[nameS]
+
+    def __setitem__(self, nameS, valO):
+        self.nsD[nameS] = valO
+        self.deltaD[nameS] = valO
+
+    def __contains__(self, nameS):
+        return nameS in self.nsD
+
+    def get(self, nameS, default=None):
+        return self.nsD.get(nameS, default)
+
+
+class AssignEngine:
+    """evaluates assignments in a calc namespace"""
+
+    def __init__(self, nsO: Namespace):
+        """engine for a calc namespace
+
+        Args:
+            nsO (Namespace): calc namespace
+        """
+        self.nsO = nsO
+        self.eval = nsO.eval
+
+    def assign(self, varS: str, valS: str, unitS: str = ""):
+        """evaluate an assignment once and bind the result
+
+        Numbers and lists are taken to be in unitS; lists become quantity
+        arrays. Results that already have units are stored unchanged.
+        Without a unit, numbers are stored as unitless Unums.
+
+        Args:
+            varS (str): variable name
+            valS (str): right hand side expression
+            unitS (str): unit expression of numbers, "" for none
+
+        Returns:
+            object: value bound to the variable
+        """
+        valO = self.eval(valS)
+        unitU = self.eval(unitS) if unitS.strip() else None
+        if isinstance(valO, (list, tuple)):
+            valO = qarray(valO, unitU)
+        elif not isinstance(valO, (Unum, QArray)):
+            valO = Unum(valO) if unitU is None else valO * unitU
+        self.nsO.bind(varS, valO)
+
+        return valO
@@ -0,0 +1,85 @@
+#! python
+"""defers loading of heavy libraries
+
+A LazyModule stands in for a module and imports it on the first attribute
+access, so a calc only pays for the libraries its commands and tags use.
+Each load is timed and recorded with its reason and the function that
+triggered it; load_report() formats the record.
+
+Proxies for modules used by more than one rv_ module are defined here once
+and imported by the modules, so each module has one proxy and one reason."""
+
+import sys
+import time
+import importlib
+
+_startF = time.perf_counter()  # rivtcalc import time
+_loadL = []  # [module, load seconds, start offset seconds, reason, caller]
+
+
+class LazyModule:
+    """module proxy imported on first attribute access"""
+
+    def __init__(self, nameS: str, reasonS: str):
+        """proxy for a module
+
+        Args:
+            nameS (str): full module name
+            reasonS (str): commands or tags that use the module
+        """
+        self._nameS = nameS
+        self._reasonS = reasonS
+        self._modO = None
+
+    def _load(self, callerS: str):
+        t1F = time.perf_counter()
+        modO = importlib.import_module(self._nameS)
+        t2F = time.perf_counter()
+        _loadL.append(
+            [self._nameS, t2F - t1F, t1F - _startF, self._reasonS, callerS])
+        self._modO = modO
+
+        return modO
+
+    def __getattr__(self, attrS: str):
+        modO = self._modO
+        if modO is None:
+            modO = self._load(sys._getframe(1).f_code.co_name)
+
+        return getattr(modO, attrS)
+
+    def __repr__(self):
+        stateS = "loaded" if self._modO is not None else "not loaded"
+        return "<lazy module '" + self._nameS + "' (" + stateS + ")>"
+
+
+sp = LazyModule("sympy", "equation, [s]_ and [x]_ tags")
+spabc = LazyModule("sympy.abc", "equation, [s]_ and [x]_ tags")
+plt = LazyModule("matplotlib.pyplot", "table-string plot")
+mpimg = LazyModule("matplotlib.image", "table-string image")
+htm = LazyModule("html2text", "html text file")
+pd = LazyModule("pandas", "xlsx table, table-string")
+tab = LazyModule("tabulate", "table")
+
+
+def load_report() -> str:
+    """return table of deferred modules loaded in this run
+
+    Returns:
+        str: report with load time, start offset, reason and trigger
+    """
+    totalF = time.perf_counter() - _startF
+    hdrS = "{:<24} {:>9} {:>9}  {}".format("module", "load ms", "at ms", "reason")
+    rptL = ["deferred imports", hdrS, "-" * len(hdrS)]
+    for nameS, loadF, atF, reasonS, callerS in _loadL:
+        rptL.append(
+            "{:<24} {:>9.1f} {:>9.1f}  {} ({})".format(
+                nameS, loadF * 1000, atF * 1000, reasonS, callerS))
+    if not _loadL:
+        rptL.append("none")
+    loadF = sum(i[1] for i in _loadL)
+    rptL.append("-" * len(hdrS))
+    rptL.append("deferred load total ms: {:.1f}".format(loadF * 1000))
+    rptL.append("run time since import ms: {:.1f}".format(totalF * 1000))
+
+    return "\n".join(rptL)
@@ -0,0 +1,119 @@
+#! python
+"""parses rivt-strings to node lists
+
+A rivt-string is parsed once into a list of RivtNode tuples that the UTF and
+reST classes both walk. Values computed by the first walk are stored in the
+node result dictionary (resD) and formatted by the second walk, so the calc
+is evaluated once for any number of output formats.
+
+Node kinds ---------------------------------------------------------------------
+    sect      section header (first line of the rivt-string)
+    blank     empty line (ends a value block)
+    tag       line with a []_ tag (argL holds the tag tokens)
+    assign    value-string assignment or equation
+    cmd       || command
+    code      table-string Python statement
+    text      any other line
+"""
+
+import re
+import collections
+
+RivtNode = collections.namedtuple(
+    "RivtNode", ["kindS", "lineS", "argL", "resD"])
+
+_tagrgx = re.compile(r"\[([^\]]+)]_")  # find tags
+_tokrgx = re.compile(r"\[[^\]\s]+\]__?")  # tag tokens, []_ and []__
+
+
+def _node(kindS: str, lineS: str, argL: list = None) -> RivtNode:
+    return RivtNode(kindS, lineS, [] if argL is None else argL, {})
+
+
+def lex_tags(lineS: str) -> tuple:
+    """return tag tokens in a line
+
+    A tag token is a []_ or []__ tag with no white space in the brackets.
+
+    Args:
+        lineS (str): rivt-string line
+
+    Returns:
+        tuple: tags in line order, e.g. ("[e]_",)
+    """
+    if "]_" not in lineS:
+        return ()
+    return tuple(_tokrgx.findall(lineS))
+
+
+def split_tag(lineS: str, tagL, tokT: tuple = None) -> tuple:
+    """return first tag of a line that is in tagL and the line text
+
+    Args:
+        lineS (str): rivt-string line
+        tagL (list): tags valid for the rivt-string type
+        tokT (tuple): tag tokens from lex_tags, lexed if None
+
+    Returns:
+        tuple: (tag, line without the tag and stripped), None if no tag
+    """
+    if tokT is None:
+        tokT = lex_tags(lineS)
+    for tagS in tokT:
+        if tagS in tagL:
+            i = lineS.find(tagS)
+            return tagS, (lineS[:i] + lineS[i + len(tagS):]).strip()
+
+    return None
+
+
+def parse_line(lineS: str, typeS: str):
+    """return node for one rivt-string line
+
+    Args:
+        lineS (str): indented rivt-string line
+        typeS (str): rivt-string type
+
+    Returns:
+        RivtNode: parsed line or None for a comment
+    """
+    if lineS[0:2] == "##":
+        return None  # review comment
+    uS = lineS[4:]  # remove indent
+    if len(uS) == 0:
+        return _node("blank", uS)
+    if uS[0] == "#":
+        return None  # comment
+    if _tagrgx.search(uS):
+        return _node("tag", uS, list(lex_tags(uS)))
+    if typeS == "values" and "=" in uS:
+        vS = uS.rstrip()
+        if vS[-2:] == "||":  # save value to file
+            vS = vS[:-2]
+        return _node("assign", uS, vS.split("|"))
+    if uS[0:2] == "||":
+        return _node("cmd", uS, uS[2:].split("|"))
+    if typeS == "table":
+        return _node("code", uS)
+
+    return _node("text", uS)
+
+
+def parse_rivt(rxS: str, typeS: str) -> list:
+    """return node list for a rivt-string
+
+    Args:
+        rxS (str): rivt-string
+        typeS (str): rivt-string type (repository, insert, values, table)
+
+    Returns:
+        list: RivtNode list, starting with the section node
+    """
+    sectS, strS = rxS.split("\n", 1)
+    nodeL = [_node("sect", sectS)]
+    for lineS in strS.split("\n"):
+        nodeT = parse_line(lineS, typeS)
+        if nodeT is not None:
+            nodeL.append(nodeT)
+
+    return nodeL
@@ -0,0 +1,229 @@
+#! python
+"""runs and times the doc pipeline steps
+
+D() writes docs in stages (evaluate, utf8, rst, html, tex, pdf). Each stage
+is timed with stage() and the times are listed by report(). Files are moved
+with move_file(), which retries with growing delays while another program
+(a pdf viewer or virus scanner) holds the file; the time spent retrying is
+listed in the report.
+
+PDF files are compiled by compile_pdfs from a queue of tex files with up to
+one job per CPU. Each calc is compiled in its own build folder,
+d00_docs/rvbuild/<calc>, with latexmk or, if latexmk is not on the PATH,
+two xelatex passes. The programs run in the d00_docs folder without
+changing the working folder of the calc process. A batch build defers the
+pdf jobs of its calcs with defer_pdf and compiles them together."""
+
+import os
+import time
+import shutil
+import logging
+import subprocess
+import contextlib
+import concurrent.futures
+from pathlib import Path
+
+WAITSEC = 30.0  # longest wait for a locked file
+_stageL = []  # (stage, seconds)
+_waitL = [0.0]  # seconds spent waiting on locked files
+_deferL = [None]  # pdf jobs deferred by a batch build, None to compile
+
+
+def reset():
+    """clear stage times for a new doc build"""
+    _stageL.clear()
+    _waitL[0] = 0.0
+
+
+@contextlib.contextmanager
+def stage(nameS: str):
+    """time a pipeline stage
+
+    Args:
+        nameS (str): stage name in the report
+    """
+    t1F = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stageL.append((nameS, time.perf_counter() - t1F))
+
+
+def move_file(srcP: Path, dstP: Path, timeoutF: float = WAITSEC):
+    """move a file, retrying while another program holds it open
+
+    Args:
+        srcP (Path): file to move
+        dstP (Path): destination
+        timeoutF (float): seconds before giving up
+    """
+    t1F = time.perf_counter()
+    delayF = 0.005
+    while True:
+        try:
+            shutil.move(srcP, dstP)
+            break
+        except PermissionError:  # locked by a viewer or virus scanner
+            if time.perf_counter() - t1F > timeoutF:
+                raise
+        time.sleep(delayF)
+        delayF = min(delayF * 2, 0.5)
+    _waitL[0] += time.perf_counter() - t1F
+
+
+def report() -> str:
+    """return table of stage times for the last doc build
+
+    Returns:
+        str: report with stage times, total and locked file wait time
+    """
+    hdrS = "{:<24} {:>9}".format("doc stage", "ms")
+    rptL = [hdrS, "-" * len(hdrS)]
+    for nameS, secF in _stageL:
+        rptL.append("{:<24} {:>9.1f}".format(nameS, secF * 1000))
+    rptL.append("-" * len(hdrS))
+    rptL.append("{:<24} {:>9.1f}".format(
+        "total", sum(i[1] for i in _stageL) * 1000))
+    rptL.append("{:<24} {:>9.1f}".format("waiting on locked files", _waitL[0] * 1000))
+
+    return "\n".join(rptL)
+
+
+def tex_commands(texP: Path, buildP: Path) -> list:
+    """return commands compiling a tex file with the local TeX programs
+
+    Args:
+        texP (Path): tex file
+        buildP (Path): build folder for aux, log and pdf files
+
+    Returns:
+        list: command argument lists, empty if latexmk and xelatex are
+        not on the PATH
+    """
+    latexmkS = shutil.which("latexmk")
+    if latexmkS:
+        return [[latexmkS, "-xelatex", "-quiet", "-f",
+                 "-interaction=nonstopmode", "-outdir=" + str(buildP),
+                 texP.name]]
+    xelatexS = shutil.which("xelatex")
+    if xelatexS:
+        argL = [xelatexS, "-interaction=nonstopmode",
+                "-output-directory=" + str(buildP), texP.name]
+        return [argL, argL]  # second pass resolves page references
+
+    return []
+
+
+def compile_pdf(texP: Path, pdfP: Path) -> tuple:
+    """compile a tex file in its build folder and move the pdf
+
+    Args:
+        texP (Path): tex file in the d00_docs folder
+        pdfP (Path): pdf file in the doc folder
+
+    Returns:
+        tuple: (calc name, status, seconds, message)
+    """
+    t1F = time.perf_counter()
+    texP, pdfP = Path(texP), Path(pdfP)
+    buildP = Path(texP.parent, "rvbuild", texP.stem)
+    cmdL = tex_commands(texP, buildP)
+    if not cmdL:
+        return texP.stem, "failed", 0.0, "latexmk or xelatex not found"
+    os.makedirs(buildP, exist_ok=True)
+    logS = str(Path(buildP, texP.stem + ".log"))
+    msgS = ""
+    for i, argL in enumerate(cmdL):
+        runO = subprocess.run(
+            argL, cwd=texP.parent, stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        if runO.returncode:  # later passes would hide the error
+            logging.warning(runO.stdout.decode("utf-8", "replace")[-2000:])
+            msgS = ("exit " + str(runO.returncode) + " in pass "
+                    + str(i + 1) + " - see " + logS)
+            break
+    outP = Path(buildP, texP.stem + ".pdf")
+    if not msgS and not outP.is_file():
+        msgS = "no pdf written - see " + logS
+    if msgS:  # pdf of a failed pass stays in the build folder
+        return texP.stem, "failed", time.perf_counter() - t1F, msgS
+    os.makedirs(pdfP.parent, exist_ok=True)
+    move_file(outP, pdfP)
+
+    return texP.stem, "ok", time.perf_counter() - t1F, ""
+
+
+def compile_pdfs(jobL: list, workersI: int = None) -> list:
+    """compile tex files concurrently
+
+    Args:
+        jobL (list): (tex file, pdf file) jobs
+        workersI (int): concurrent jobs, cpu count if None
+
+    Returns:
+        list: compile_pdf results in job order
+    """
+    if not jobL:
+        return []
+    workersI = min(workersI or os.cpu_count() or 1, len(jobL))
+    with concurrent.futures.ThreadPoolExecutor(workersI) as poolO:
+        return list(poolO.map(lambda jobT: compile_pdf(*jobT[:2]), jobL))
+
+
+def defer_pdf(deferB: bool = True):
+    """queue pdf jobs instead of compiling them
+
+    Args:
+        deferB (bool): True to queue jobs, False to compile in gen_pdf
+    """
+    _deferL[0] = [] if deferB else None
+
+
+def queue_pdf(texP: Path, pdfP: Path, cacheT: tuple = None) -> bool:
+    """queue a pdf job if pdf builds are deferred
+
+    Args:
+        texP (Path): tex file
+        pdfP (Path): pdf file
+        cacheT (tuple): (cache folder, key, outputs) of the build cache
+            entry to store again when the pdf is written
+
+    Returns:
+        bool: True if the job was queued
+    """
+    if _deferL[0] is None:
+        return False
+    _deferL[0].append((str(texP), str(pdfP), cacheT))
+
+    return True
+
+
+def queued_pdfs() -> list:
+    """return and clear queued pdf jobs
+
+    Returns:
+        list: (tex file, pdf file, cache entry) jobs
+    """
+    jobL = _deferL[0] or []
+    if _deferL[0] is not None:
+        _deferL[0] = []
+
+    return jobL
+
+
+def pdf_report(resL: list) -> str:
+    """return table of pdf compile times
+
+    Args:
+        resL (list): compile_pdf results
+
+    Returns:
+        str: report
+    """
+    hdrS = "{:<32} {:<7} {:>9}  {}".format("pdf", "status", "sec", "message")
+    rptL = [hdrS, "-" * len(hdrS)]
+    for nameS, statusS, secF, msgS in resL:
+        rptL.append(
+            "{:<32} {:<7} {:>9.2f}  {}".format(nameS, statusS, secF, msgS))
+
+    return "\n".join(rptL)
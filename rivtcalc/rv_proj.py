@@ -0,0 +1,140 @@
+#! python
+"""resolves project folders for a calc
+
+The ProjectD class maps folder keys to project paths derived from the calc
+file name. Paths are resolved the first time a key is read and then cached,
+so importing the rivtcalc API does not walk the project tree."""
+
+import os
+import sys
+from pathlib import Path
+
+
+def calc_file() -> Path:
+    """return calc file path from the command line or __main__ module
+
+    Returns:
+        Path: calc file full path
+    """
+    try:
+        calcfileS = sys.argv[1]
+    except IndexError:
+        calcfileS = sys.argv[0]
+    if ".py" not in calcfileS:
+        import __main__
+        calcfileS = getattr(__main__, "__file__", calcfileS)
+
+    return Path(calcfileS).resolve()
+
+
+def find_dir(rootP: Path, prefixS: str) -> Path:
+    """return first folder in root folder starting with prefix
+
+    Only the top level of the root folder is scanned. The root folder is
+    returned if there is no match.
+
+    Args:
+        rootP (Path): folder to scan
+        prefixS (str): folder name prefix
+
+    Returns:
+        Path: matching folder
+    """
+    try:
+        with os.scandir(rootP) as itr:
+            dirL = sorted(e.name for e in itr if e.is_dir())
+    except OSError:
+        return rootP
+    for dirS in dirL:
+        if dirS.startswith(prefixS):
+            return Path(rootP, dirS)
+
+    return rootP
+
+
+class ProjectD(dict):
+    """project folder paths resolved on first access
+
+    Keys are the folder names used by the calc and doc classes (cpath,
+    cpathcur, dpath0 ...). A key that has not been read is never resolved.
+    """
+
+    def __init__(self, calcfileP=None):
+        """folder dictionary for a calc file
+
+        Args:
+            calcfileP (Path): calc file, read from the command line if None
+        """
+        super().__init__()
+        self._calcP = calcfileP
+
+    def reset(self, calcfileP=None):
+        """clear resolved folders and set a new calc file
+
+        Args:
+            calcfileP (Path): calc file, read from the command line if None
+        """
+        self.clear()
+        self._calcP = calcfileP
+
+    @property
+    def cnameS(self) -> str:
+        """calc file basename"""
+        return self["cfull"].name.split(".py")[0]
+
+    def __missing__(self, keyS: str) -> Path:
+        try:
+            pathf = getattr(self, "_p_" + keyS)
+        except AttributeError:
+            raise KeyError(keyS)
+        pathP = pathf()
+        self[keyS] = pathP
+
+        return pathP
+
+    def _p_cfull(self):
+        if self._calcP is None:
+            return calc_file()
+        return Path(self._calcP).resolve()
+
+    def _p_ppath(self):
+        return self["cfull"].parent.parent.parent
+
+    def _p_cpath(self):
+        return Path(self["ppath"], "calcs")
+
+    def _p_dpath(self):
+        return Path(self["ppath"], "docs")
+
+    def _p_docpath(self):
+        return self["dpath"]
+
+    def _p_dpath0(self):
+        return Path(self["dpath"], "d00_docs")
+
+    def _p_mpath(self):
+        return Path(self["ppath"], "manage")
+
+    def _p_rpath(self):
+        return Path(self["ppath"], "reports")
+
+    def _p_spath(self):
+        return Path(self["cpath"], "scripts")
+
+    def _p_kpath(self):
+        return Path(self["cpath"], "scripts", "sketches")
+
+    def _p_hpath(self):
+        return Path(self["dpath"], "html")
+
+    def _p_cpathcur(self):
+        return find_dir(self["cpath"], self["cfull"].name[0:5])
+
+    def _p_dpathcur(self):
+        return find_dir(self["dpath"], "d" + self["cfull"].name[1:3])
+
+    def _p_mpathcur(self):
+        return find_dir(self["mpath"], "m" + self["cfull"].name[1:3])
+
+    def _p_rpathcur(self):
+        return find_dir(self["rpath"], "r" + self["cfull"].name[1:3])
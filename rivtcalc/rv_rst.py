@@ -12,167 +12,141 @@ import subprocess
 import tempfile
 import re
 import logging
-import time
 import numpy.linalg as la
-import pandas as pd
-import sympy as sp
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-import html2text as htm
 from numpy import *
-from IPython.display import display as _display
-from IPython.display import Image as _Image
 from io import StringIO
-from sympy.parsing.latex import parse_latex
-from sympy.abc import _clash2
-from sympy.core.alphabets import greeks
-from tabulate import tabulate
 from pathlib import Path
-from IPython.display import display as _display
-from IPython.display import Image as _Image
-
-try:
-    from PIL import Image as PImage
-    from PIL import ImageOps as PImageOps
-except:
-    pass
 import rivtcalc.rv_unit
+import rivtcalc.rv_eval as _rv_eval
+import rivtcalc.rv_sym as _rv_sym
+import rivtcalc.rv_table as _rv_table
+from rivtcalc.rv_lazy import LazyModule, sp, plt, mpimg, htm
+from rivtcalc.rv_lazy import spabc as _abc, tab as _tab
+from rivtcalc.rv_buf import OutBuf
+from rivtcalc.rv_tags import TagFormat
+
+PImage = LazyModule("PIL.Image", "image")
+PImageOps = LazyModule("PIL.ImageOps", "image")
 
 logging.getLogger("numexpr").setLevel(logging.WARNING)
 
+# inline LaTeX for tags - written at the top of each reST calc
+TEXROLE = ".. role:: tex(raw)\n   :format: latex\n\n"
+
 
-class Rivt2rSt:
+class Rivt2rSt(TagFormat):
     """convert rivt-strings to reST strings"""
 
     def __init__(
         self,
-        strL: list,
+        nodeL: list,
         folderD: dict,
         setcmdD: dict,
         setsectD: dict,
         rivtD: dict,
         exportS: str,
+        outO: OutBuf = None,
     ):
         """convert rivt-strings to reST-strings
 
         Args:
             exportS (str): stores values that are written to file
-            strL (list): calc rivt-strings
+            nodeL (list): rivt-string nodes
             folderD (dict): folder paths
             setcmdD (dict): command settings
             setsectD (dict): section settings
-            rivtD (dict): global rivt dictionary
+            rivtD (Namespace): calc values namespace
+            outO (OutBuf): calc output buffer, a new buffer if None
         """
 
-        self.restS = """"""  # restructured text string
+        self.restS = OutBuf() if outO is None else outO  # reST string
         self.exportS = exportS  # value export string
-        self.strL = strL  # rivt-string list
+        self.nodeL = nodeL  # rivt-string nodes
+        self.resD = {}  # results for current node
         self.valL = []  # value blocklist
         self.folderD = folderD
         self.setsectD = setsectD
         self.setcmdD = setcmdD
         self.rivtD = rivtD
 
-    def _refs(self, objnumI: int, typeS: str) -> str:
-        """reference label for equations, tables and figures
-
-        Args:
-            objnumI (int): equation, table or figure numbers
-            setsectD (dict): section dictionary
-            typeS (str): label type
-
-        Returns:
-            str: [description]
-        """
-
-        objfillS = str(objnumI).zfill(2)
-        sfillS = str(self.setsectD["snumS"]).strip().zfill(2)
-        cnumSS = str(self.setsectD["cnumS"])
-        refS = typeS + cnumSS + "." + objfillS
-
-        return refS
-
-    def _tags(self, tagS: str, tagL: list) -> tuple:
-        """parse tag
-
-        Args:
-            tagS (str): rivt-string with tag
-            tagL (list): list of tag parameters
-            setsectD (dict): section dictionary
-
-        Return:
-            rstS (str): restructured text string
-            setsectD (dict): updated section dictionary
-        """
-
-        tagS = tagS.rstrip()
-        uS = ""
-        swidthI = self.setsectD["swidthI"] - 1
-        try:
-            tag = list(set(tagL).intersection(tagS.split()))[0]
-        except:
-            uS = tagS
-            return uS
-
-        if tag == "[#]_":  # auto increment footnote mark
-            uS = tagS + "\n"
-        elif tag == "[page]_":  # new page
-            uS = ".. raw:: latex \n\n ?x?newpage \n"
-        elif tag == "[line]_":  # horizontal line
-            uS = int(self.setsectD["swidthI"]) * "-"
-        elif tag == "[link]_":  # url link
-            tgS = tagS.strip("[link]_").strip()
-            tgL = tgS.split("|")
-            uS = ".. _" + tgL[0].strip() + ": " + tgL[1].strip()
-        elif tag == "[r]_":  # right adjust text
-            tagL = tagS.strip().split("[r]_")
-            uS = "?x?hfill " + tagL[0].strip()
-        elif tag == "[c]_":  # center text
-            tagL = tagS.strip().split("[c]_")
-            uS = "?x?begin{center} " + tagL[0].strip() + "?x?end{center}"
-        elif tag == "[x]_":  # format tex
-            tagL = tagS.strip().split("[x]_")
-            txS = tagL[0].strip()
-            uS = ".. raw:: math\n\n   " + txS + "\n"
-        elif tag == "[s]_":  # format sympy
-            tagL = tagS.strip().split("[s]_")
-            spS = tagL[0].strip()
-            txS = sp.latex(S(spS))
-            uS = ".. raw:: math\n\n   " + txS + "\n"
-        elif tag == "[f]_":  # figure caption
-            tagL = tagS.strip().split("[f]_")
-            fnumI = int(self.setsectD["fnumI"]) + 1
-            self.setsectD["fnumI"] = fnumI
-            refS = self._refs(fnumI, "[ Fig: ") + " ]"
-            uS = "\n\n**" + tagL[0].strip() + "**" + \
-                " ?x?hfill " + refS + "\n\n"
-        elif tag == "[e]_":  # equation label
-            tagL = tagS.strip().split("[e]_")
-            enumI = int(self.setsectD["enumI"]) + 1
-            self.setsectD["enumI"] = enumI
-            refS = self._refs(enumI, "[ Equ: ") + "]"
-            uS = "**" + tagL[0].strip() + "**" + " ?x?hfill " + refS
-        elif tag == "[t]_":  # table label
-            tagL = tagS.strip().split("[t]_")
-            tnumI = int(self.setsectD["tnumI"]) + 1
-            self.setsectD["tnumI"] = tnumI
-            refS = self._refs(tnumI, "[Table: ") + "]"
-            uS = "**" + tagL[0].strip() + "**" + " ?x?hfill  " + refS
-        elif tag == "[foot]_":  # footnote label
-            tagS = tagS.strip("[foot]_").strip()
-            # ".. target-notes::\n\n"
-            uS = ".. [*] " + tagS
-        elif tag == "[n]_":  # new line
-            tagL = tagS.strip().split("[n]_")
-            tagS = tagL[0] + "\n"
-            uS = tagS
-        else:
-            uS = tagS
-
-        return uS
+    def _tfnote(self, textS: str, lineS: str) -> str:
+        """[#]_ footnote mark"""
+        return lineS + "\n"
+
+    def _tfoot(self, textS: str, lineS: str) -> str:
+        """[foot]_ footnote description"""
+        return ".. [*] " + textS
+
+    def _tpage(self, textS: str, lineS: str) -> str:
+        """[page]_ new page"""
+        return ".. raw:: latex \n\n \\newpage \n"
+
+    def _tline(self, textS: str, lineS: str) -> str:
+        """[line]_ horizontal line"""
+        return int(self.setsectD["swidthI"]) * "-"
+
+    def _tlink(self, textS: str, lineS: str) -> str:
+        """[link]_ url link"""
+        tgL = textS.split("|")
+        return ".. _" + tgL[0].strip() + ": " + tgL[1].strip()
+
+    def _tright(self, textS: str, lineS: str) -> str:
+        """[r]_ right adjust text"""
+        return ":tex:`\\hfill` " + textS
+
+    def _tcenter(self, textS: str, lineS: str) -> str:
+        """[c]_ center text"""
+        return (":tex:`\\begin{center}` " + textS
+                + " :tex:`\\end{center}`")
+
+    def _tfig(self, textS: str, lineS: str) -> str:
+        """[f]_ figure caption"""
+        refS = self._label("fnumI", "[ Fig: ") + " ]"
+        return "\n\n**" + textS + "**" + " :tex:`\\hfill` " + refS + "\n\n"
+
+    def _tequ(self, textS: str, lineS: str) -> str:
+        """[e]_ equation label"""
+        refS = self._label("enumI", "[ Equ: ") + "]"
+        return "**" + textS + "**" + " :tex:`\\hfill` " + refS
+
+    def _ttable(self, textS: str, lineS: str) -> str:
+        """[t]_ table label"""
+        refS = self._label("tnumI", "[Table: ") + "]"
+        return "**" + textS + "**" + " :tex:`\\hfill`  " + refS
+
+    def _ttex(self, textS: str, lineS: str) -> str:
+        """[x]_ format LaTeX equation"""
+        return "\n.. math::\n\n   " + textS + "\n"
+
+    def _tsym(self, textS: str, lineS: str) -> str:
+        """[s]_ format sympy equation"""
+        return "\n.. math::\n\n   " + _rv_sym.sym_latex(textS) + "\n"
+
+    def _tnew(self, textS: str, lineS: str) -> str:
+        """[n]_ new line"""
+        return textS + "\n"
+
+    _TAGD = {
+        "[#]_": _tfnote,
+        "[foot]_": _tfoot,
+        "[page]_": _tpage,
+        "[line]_": _tline,
+        "[link]_": _tlink,
+        "[r]_": _tright,
+        "[c]_": _tcenter,
+        "[f]_": _tfig,
+        "[e]_": _tequ,
+        "[t]_": _ttable,
+        "[x]_": _ttex,
+        "[s]_": _tsym,
+        "[n]_": _tnew,
+    }
 
     def _parseRST(self, typeS: str, cmdL: list, methL: list, tagL: list):
-        """parse rivt-string to reST
+        """walk rivt-string nodes and write reST
+
+        Values, table code and file reads are evaluated in the UTF walk and
+        read here from the node results.
 
         Args:
             typeS (str): rivt-string type
@@ -180,16 +154,11 @@ class Rivt2rSt:
             methL (list): method list
             tagL (list): tag list
         """
-        locals().update(self.rivtD)
-        uL = []  # command arguments
-        indxI = -1  # method index
-        _rgx = r"\[([^\]]+)]_"  # find tags
-
-        for uS in self.strL:
-            if uS[0:2] == "##":
-                continue  # remove comment
-            uS = uS[4:]  # remove indent
-            if len(uS) == 0:
+        for nodeT in self.nodeL:
+            kindS, uS, uL, self.resD = nodeT
+            if kindS == "sect" or kindS == "code":
+                continue
+            if kindS == "blank":
                 if len(self.valL) > 0:  # print value table
                     fltfmtS = ""
                     hdrL = ["variable", "value", "[value]", "description"]
@@ -197,50 +166,23 @@ class Rivt2rSt:
                     self._vtable(self.valL, hdrL, "rst", alignL, fltfmtS)
                     self.valL = []
                     self.restS += "\n\n"
-                    self.rivtD.update(locals())
-                    continue
                 else:
                     # self.restS += "?x?vspace{7pt}"
                     self.restS += "\n"
-                    continue
-            try:
-                if uS[0] == "#":
-                    continue  # remove comment
-            except:
-                self.restS += "\n"
                 continue
-            if uS.strip() == "[literal]_":
-                continue
-            if re.search(_rgx, uS):  # check for tag
-                utgS = self._tags(uS, tagL)
+            if kindS == "tag":
+                if uS.strip() == "[literal]_":
+                    continue
+                utgS = self._tags(uS, tagL, uL)
                 self.restS += utgS.rstrip() + "\n"
                 continue
-            if typeS == "values":  # chk for values
-                self.setcmdD["saveB"] = False
-                if "=" in uS and uS.strip()[-2] == "||":  # value to file
-                    uS = uS.replace("||", " ")
-                    self.setcmdD["saveB"] = True
-                if "=" in uS:  # assign value
-                    uL = uS.split("|")
-                    self._vassign(uL)
-                    continue
-            if typeS == "table":  # check for table
-                if uS[0:2] == "||":
-                    uL = uS[2:].split("|")
-                    indxI = cmdL.index(uL[0].strip())
-                    methL[indxI](uL)
-                    continue
-                else:
-                    exec(uS)  # exec table code
-                    continue
-            if uS[0:2] == "||":  # check for cmd
-                # print(f"{cmdL=}")
-                uL = uS[2:].split("|")
+            if kindS == "assign":
+                self._vassign(uL)
+                continue
+            if kindS == "cmd":
                 indxI = cmdL.index(uL[0].strip())
                 methL[indxI](uL)
                 continue  # call any cmd
-
-            self.rivtD.update(locals())
             if typeS != "table":  # skip table prnt
                 self.restS += uS.rstrip() + "\n"
 
@@ -301,20 +243,13 @@ class Rivt2rSt:
         if len(rL) < 4:
             rL += [""] * (4 - len(rL))  # pad parameters
         rstS = ""
-        contentL = []
         sumL = []
         fileS = rL[1].strip()
         tfileS = Path(self.folderD["dpath0"] / fileS)
-        extS = fileS.split(".")[1]
-        if extS == "csv":
-            with open(tfileS, "r") as csvfile:  # read csv file
-                readL = list(csv.reader(csvfile))
-        elif extS == "xlsx":
-            xDF = pd.read_excel(tfileS, header=None)
-            readL = xDF.values.tolist()
-        else:
+        tableO = _rv_table.read_table(tfileS)
+        if tableO is None:
             return
-        incl_colL = list(range(len(readL[0])))
+        incl_colL = list(range(tableO.width(0)))
         widthI = self.setcmdD["cwidthI"]
         alignS = self.setcmdD["calignS"]
         saS = alignD[alignS]
@@ -325,42 +260,13 @@ class Rivt2rSt:
             saS = alignD[alignS]  # new alignment
             self.setcmdD.update({"cwidthI": widthI})
             self.setcmdD.update({"calignS": alignS})
+        incl_colL = _rv_table.columns(rL[3], len(incl_colL))  # columns
         totalL = [""] * len(incl_colL)
-        if rL[3].strip():  # columns
-            if rL[3].strip() == "[:]":
-                totalL = [""] * len(incl_colL)
-            else:
-                incl_colL = eval(rL[3].strip())
-                totalL = [""] * len(incl_colL)
-        ttitleS = readL[0][0].strip() + " [t]_"
+        ttitleS = str(tableO.cell(0, 0)).strip() + " [t]_"
         rstgS = self._tags(ttitleS, rtagL)
         self.restS += rstgS.rstrip() + "\n\n"
-        for row in readL[1:]:
-            contentL.append([row[i] for i in incl_colL])
-        wcontentL = []
-        for rowL in contentL:
-            wrowL = []
-            for iS in rowL:
-                templist = textwrap.wrap(str(iS), int(widthI))
-                templist = [i.replace("""\\n""", """\n""") for i in templist]
-                wrowL.append("""\n""".join(templist))
-            wcontentL.append(wrowL)
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        output.write(
-            tabulate(
-                wcontentL,
-                tablefmt="rst",
-                headers="firstrow",
-                numalign="decimal",
-                stralign=saS,
-            )
-        )
-        rstS = output.getvalue()
-        sys.stdout = old_stdout
-
-        self.restS += rstS + "\n"
+        _rv_table.write_table(
+            self.restS.write, tableO, incl_colL, saS, int(widthI), "rst")
 
     def _rpdf(self, rsL):
         b = 5
@@ -476,21 +382,11 @@ class Rivt2rSt:
         if len(iL) < 4:
             iL += [""] * (4 - len(iL))  # pad parameters
         utfS = ""
-        contentL = []
         sumL = []
-        fileS = iL[1].strip()
-        calpS = self.setsectD["fnumS"]
-        tfileS = Path(self.folderD["cpathcur"] / fileS)
-        extS = fileS.split(".")[1]
-        if extS == "csv":
-            with open(tfileS, "r") as csvfile:  # read csv file
-                readL = list(csv.reader(csvfile))
-        elif extS == "xlsx":
-            tDF1 = pd.read_excel(tfileS, header=None)
-            readL = tDF1.values.tolist()
-        else:
+        tableO = self.resD.get("tableO")  # read in UTF walk
+        if tableO is None:
             return
-        incl_colL = list(range(len(readL[1])))
+        incl_colL = list(range(tableO.width(1)))
         widthI = self.setcmdD["cwidthI"]
         alignS = self.setcmdD["calignS"]
         saS = alignD[alignS]
@@ -501,48 +397,14 @@ class Rivt2rSt:
             self.setcmdD.update({"cwidthI": widthI})
             self.setcmdD.update({"calignS": alignS})
             saS = alignD[alignS]  # new align
+        incl_colL = _rv_table.columns(iL[3], len(incl_colL))  # columns
         totalL = [""] * len(incl_colL)
-        if iL[3].strip():  # columns
-            if iL[3].strip() == "[:]":
-                totalL = [""] * len(incl_colL)
-            else:
-                incl_colL = eval(iL[3].strip())
-                totalL = [""] * len(incl_colL)
-        ttitleS = readL[0][0].strip() + " [t]_"
+        ttitleS = str(tableO.cell(0, 0)).strip() + " [t]_"
         utgS = self._tags(ttitleS, itagL)
         self.restS += utgS.rstrip() + "\n\n"
-        for row in readL[1:]:
-            contentL.append([row[i] for i in incl_colL])
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        output.write(
-            tabulate(
-                contentL,
-                tablefmt="latex",
-                headers="firstrow",
-                numalign="decimal",
-                stralign=saS,
-            )
-        )
-        rstS = output.getvalue()
-        sys.stdout = old_stdout
-
-        # print(rstS)
-        cS = 0
         self.restS += ".. raw:: latex" + "\n\n"
-        for i in rstS.split("\n"):
-            counter = i.count("&")
-            if counter > 0:
-                cS = "{" + alignS * (counter + 1) + "}"
-                continue
-        # self.restS += "  \\vspace{-.1in}"
-        self.restS += "  \\begin{tabulary}{1.0\\textwidth}" + cS + "\n"
-        inrstS = ""
-        for i in rstS.split("\n"):
-            inrstS += "  " + i + "\n"
-        self.restS += inrstS
-        self.restS += "  \\end{tabulary}\n"
+        _rv_table.write_table(
+            self.restS.write, tableO, incl_colL, saS, 0, "tabulary", "  ")
         self.restS += "  \\vspace{.15in}\n"
 
     def _iimage(self, iL: list):
@@ -597,7 +459,6 @@ class Rivt2rSt:
             )
 
         self.restS += rstS + "\n"
-        time.sleep(1)
 
     def v_rst(self) -> tuple:
         """parse value-string and set method
@@ -610,7 +471,6 @@ class Rivt2rSt:
             exportS (list): value strings for export
         """
 
-        locals().update(self.rivtD)
         vcmdL = ["config", "value", "data", "func", "text", "table", "image"]
         vmethL = [
             self._vconfig,
@@ -639,7 +499,6 @@ class Rivt2rSt:
         ]
 
         self._parseRST("values", vcmdL, vmethL, vtagL)
-        self.rivtD.update(locals())
         return self.restS, self.setsectD, self.setcmdD, self.rivtD, self.exportS
 
     def _vconfig(self, vL: list):
@@ -655,111 +514,41 @@ class Rivt2rSt:
         self.setcmdD["trmtI"] = vL[2].split(",")[1].strip()
 
     def _vassign(self, vL: list):
-        """assign values to variables and equations
+        """format assigned values and equations
+
+        Values are computed in the UTF walk and read from the node results.
 
         Args:
             vL (list): list of assignments
         """
 
-        locals().update(self.rivtD)
         rprecS = str(self.setcmdD["trmrI"])  # trim numbers
-        tprecS = str(self.setcmdD["trmtI"])
         fltfmtS = "." + rprecS.strip() + "f"
-        exec("set_printoptions(precision=" + rprecS + ")")
-        exec("Unum.set_format(value_format = '%." + rprecS + "f')")
         if len(vL) <= 2:  # equation
             varS = vL[0].split("=")[0].strip()
             valS = vL[0].split("=")[1].strip()
-            val1U = val2U = array(eval(valS))
-            if vL[1].strip() != "DC" and vL[1].strip() != "":
-                unitL = vL[1].split(",")
-                unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
-                else:
-                    cmdS = varS + "= " + valS
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS).cast_unit(eval(unit1S))
-                    valdec = ("%." + str(rprecS) + "f") % valU.number()
-                    val1U = str(valdec) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
-            else:
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
-                exec(cmdS, globals(), locals())
-                # valU = eval(varS).cast_unit(eval(unit1S))
-                # valdec = ("%." + str(rprecS) + "f") % valU.number()
-                # val1U = str(valdec) + " " + str(valU.unit())
-                val1U = eval(varS)
-                val1U = val1U.simplify_unit()
-                val2U = val1U
-            rstS = vL[0]
-            spS = "Eq(" + varS + ",(" + valS + "))"  # pretty print
-            symeq = sp.sympify(spS, _clash2, evaluate=False)
-            eqltxS = sp.latex(symeq, mul_symbol="dot")
+            eqltxS = _rv_sym.eq_latex(varS, valS)
             self.restS += "\n.. math:: \n\n" + "  " + eqltxS + "\n\n"
-            eqS = sp.sympify(valS)
-            eqatom = eqS.atoms(sp.Symbol)
             if self.setcmdD["subB"]:
                 self._vsub(vL)
             else:
-                hdrL = []
-                valL = []
-                hdrL.append(varS)
-                valL.append(str(val1U) + "  [" + str(val2U) + "]")
-                for sym in eqatom:
-                    hdrL.append(str(sym))
-                    symU = eval(str(sym))
-                    valL.append(str(symU.simplify_unit()))
+                hdrL = self.resD["hdrL"]
+                valL = self.resD["valL"]
                 alignL = ["center"] * len(valL)
                 self._vtable([valL], hdrL, "rst", alignL, fltfmtS)
-            if self.setcmdD["saveB"] == True:
-                pyS = vL[0] + vL[1] + "  # equation" + "\n"
-                # print(pyS)
-                self.exportS += pyS
         elif len(vL) >= 3:  # value
-            descripS = vL[2].strip()
-            varS = vL[0].split("=")[0].strip()
-            valS = vL[0].split("=")[1].strip()
-            val1U = val2U = array(eval(valS))
-            if vL[1].strip() != "" and vL[1].strip() != "-":
-                unitL = vL[1].split(",")
-                unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
-                else:
-                    cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
-                    val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
-            else:
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
-                # print(f"{cmdS=}")
-                exec(cmdS, globals(), locals())
-                valU = eval(varS)
-                # val1U = str(valU.number()) + " " + str(valU.unit())
-                val2U = valU
-            self.valL.append([varS, val1U, val2U, descripS])
-            if self.setcmdD["saveB"] == True:
-                pyS = vL[0] + vL[1] + vL[2] + "\n"
-                # print(pyS)
-                self.exportS += pyS
-        self.rivtD.update(locals())
-        # print(self.rivtD)
+            self.valL.append(self.resD["rowL"])
 
     def _vtable(self, tbl, hdrL, tblfmt, alignL, fltfmtS):
         """write value table"""
 
-        locals().update(self.rivtD)
         rprecS = str(self.setcmdD["trmrI"])  # trim numbers
         tprecS = str(self.setcmdD["trmtI"])
         fltfmtS = "." + rprecS.strip() + "f"
         sys.stdout.flush()
         old_stdout = sys.stdout
         output = StringIO()
-        tableS = tabulate(
+        tableS = _tab.tabulate(
             tbl,
             tablefmt=tblfmt,
             headers=hdrL,
@@ -777,80 +566,30 @@ class Rivt2rSt:
             inrstS = "  " + i
             self.restS += inrstS + "\n"
         self.restS += "\n\n"
-        self.rivtD.update(locals())
 
     def _vvalue(self, vL: list):
-        """import values from files
+        """format values imported from files
 
         Args:
             vL (list): value command arguments
         """
 
-        locals().update(self.rivtD)
-        valL = []
         fltfmtS = ""
-        if len(vL) < 5:
-            vL += [""] * (5 - len(vL))  # pad command
-        calpS = self.setsectD["fnumS"]
-        vfileS = Path(self.folderD["cpath"] / calpS / vL[1].strip())
-        with open(vfileS, "r") as csvfile:
-            readL = list(csv.reader(csvfile))
-        for vaL in readL[1:]:
-            if len(vaL) < 5:
-                vaL += [""] * (5 - len(vL))  # pad values
-            varS = vaL[0].strip()
-            valS = vaL[1].strip()
-            unit1S, unit2S = vaL[2].strip(), vaL[3].strip()
-            descripS = vaL[4].strip()
-            if not len(varS):
-                valL.append(["------", "------", "------", "------"])  # totals
-                continue
-            val1U = val2U = array(eval(valS))
-            if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
-                else:
-                    cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
-                    val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
-            valL.append([varS, val1U, val2U, descripS])
         hdrL = ["variable", "value", "[value]", "description"]
         alignL = ["left", "right", "right", "left"]
-        self._vtable(valL, hdrL, "rst", alignL, fltfmtS)
-        self.rivtD.update(locals())
+        self._vtable(self.resD["valL"], hdrL, "rst", alignL, fltfmtS)
 
     def _vdata(self, vL: list):
-        """import data from files
+        """format data imported from files
 
         Args:
             vL (list): data command arguments
         """
 
-        locals().update(self.rivtD)
-        valL = []
-        if len(vL) < 5:
-            vL += [""] * (5 - len(vL))  # pad command
-        valL.append(["variable", "values"])
-        vfileS = Path(self.folderD["apath"] / vL[2].strip())
-        vecL = eval(vL[3].strip())
-        with open(vfileS, "r") as csvF:
-            reader = csv.reader(csvF)
-        vL = list(reader)
-        for i in vL:
-            varS = i[0]
-            varL = array(i[1:])
-            cmdS = varS + "=" + str(varL)
-            exec(cmdS, globals(), locals())
-            if len(varL) > 4:
-                varL = str((varL[:2]).append(["..."]))
-            valL.append([varS, varL])
+        fltfmtS = ""
         hdrL = ["variable", "values"]
         alignL = ["left", "right"]
-        self._vtable(valL, hdrL, "rst", alignL)
-        self.rivtD.update(locals())
+        self._vtable(self.resD["valL"], hdrL, "rst", alignL, fltfmtS)
 
     def _vsub(self, eqL: list, eqS: str):
         """substitute numbers for variables in printed output
@@ -871,7 +610,7 @@ class Rivt2rSt:
         try:
             eqS = "Eq(" + eqL[0] + ",(" + eqL[1] + "))"
             # sps = sps.encode('unicode-escape').decode()
-            utfs = sp.pretty(sp.sympify(eqS, _clash2, evaluate=False))
+            utfs = sp.pretty(sp.sympify(eqS, _abc._clash2, evaluate=False))
             self.calcl.append(utfs)
         except:
             self.calcl.append(utfs)
@@ -946,6 +685,6 @@ class Rivt2rSt:
             "[#]_",
         ]
 
-        self._parseUTF("table", tcmdL, tmethL, ttagL)
+        self._parseRST("table", tcmdL, tmethL, ttagL)
 
-        return self.calcS, self.setsectD, self.setcmdD, self.rivtD
+        return self.restS, self.setsectD, self.setcmdD, self.rivtD
@@ -0,0 +1,201 @@
+#! python
+"""caches sympy renderings of equations
+
+Equations and the [s]_ and [x]_ tags are rendered by sympy, which is the
+slowest step of a calc. Each rendering (UTF pretty string, LaTeX string or
+equation symbols) is memoized by its kind and source text, and the cache is
+saved in the d00_docs/rvcache folder, so equations that are unchanged since
+an earlier run of any calc in the project are not rendered again and sympy
+is not imported.
+
+Simple arithmetic equations are laid out by rv_eqn without sympy; sympy
+renders the others. The cache file is versioned by the sympy and rv_eqn
+versions."""
+
+import os
+import atexit
+import marshal
+import importlib.metadata
+from pathlib import Path
+import rivtcalc.rv_eqn as _rv_eqn
+from rivtcalc.rv_lazy import LazyModule, sp
+from rivtcalc.rv_lazy import spabc as _abc
+
+_latex = LazyModule("sympy.parsing.latex", "[x]_ tag")
+
+_renderD = {}  # (kind, source): rendered text
+_cacheL = [None, False]  # [render cache file, unsaved render flag]
+
+
+def _version() -> str:
+    eqnS = " eqn " + str(_rv_eqn.VERSION)
+    try:
+        return "sympy " + importlib.metadata.version("sympy") + eqnS
+    except importlib.metadata.PackageNotFoundError:
+        return "sympy" + eqnS
+
+
+def load_cache(fileP: Path):
+    """read renderings saved by an earlier run
+
+    Renderings of the previous cache file are saved first. A cache written
+    with another sympy version is ignored.
+
+    Args:
+        fileP (Path): render cache file
+    """
+    save_cache()
+    if _cacheL[0] is None:
+        atexit.register(save_cache)
+    _cacheL[:] = [Path(fileP), False]
+    try:
+        with open(fileP, "rb") as f1:
+            versionS, renderD = marshal.load(f1)
+    except (OSError, EOFError, ValueError, TypeError):
+        return
+    if versionS == _version():
+        for keyT, outO in renderD.items():
+            _renderD.setdefault(keyT, outO)
+
+
+def save_cache():
+    """write renderings to the render cache file
+
+    The file is shared by the calcs of a project; entries written by other
+    calcs since it was loaded are kept.
+    """
+    fileP, newB = _cacheL
+    if fileP is None or not newB:
+        return
+    try:
+        with open(fileP, "rb") as f1:
+            versionS, renderD = marshal.load(f1)
+        if versionS == _version():
+            for keyT, outO in renderD.items():
+                _renderD.setdefault(keyT, outO)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    try:
+        os.makedirs(fileP.parent, exist_ok=True)
+        tmpP = fileP.with_suffix(".tmp" + str(os.getpid()))
+        with open(tmpP, "wb") as f1:
+            marshal.dump((_version(), _renderD), f1)
+        os.replace(tmpP, fileP)
+    except (OSError, ValueError):
+        return
+    _cacheL[1] = False
+
+
+def _render(kindS: str, srcS: str, fastF=None):
+    keyT = (kindS, srcS)
+    try:
+        return _renderD[keyT]
+    except KeyError:
+        outO = fastF() if fastF is not None else None
+        if outO is None:
+            outO = _renderL[kindS](srcS)
+        _renderD[keyT] = outO
+        _cacheL[1] = True
+        return outO
+
+
+def _fast(varS: str, valS: str, indxI: int):
+    outT = _rv_eqn.render(varS, valS)
+    return None if outT is None else outT[indxI]
+
+
+def _eq(srcS: str):
+    return sp.sympify(srcS, _abc._clash2, evaluate=False)
+
+
+def _sym(spS: str) -> str:
+    spL = spS.split("=")
+    return "Eq(" + spL[0] + ",(" + spL[1] + "))"
+
+
+_renderL = {
+    "eq_pretty": lambda srcS: sp.pretty(_eq(srcS)),
+    "eq_latex": lambda srcS: sp.latex(_eq(srcS), mul_symbol="dot"),
+    "eq_atoms": lambda srcS: tuple(
+        sorted(str(i) for i in sp.sympify(srcS).atoms(sp.Symbol))),
+    "sym_pretty": lambda srcS: sp.pretty(_eq(_sym(srcS))),
+    "sym_latex": lambda srcS: sp.latex(_eq(_sym(srcS))),
+    "tex_pretty": lambda srcS: sp.pretty(
+        sp.sympify(_latex.parse_latex(srcS), _abc._clash2, evaluate=False)),
+}
+
+
+def eq_pretty(varS: str, valS: str) -> str:
+    """return UTF pretty string of an equation
+
+    Args:
+        varS (str): variable
+        valS (str): expression
+
+    Returns:
+        str: pretty printed varS = valS
+    """
+    return _render("eq_pretty", "Eq(" + varS + ",(" + valS + "))",
+                   lambda: _fast(varS, valS, 0))
+
+
+def eq_latex(varS: str, valS: str) -> str:
+    """return LaTeX string of an equation
+
+    Args:
+        varS (str): variable
+        valS (str): expression
+
+    Returns:
+        str: LaTeX varS = valS with dot multiplication
+    """
+    return _render("eq_latex", "Eq(" + varS + ",(" + valS + "))",
+                   lambda: _fast(varS, valS, 1))
+
+
+def eq_atoms(valS: str) -> tuple:
+    """return symbols of an expression
+
+    Args:
+        valS (str): expression
+
+    Returns:
+        tuple: sorted symbol names
+    """
+    return _render("eq_atoms", valS, lambda: _rv_eqn.names(valS))
+
+
+def sym_pretty(spS: str) -> str:
+    """return UTF pretty string of a [s]_ tag equation
+
+    Args:
+        spS (str): sympy equation "a = b"
+
+    Returns:
+        str: pretty printed equation
+    """
+    return _render("sym_pretty", spS)
+
+
+def sym_latex(spS: str) -> str:
+    """return LaTeX string of a [s]_ tag equation
+
+    Args:
+        spS (str): sympy equation "a = b"
+
+    Returns:
+        str: LaTeX equation
+    """
+    return _render("sym_latex", spS)
+
+
+def tex_pretty(txS: str) -> str:
+    """return UTF pretty string of a [x]_ tag LaTeX equation
+
+    Args:
+        txS (str): LaTeX equation
+
+    Returns:
+        str: pretty printed equation
+    """
+    return _render("tex_pretty", txS)
@@ -0,0 +1,657 @@
+#! python
+"""reads csv and xlsx tables once per process
+
+Table commands (|| table, || info, || value, || data) read their files with
+read_table. Parsed tables are cached by path and invalidated when the file
+size or modification time changes, so a table referenced by many calcs in a
+batch build, or several times in one calc, is parsed once per process.
+With a cache folder set, parsed tables are also saved to disk and shared
+between processes and runs.
+
+Tables are stored by column. Each column is a tuple of cells, and rows
+shorter than the widest row keep their length.
+
+Files of SIDEBYTES or more are converted to a sidecar folder beside the file
+(W_shapes.xlsx.rvt/) with one .npy file of unicode cells per column. The
+sidecar is rebuilt when the file size or mtime changes. A csv sidecar is
+written from a streaming csv reader, ROWBLOCK rows at a time, so building
+it does not hold the table in memory. Columns and row lengths are opened
+memory mapped on first use, so a table command that selects columns, e.g.
+[1:4], reads only those columns from disk.
+
+write_table formats a table as a reST simple table or a LaTeX table and
+writes it in chunks of CHUNKROWS rows. Column types and widths are found in
+one pass over the rows and the rows are formatted in a second pass, so no
+formatted copy of the table is held in memory. The layout matches tabulate
+with headers="firstrow" and numalign="decimal"."""
+
+import os
+import re
+import csv
+import math
+import json
+import shutil
+import pickle
+import hashlib
+import textwrap
+import itertools
+import numpy as np
+from pathlib import Path
+import rivtcalc.rv_eval as _rv_eval
+from rivtcalc.rv_lazy import pd
+
+SIDEBYTES = 2 ** 20  # files this size or larger get a sidecar
+ROWBLOCK = 4096  # rows read from mapped columns at a time
+CHUNKROWS = 1000  # formatted rows per write
+_tableD = {}  # path: (size, mtime, Table)
+_cacheL = [None]  # disk cache folder
+
+
+class Table:
+    """table of cells stored by column"""
+
+    __slots__ = ("colT", "lenT")
+
+    def __init__(self, colT: tuple, lenT: tuple):
+        """table from columns
+
+        Args:
+            colT (tuple): column tuples, padded with "" to the row count
+            lenT (tuple): length of each row
+        """
+        self.colT = colT
+        self.lenT = lenT
+
+    @classmethod
+    def from_rows(cls, rowL: list) -> "Table":
+        """return table of row lists
+
+        Args:
+            rowL (list): rows of cells
+
+        Returns:
+            Table: columnar table
+        """
+        lenT = tuple(len(i) for i in rowL)
+        widthI = max(lenT, default=0)
+        colT = tuple(
+            tuple(row[j] if j < len(row) else "" for row in rowL)
+            for j in range(widthI))
+        return cls(colT, lenT)
+
+    def __len__(self):
+        return len(self.lenT)
+
+    def row(self, i: int) -> list:
+        """return row i as a new list of its cells"""
+        return [col[i] for col in self.colT[:self.lenT[i]]]
+
+    def rows(self, startI: int = 0, colL: list = None):
+        """iterate over rows as new lists
+
+        Args:
+            startI (int): first row
+            colL (list): column indices to include, all if None
+
+        Yields:
+            list: row cells
+        """
+        if colL is None:
+            for i in range(startI, len(self.lenT)):
+                yield self.row(i)
+            return
+        rowsI = len(self.lenT)
+        for i1 in range(startI, rowsI, ROWBLOCK):
+            i2 = min(i1 + ROWBLOCK, rowsI)
+            colT = tuple(self._cells(self.colT[j], i1, i2) for j in colL)
+            for i in range(i2 - i1):
+                yield [col[i] for col in colT]
+
+    @staticmethod
+    def _cells(colO, startI: int, stopI: int):
+        if isinstance(colO, np.ndarray):
+            return colO[startI:stopI].tolist()  # str cells of mapped column
+        return colO[startI:stopI]
+
+    def column(self, j: int) -> tuple:
+        """return column j"""
+        return self.colT[j]
+
+    def width(self, i: int) -> int:
+        """return number of cells in row i"""
+        return self.lenT[i]
+
+    def cell(self, i: int, j: int):
+        """return cell in row i, column j"""
+        return self.colT[j][i]
+
+
+class _Columns:
+    """sidecar columns, memory mapped on first access"""
+
+    def __init__(self, sideP: Path, colsI: int):
+        self.sideP = sideP
+        self.colL = [None] * colsI
+
+    def __len__(self):
+        return len(self.colL)
+
+    def _load(self, j: int):
+        colO = self.colL[j]
+        if colO is None:
+            colO = np.load(Path(self.sideP, "c" + str(j) + ".npy"),
+                           mmap_mode="r")
+            self.colL[j] = colO
+        return colO
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [self._load(i) for i in range(*j.indices(len(self.colL)))]
+        return self._load(j)
+
+
+def columns(selS: str, widthI: int) -> list:
+    """return column indices of a table command column selection
+
+    Args:
+        selS (str): "" or "[:]" for all, a slice "[1:4]" or a list "[0,2]"
+        widthI (int): number of columns
+
+    Returns:
+        list: column indices
+    """
+    selS = selS.strip()
+    if not selS or selS == "[:]":
+        return list(range(widthI))
+    if ":" in selS:
+        sliceL = [int(i) if i.strip() else None
+                  for i in selS.strip("[]").split(":")]
+        return list(range(widthI))[slice(*sliceL)]
+
+    return list(eval(_rv_eval.compile_src(selS)))
+
+
+def _csv_columns(fileP: Path, tmpP: Path) -> int:
+    """write the columns of a csv file to .npy files, streaming the rows
+
+    The first pass finds the row count and the longest cell of each column;
+    the second pass fills memory mapped column files ROWBLOCK rows at a
+    time, so no list of rows is built.
+    """
+    maxL, rowsI = [], 0
+    with open(fileP, "r", newline="") as f1:
+        for rowL in csv.reader(f1):
+            rowsI += 1
+            if len(rowL) > len(maxL):
+                maxL += [0] * (len(rowL) - len(maxL))
+            for j, cellS in enumerate(rowL):
+                if len(cellS) > maxL[j]:
+                    maxL[j] = len(cellS)
+    lenO = np.lib.format.open_memmap(
+        Path(tmpP, "len.npy"), "w+", np.int32, (rowsI,))
+    colL = [np.lib.format.open_memmap(
+        Path(tmpP, "c" + str(j) + ".npy"), "w+", "<U" + str(max(1, maxI)),
+        (rowsI,)) for j, maxI in enumerate(maxL)]
+    with open(fileP, "r", newline="") as f1:
+        readO = csv.reader(f1)
+        for i1 in range(0, rowsI, ROWBLOCK):
+            blockL = list(itertools.islice(readO, ROWBLOCK))
+            i2 = i1 + len(blockL)
+            lenO[i1:i2] = [len(i) for i in blockL]
+            for j, colO in enumerate(colL):
+                colO[i1:i2] = [i[j] if j < len(i) else "" for i in blockL]
+    for colO in colL + [lenO]:
+        colO.flush()
+
+    return len(colL)
+
+
+def _side_write(fileP: Path, sideP: Path, statT: tuple, tableO: Table):
+    tmpP = sideP.with_name(sideP.name + ".tmp" + str(os.getpid()))
+    shutil.rmtree(tmpP, ignore_errors=True)
+    os.makedirs(tmpP)
+    if tableO is None:  # csv
+        colsI = _csv_columns(fileP, tmpP)
+    else:
+        for j, colT in enumerate(tableO.colT):
+            np.save(Path(tmpP, "c" + str(j) + ".npy"),
+                    np.array([str(i) for i in colT], dtype=str))
+        np.save(Path(tmpP, "len.npy"), np.array(tableO.lenT, dtype=np.int32))
+        colsI = len(tableO.colT)
+    with open(Path(tmpP, "meta.json"), "w") as f1:
+        json.dump({"source": fileP.name, "size": statT[0],
+                   "mtime_ns": statT[1], "cols": colsI}, f1)
+    shutil.rmtree(sideP, ignore_errors=True)
+    os.replace(tmpP, sideP)
+
+
+def _side_read(sideP: Path, statT: tuple) -> Table:
+    try:
+        with open(Path(sideP, "meta.json"), "r") as f1:
+            metaD = json.load(f1)
+        if (metaD["size"], metaD["mtime_ns"]) != statT:
+            return None
+        lenT = np.load(Path(sideP, "len.npy"), mmap_mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return Table(_Columns(sideP, metaD["cols"]), lenT)
+
+
+def sidecar(fileP: Path) -> Table:
+    """return table read from the sidecar of a file, rebuilt if stale
+
+    Args:
+        fileP (Path): csv or xlsx file
+
+    Returns:
+        Table: table with memory mapped columns, None if not csv or xlsx
+    """
+    fileP = Path(fileP).resolve()
+    statO = os.stat(fileP)
+    statT = (statO.st_size, statO.st_mtime_ns)
+    sideP = fileP.with_name(fileP.name + ".rvt")
+    tableO = _side_read(sideP, statT)
+    if tableO is not None:
+        return tableO
+    extS = fileP.suffix.lower()
+    if extS not in (".csv", ".xlsx"):
+        return None
+    tableO = None if extS == ".csv" else _parse(fileP)  # csv is streamed
+    try:
+        _side_write(fileP, sideP, statT, tableO)
+        sideO = _side_read(sideP, statT)
+    except OSError:  # read only folder - use the parsed table
+        sideO = None
+    if sideO is not None:
+        return sideO
+
+    return _parse(fileP) if tableO is None else tableO
+
+
+def set_cache(cacheP: Path):
+    """save parsed tables to a folder
+
+    Args:
+        cacheP (Path): table cache folder, None to keep tables in memory
+    """
+    _cacheL[0] = None if cacheP is None else Path(cacheP)
+
+
+def _parse(fileP: Path) -> Table:
+    extS = fileP.suffix.lower()
+    if extS == ".csv":
+        with open(fileP, "r", newline="") as csvfile:
+            return Table.from_rows(list(csv.reader(csvfile)))
+    if extS == ".xlsx":
+        return Table.from_rows(
+            pd.read_excel(fileP, header=None).values.tolist())
+    return None
+
+
+def _disk_file(fileP: Path) -> Path:
+    nameS = hashlib.sha1(str(fileP).encode("UTF-8")).hexdigest()[:24]
+    return Path(_cacheL[0], nameS + ".tbl")
+
+
+def read_table(fileP: Path) -> Table:
+    """return parsed csv or xlsx table, cached by path, size and mtime
+
+    Args:
+        fileP (Path): table file
+
+    Returns:
+        Table: table, None if the file type is not csv or xlsx
+    """
+    fileP = Path(fileP).resolve()
+    statO = os.stat(fileP)
+    statT = (statO.st_size, statO.st_mtime_ns)
+    keyS = str(fileP)
+    hitT = _tableD.get(keyS)
+    if hitT is not None and hitT[:2] == statT:
+        return hitT[2]
+    if statO.st_size >= SIDEBYTES:
+        tableO = sidecar(fileP)
+        if tableO is not None:
+            _tableD[keyS] = statT + (tableO,)
+        return tableO
+    tableO = None
+    if _cacheL[0] is not None:
+        diskP = _disk_file(fileP)
+        try:
+            with open(diskP, "rb") as f1:
+                diskT = pickle.load(f1)
+            if diskT[:2] == statT and isinstance(diskT[2], Table):
+                tableO = diskT[2]
+        except Exception:  # missing, or written by another Table class
+            tableO = None
+    if tableO is None:
+        tableO = _parse(fileP)
+        if tableO is None:
+            return None
+        if _cacheL[0] is not None:
+            try:
+                os.makedirs(_cacheL[0], exist_ok=True)
+                tmpP = diskP.with_suffix(".tmp" + str(os.getpid()))
+                with open(tmpP, "wb") as f1:
+                    pickle.dump(statT + (tableO,), f1, 4)
+                os.replace(tmpP, diskP)
+            except OSError:
+                pass
+    _tableD[keyS] = statT + (tableO,)
+
+    return tableO
+
+
+_thousrgx = re.compile(
+    r"^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$")
+_linergx = re.compile("[\r\n]")
+_wsrgx = re.compile("[\t\n\x0b\x0c\r]")  # whitespace replaced by textwrap
+_NONE, _BOOL, _INT, _FLOAT, _STR = 0, 1, 2, 3, 5  # least generic first
+_PADD = {
+    "left": lambda widthI, textS: textS.ljust(widthI),
+    "right": lambda widthI, textS: textS.rjust(widthI),
+    "decimal": lambda widthI, textS: textS.rjust(widthI),
+    "center": lambda widthI, textS: "{0:^{1}s}".format(textS, widthI),
+    "": lambda widthI, textS: textS,
+}
+_LATEXD = {"&": "\\&", "%": "\\%", "$": "\\$", "#": "\\#", "_": "\\_",
+           "^": "\\^{}", "{": "\\{", "}": "\\}", "~": "\\textasciitilde{}",
+           "\\": "\\textbackslash{}", "<": "\\ensuremath{<}",
+           ">": "\\ensuremath{>}"}
+_latexrgx = re.compile("[" + re.escape("".join(_LATEXD)) + "]")
+
+
+def wrap_cell(cellO, widthI: int) -> str:
+    """return cell text wrapped to a column width
+
+    Lines are joined with newlines and a literal \\n in the cell starts a new
+    line.
+
+    Args:
+        cellO: table cell
+        widthI (int): maximum line width
+
+    Returns:
+        str: wrapped cell
+    """
+    cellS = str(cellO)
+    if len(cellS) <= widthI and not _wsrgx.search(cellS):
+        cellS = cellS.rstrip()  # fits one line
+    else:
+        cellS = "\n".join(textwrap.wrap(cellS, widthI))
+    if "\\n" in cellS:
+        cellS = cellS.replace("\\n", "\n")
+
+    return cellS
+
+
+def _cell_type(cellO) -> int:
+    if cellO is None:
+        return _NONE
+    if isinstance(cellO, str):
+        if not cellO:
+            return _NONE
+        if cellO in ("True", "False"):
+            return _BOOL
+        try:
+            int(cellO)
+            return _INT
+        except ValueError:
+            pass
+        if "." not in cellO and _thousrgx.match(cellO):
+            return _INT  # 1,000
+        try:
+            numF = float(cellO)
+        except ValueError:
+            return _FLOAT if _thousrgx.match(cellO) else _STR
+        if not (math.isinf(numF) or math.isnan(numF)):
+            return _FLOAT
+        if cellO.lower() in ("inf", "-inf", "nan"):
+            return _FLOAT
+        return _STR  # overflow
+    if hasattr(cellO, "isoformat"):
+        return _STR  # date and time
+    if type(cellO) is bool:
+        return _BOOL
+    if type(cellO) is int or isinstance(cellO, np.integer):
+        return _INT
+    try:
+        float(cellO)
+        return _FLOAT
+    except (TypeError, ValueError):
+        return _STR
+
+
+def _cell_text(cellO, typeI: int) -> str:
+    if cellO is None:
+        return ""
+    if typeI == _FLOAT:
+        if isinstance(cellO, str) and "," in cellO:
+            cellO = cellO.replace(",", "")
+        try:
+            return format(float(cellO), "g")
+        except (TypeError, ValueError):
+            return str(cellO)
+    if typeI == _INT:
+        return format(cellO, "")
+
+    return str(cellO)
+
+
+def _afterpoint(textS: str) -> int:
+    posI = textS.rfind(".")
+    if posI < 0:
+        posI = textS.lower().rfind("e")
+        if posI < 0:
+            return -1
+    if _cell_type(textS) != _FLOAT:
+        return -1  # text or integer
+
+    return len(textS) - posI - 1
+
+
+def _width(textS: str) -> int:
+    return max(len(i) for i in _linergx.split(textS))  # widest line
+
+
+class _ColStats:
+    """column type and widths from the measuring pass"""
+
+    __slots__ = ("typeI", "strI", "intI", "fltI", "decI", "sdecI", "sfltI")
+
+    def __init__(self):
+        self.typeI = _BOOL
+        self.strI = self.intI = self.fltI = self.sfltI = 0
+        self.decI = self.sdecI = -1
+
+    def add(self, cellO, stripB: bool, decB: bool):
+        """add a cell to the column
+
+        Args:
+            cellO: table cell
+            stripB (bool): strip text column cells
+            decB (bool): align text column cells on the decimal point
+        """
+        textS = "" if cellO is None else str(cellO)
+        if stripB:
+            textS = textS.strip()
+        lenI = len(textS)
+        if _linergx.search(textS):
+            lineL = _linergx.split(textS)
+            lenI = max(len(i) for i in lineL)
+        else:
+            lineL = None
+        if lenI > self.strI:
+            self.strI = lenI
+        if decB:  # text padded after the point, on its last line
+            decI = _afterpoint(textS)
+            self.sdecI = max(self.sdecI, decI)
+            lastI = len(textS) if lineL is None else len(lineL[-1])
+            self.sfltI = max(self.sfltI, lastI - decI)
+        if self.typeI == _STR:
+            return  # text column
+        typeI = _cell_type(cellO)
+        if typeI > self.typeI:
+            self.typeI = typeI
+        if typeI <= _FLOAT:
+            self.intI = max(self.intI, len(_cell_text(cellO, _INT)))
+            fltS = _cell_text(cellO, _FLOAT)
+            decI = _afterpoint(fltS)
+            self.decI = max(self.decI, decI)
+            self.fltI = max(self.fltI, len(fltS) - decI)
+
+
+def _first_cell(rowL: list, fmtS: str) -> list:
+    if fmtS == "rst" and rowL and isinstance(rowL[0], str) \
+            and not rowL[0].strip():
+        rowL = list(rowL)
+        rowL[0] = ".."  # empty first cell ends a reST simple table
+    return rowL
+
+
+def _row_lines(cellL: list, colL: list, multiB: bool, fmtS: str) -> list:
+    if multiB:
+        lineLL = [i.splitlines() for i in cellL]
+        linesI = max(map(len, lineLL))
+        lineLL = [lineL + [" " * col[1]] * (linesI - len(lineL))
+                  for lineL, col in zip(lineLL, colL)]
+        rowLL = [[i[k] for i in lineLL] for k in range(linesI)]
+    else:
+        rowLL = [cellL]
+    if fmtS != "rst":
+        return [("&".join(_latexrgx.sub(lambda m: _LATEXD[m.group()],
+                                        " " + i + " ") for i in rowL)
+                 + "\\\\").rstrip() for rowL in rowLL]
+
+    return ["  ".join(rowL).rstrip() for rowL in rowLL]
+
+
+def _align(textS: str, alignS: str, widthI: int, multiB: bool) -> str:
+    padF = _PADD[alignS]
+    if multiB:
+        return "\n".join(padF(widthI, i) for i in textS.splitlines())
+    return padF(widthI, textS)
+
+
+def table_lines(tableO: Table, colL: list, alignS: str = "left",
+                wrapI: int = 0, fmtS: str = "rst", startI: int = 1):
+    """format a table in chunks of lines
+
+    Row startI of the table is the header row. Numeric columns are aligned
+    on the decimal point and other columns by alignS. Text columns aligned
+    by "decimal" are padded after the point and right aligned as tabulate
+    does. Column widths are the widths of the widest cell lines.
+
+    Args:
+        tableO (Table): table
+        colL (list): column indices
+        alignS (str): left, right, center, decimal or "" for unpadded text
+            columns
+        wrapI (int): wrap cells to this width, 0 to leave cells as read
+        fmtS (str): "rst" simple table, "latex" tabular or "tabulary"
+            tabulary of text width
+        startI (int): header row
+
+    Yields:
+        list: up to CHUNKROWS table lines
+    """
+    if not colL or len(tableO) <= startI:
+        return
+
+    def rowsF():
+        for rowL in tableO.rows(startI, colL):
+            if wrapI:
+                rowL = [wrap_cell(i, wrapI) for i in rowL]
+            yield _first_cell(rowL, fmtS)
+
+    stripB = alignS not in ("", "decimal")
+    decB = alignS == "decimal"
+    rowsO = rowsF()
+    hdrL = [str(i) for i in next(rowsO)]
+    multiB = fmtS == "rst" and any(_linergx.search(i) for i in hdrL)
+    statL = [_ColStats() for i in colL]
+    dataB = False
+    for rowL in rowsO:  # measuring pass
+        dataB = True
+        for stat, cellO in zip(statL, rowL):
+            stat.add(cellO, stripB, decB)
+            if fmtS == "rst" and not multiB and isinstance(cellO, str) \
+                    and _linergx.search(cellO):
+                multiB = True
+    layL = []  # column [type, width, align, decimals]
+    for stat, hdrS in zip(statL, hdrL):
+        widthI = _width(hdrS) + 2
+        if not dataB:
+            layL.append([_STR, widthI, alignS, -1])
+        elif stat.typeI == _INT:
+            layL.append([_INT, max(widthI, stat.intI), "decimal", -1])
+        elif stat.typeI == _FLOAT:
+            layL.append([_FLOAT, max(widthI, stat.fltI + stat.decI),
+                         "decimal", stat.decI])
+        elif decB:
+            layL.append([stat.typeI, max(widthI, stat.strI,
+                                         stat.sfltI + stat.sdecI),
+                         alignS, stat.sdecI])
+        else:
+            layL.append([stat.typeI, max(widthI, stat.strI), alignS, -1])
+
+    if fmtS == "latex":
+        letterD = {"left": "l", "right": "r", "center": "c", "decimal": "r"}
+        ruleS, envS = "\\hline", "tabular"
+        lineL = ["\\begin{tabular}{" + "".join(
+            letterD.get(i[2], "l") for i in layL) + "}", ruleS]
+    elif fmtS == "tabulary":
+        letterD = {"left": "L", "right": "R", "center": "C", "decimal": "R"}
+        ruleS, envS = "\\hline", "tabulary"
+        lineL = ["\\begin{tabulary}{1.0\\textwidth}{" + "".join(
+            letterD.get(i[2], "L") for i in layL) + "}", ruleS]
+    else:
+        ruleS = "  ".join("=" * i[1] for i in layL).rstrip()
+        lineL = [ruleS]
+    cellL = []
+    for lay, hdrS in zip(layL, hdrL):
+        if multiB:
+            hdrS = "\n".join(_PADD[lay[2]](lay[1], i)
+                             for i in _linergx.split(hdrS))
+        else:
+            hdrS = _PADD[lay[2]](lay[1], hdrS)
+        cellL.append(hdrS)
+    lineL += _row_lines(cellL, layL, multiB, fmtS)
+    lineL.append(ruleS)
+    rowsO = rowsF()
+    next(rowsO)
+    for rowL in rowsO:  # formatting pass
+        cellL = []
+        for lay, cellO in zip(layL, rowL):
+            textS = _cell_text(cellO, lay[0])
+            if lay[3] >= 0:  # pad after the point
+                textS += " " * (lay[3] - _afterpoint(textS))
+            elif stripB and lay[0] != _INT:
+                textS = textS.strip()
+            cellL.append(_align(textS, lay[2], lay[1], multiB))
+        lineL += _row_lines(cellL, layL, multiB, fmtS)
+        if len(lineL) >= CHUNKROWS:
+            yield lineL
+            lineL = []
+    lineL.append(ruleS)
+    if fmtS != "rst":
+        lineL.append("\\end{" + envS + "}")
+    yield lineL
+
+
+def write_table(writeF, tableO: Table, colL: list, alignS: str = "left",
+                wrapI: int = 0, fmtS: str = "rst", indentS: str = ""):
+    """write a formatted table in chunks
+
+    Args:
+        writeF (callable): called with each chunk of text
+        tableO (Table): table, row 1 is the header row
+        colL (list): column indices
+        alignS (str): alignment of text columns
+        wrapI (int): wrap cells to this width, 0 to leave cells as read
+        fmtS (str): "rst", "latex" or "tabulary"
+        indentS (str): prefix of each line
+    """
+    for lineL in table_lines(tableO, colL, alignS, wrapI, fmtS):
+        writeF("".join(indentS + i + "\n" for i in lineL))
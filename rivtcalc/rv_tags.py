@@ -0,0 +1,82 @@
+#! python
+"""formats rivt tags
+
+TagFormat is shared by the UTF and reST classes. A tagged line is split
+into its tag and text by rv_parse.split_tag and the text is passed to the
+handler for the tag in the class _TAGD dictionary. Lines with a tag that
+has no handler are written unchanged. Equation, table and figure labels are
+numbered here for both outputs."""
+
+import rivtcalc.rv_parse as _rv_parse
+
+
+class TagFormat:
+    """tag dispatch and label numbering"""
+
+    _TAGD = {}  # tag: handler(self, textS, lineS) -> formatted str
+
+    def _refs(self, objnumI: int, typeS: str) -> str:
+        """reference label for equations, tables and figures
+
+        Args:
+            objnumI (int): equation, table or figure numbers
+            typeS (str): label type
+
+        Returns:
+            refS (str): reference label
+        """
+
+        objfillS = str(objnumI).zfill(2)
+        cnumSS = str(self.setsectD["cnumS"])
+        refS = typeS + cnumSS + "." + objfillS
+
+        return refS
+
+    def _count(self, keyS: str) -> int:
+        """increment a section counter once per node
+
+        Args:
+            keyS (str): counter key in section settings
+
+        Returns:
+            int: counter value for the current node
+        """
+        if keyS not in self.resD:
+            self.resD[keyS] = int(self.setsectD[keyS]) + 1
+            self.setsectD[keyS] = self.resD[keyS]
+
+        return self.resD[keyS]
+
+    def _label(self, keyS: str, typeS: str) -> str:
+        """return next reference label of a counter
+
+        Args:
+            keyS (str): counter key (enumI, tnumI, fnumI)
+            typeS (str): label type
+
+        Returns:
+            str: reference label
+        """
+        return self._refs(self._count(keyS), typeS)
+
+    def _tags(self, tagS: str, tagL: list, tokL: list = None) -> str:
+        """format tagged line
+
+        Args:
+            tagS (str): rivt-string line with tag
+            tagL (list): tags valid for the rivt-string type
+            tokL (list): tag tokens of the line node, lexed if None
+
+        Returns:
+            str: formatted line
+        """
+        tagS = tagS.rstrip()
+        tagT = _rv_parse.split_tag(
+            tagS, tagL, None if tokL is None else tuple(tokL))
+        if tagT is None:
+            return tagS
+        handlerF = self._TAGD.get(tagT[0])
+        if handlerF is None:
+            return tagS
+
+        return handlerF(self, tagT[1], tagS)
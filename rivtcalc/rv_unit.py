@@ -18,7 +18,7 @@ if 1 == 1:
     from unum.utils import *
     from unum.core import Unum
     from unum.utils import uarray
-print(sys.path)
+    from unum.quantity import QArray, qarray
 
 Unum.set_format(
     mul_separator=" ",
@@ -29,7 +29,6 @@ Unum.set_format(
     superscript=False,
 )
 
-print(dir())
 # standard SI units - do not modify bewtween double lines ======================
 K = new_unit("K", 0, "kelvin")
 CELSIUS = new_unit("deg C", K, "degree Celsius")
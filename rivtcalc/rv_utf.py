@@ -14,168 +14,144 @@ import re
 import io
 import logging
 import numpy.linalg as la
-import pandas as pd
-import sympy as sp
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-import html2text as htm
-from IPython.display import display as _display
-from IPython.display import Image as _Image
 from io import StringIO
-from sympy.parsing.latex import parse_latex
-from sympy.abc import _clash2
-from tabulate import tabulate
 from pathlib import Path
 from numpy import *
 import rivtcalc.rv_unit
+import rivtcalc.rv_eval as _rv_eval
+import rivtcalc.rv_sym as _rv_sym
+import rivtcalc.rv_table as _rv_table
+from rivtcalc.rv_unit import QArray, qarray
+from rivtcalc.rv_lazy import LazyModule, sp, plt, mpimg, htm
+from rivtcalc.rv_lazy import spabc as _abc, tab as _tab
+from rivtcalc.rv_buf import OutBuf
+from rivtcalc.rv_tags import TagFormat
+
+_RESL = ("hdrL", "valL", "rowL")  # assignment results used by rst walk
+
+_ipd = LazyModule("IPython.display", "image display")
 
 logging.getLogger("numexpr").setLevel(logging.WARNING)
 # tabulate.PRESERVE_WHITESPACE = True
 
 
-class OutputUTF:
+class OutputUTF(TagFormat):
     """convert rivt-string to UTF8 calc and write to terminal"""
 
     def __init__(
         self,
-        strL: list,
+        nodeL: list,
         folderD: dict,
         setcmdD: dict,
         setsectD: dict,
         rivtD: dict,
         exportS: str,
+        outO: OutBuf = None,
     ):
         """process rivt-string to UTF8 calc-string
 
         The OutputUTF class converts rivt-strings to calc-strings.
 
         Args:
-            strL (list): calc lines
+            nodeL (list): rivt-string nodes
             folderD (dict): folder paths
             setcmdD (dict): command settings
             setsectD (dict): section settings
-            rivtD (dict): global rivt dictionary
+            rivtD (Namespace): calc values namespace
             exportS (str): stores values that are written to file
+            outO (OutBuf): calc output buffer, a new buffer if None
         """
 
-        self.calcS = """"""  # utf calc string
+        self.calcS = OutBuf() if outO is None else outO  # utf calc string
         self.exportS = exportS
-        self.strL = strL
+        self.nodeL = nodeL
+        self.resD = {}  # results for current node
         self.folderD = folderD
         self.setsectD = setsectD
         self.setcmdD = setcmdD
         self.rivtD = rivtD
+        self.engine = _rv_eval.AssignEngine(rivtD)  # rivtD is a Namespace
         self.valL = []  # value list
 
-    def _refs(self, objnumI: int, typeS: str) -> str:
-        """reference label for equations, tables and figures
-
-        Args:
-            objnumI (int): equation, table or figure section number
-            typeS (str): label type
-
-        Returns:
-            refS (str): reference label
-        """
-
-        objfillS = str(objnumI).zfill(2)
-        sfillS = str(self.setsectD["snumS"]).strip().zfill(2)
-        cnumSS = str(self.setsectD["cnumS"])
-        refS = typeS + cnumSS + "." + objfillS
-
-        return refS
-
-    def _tags(self, tagS: str, tagL: list) -> tuple:
-        """parse tag
-
-        Args:
-            tagS (str): rivt-string with tag
-            tagL (list): list of tag parameters
-            setsectD (dict): section dictionary
-
-        Return:
-            uS (str): utf string
-        """
-
-        tagS = tagS.rstrip()
-        uS = ""
-        swidthII = self.setsectD["swidthI"] - 1
-        try:
-            tag = list(set(tagL).intersection(tagS.split()))[0]
-        except:
-            uS = tagS
-            return uS
-
-        if tag == "[#]_":  # auto increment footnote mark
-            ftnumII = self.setsectD["ftqueL"][-1] + 1
-            self.setsectD["ftqueL"].append(ftnumII)
-            uS = tagS.replace("[x]_", "[" + str(ftnumII) + "]")
-        elif tag == "[foot]_":  # footnote label
-            tagS = tagS.strip("[foot]_").strip()
-            uS = self.setsectD["ftqueL"].popleft() + tagS
-        elif tag == "[page]_":  # new page
-            uS = int(self.setsectD["swidthI"]) * "."
-        elif tag == "[line]_":  # horizontal line
-            uS = int(self.setsectD["swidthI"]) * "-"
-        elif tag == "[link]_":  # url link
-            tgS = tagS.strip("[link]_").strip()
-            tgL = tgS.split("|")
-            uS = tgL[0].strip() + " : " + tgL[1].strip()
-        elif tag == "[literal]_":  # literal text
-            uS = "\n"
-        elif tag == "[latex]_":  # literal text
-            uS = "\n"
-        elif tag == "[r]_":  # right adjust text
-            tagL = tagS.strip().split("[r]_")
-            uS = (tagL[0].strip()).rjust(swidthII)
-        elif tag == "[c]_":  # center text
-            tagL = tagS.strip().split("[c]_")
-            uS = (tagL[0].strip()).rjust(swidthII)
-        elif tag == "[f]_":  # figure caption
-            tagL = tagS.strip().split("[f]_")
-            fnumI = int(self.setsectD["fnumI"]) + 1
-            self.setsectD["fnumI"] = fnumI
-            refS = self._refs(fnumI, "[ Fig: ") + " ]"
-            spcI = self.setsectD["swidthI"] - len(refS) - len(tagL[0].strip())
-            uS = tagL[0].strip() + " " * spcI + refS
-        elif tag == "[e]_":  # equation label
-            tagL = tagS.strip().split("[e]_")
-            enumI = int(self.setsectD["enumI"]) + 1
-            self.setsectD["enumI"] = enumI
-            refS = self._refs(enumI, "[ Equ: ") + " ]"
-            spcI = self.setsectD["swidthI"] - len(refS) - len(tagL[0].strip())
-            uS = tagL[0].strip() + " " * spcI + refS
-        elif tag == "[t]_":  # table label
-            tagL = tagS.strip().split("[t]_")
-            tnumI = int(self.setsectD["tnumI"]) + 1
-            self.setsectD["tnumI"] = tnumI
-            refS = self._refs(tnumI, "[Table: ") + " ]"
-            spcI = self.setsectD["swidthI"] - len(refS) - len(tagL[0].strip())
-            uS = tagL[0].strip() + " " * spcI + refS
-        elif tag == "[x]_":  # format tex
-            tagL = tagS.strip().split("[x]_")
-            txS = tagL[0].strip()
-            # txS = txs.encode('unicode-escape').decode()
-            ptxS = parse_latex(txS)
-            uS = sp.pretty(sp.sympify(ptxS, _clash2, evaluate=False))
-        elif tag == "[s]_":  # format sympy
-            tagL = tagS.strip().split("[s]_")
-            spS = tagL[0].strip()
-            spL = spS.split("=")
-            spS = "Eq(" + spL[0] + ",(" + spL[1] + "))"
-            # sps = sps.encode('unicode-escape').decode()
-            uS = sp.pretty(sp.sympify(spS, _clash2, evaluate=False))
-        elif tag == "[n]_":  # new line
-            tagL = tagS.strip().split("[n]_")
-            tagS = tagL[0]
-            uS = tagS
-        else:
-            uS = tagS
-
-        return uS
+    def _tfnote(self, textS: str, lineS: str) -> str:
+        """[#]_ auto increment footnote mark"""
+        self.setsectD["ftqueL"].append(self.setsectD["ftqueL"][-1] + 1)
+        return lineS
+
+    def _tfoot(self, textS: str, lineS: str) -> str:
+        """[foot]_ footnote description"""
+        return "[" + str(self.setsectD["ftqueL"].popleft()) + "] " + textS
+
+    def _tpage(self, textS: str, lineS: str) -> str:
+        """[page]_ new page"""
+        return int(self.setsectD["swidthI"]) * "."
+
+    def _tline(self, textS: str, lineS: str) -> str:
+        """[line]_ horizontal line"""
+        return int(self.setsectD["swidthI"]) * "-"
+
+    def _tlink(self, textS: str, lineS: str) -> str:
+        """[link]_ url link"""
+        tgL = textS.split("|")
+        return tgL[0].strip() + " : " + tgL[1].strip()
+
+    def _tblock(self, textS: str, lineS: str) -> str:
+        """[literal]_ and [latex]_ blocks"""
+        return "\n"
+
+    def _tright(self, textS: str, lineS: str) -> str:
+        """[r]_ right adjust text, [c]_ center text"""
+        return textS.rjust(self.setsectD["swidthI"] - 1)
+
+    def _tlabel(self, textS: str, keyS: str, typeS: str) -> str:
+        refS = self._label(keyS, typeS) + " ]"
+        spcI = self.setsectD["swidthI"] - len(refS) - len(textS)
+        return textS + " " * spcI + refS
+
+    def _tfig(self, textS: str, lineS: str) -> str:
+        """[f]_ figure caption"""
+        return self._tlabel(textS, "fnumI", "[ Fig: ")
+
+    def _tequ(self, textS: str, lineS: str) -> str:
+        """[e]_ equation label"""
+        return self._tlabel(textS, "enumI", "[ Equ: ")
+
+    def _ttable(self, textS: str, lineS: str) -> str:
+        """[t]_ table label"""
+        return self._tlabel(textS, "tnumI", "[Table: ")
+
+    def _ttex(self, textS: str, lineS: str) -> str:
+        """[x]_ format LaTeX equation"""
+        return _rv_sym.tex_pretty(textS)
+
+    def _tsym(self, textS: str, lineS: str) -> str:
+        """[s]_ format sympy equation"""
+        return _rv_sym.sym_pretty(textS)
+
+    def _tnew(self, textS: str, lineS: str) -> str:
+        """[n]_ new line"""
+        return textS
+
+    _TAGD = {
+        "[#]_": _tfnote,
+        "[foot]_": _tfoot,
+        "[page]_": _tpage,
+        "[line]_": _tline,
+        "[link]_": _tlink,
+        "[literal]_": _tblock,
+        "[latex]_": _tblock,
+        "[r]_": _tright,
+        "[c]_": _tright,
+        "[f]_": _tfig,
+        "[e]_": _tequ,
+        "[t]_": _ttable,
+        "[x]_": _ttex,
+        "[s]_": _tsym,
+        "[n]_": _tnew,
+    }
 
     def _parseUTF(self, typeS: str, cmdL: list, methL: list, tagL: list):
-        """parse rivt-string to UTF
+        """walk rivt-string nodes and write UTF
 
         Args:
             typeS (str): rivt-string type
@@ -183,16 +159,11 @@ class OutputUTF:
             methL (list): method list
             tagL (list): tag list
         """
-        locals().update(self.rivtD)
-        uL = []  # command arguments
-        indxI = -1  # method index
-        _rgx = r"\[([^\]]+)]_"  # find tags
-
-        for uS in self.strL:
-            if uS[0:2] == "##":
-                continue  # remove review comment
-            uS = uS[4:]  # remove indent
-            if len(uS) == 0:
+        for nodeT in self.nodeL:
+            kindS, uS, uL, self.resD = nodeT
+            if kindS == "sect":
+                continue
+            if kindS == "blank":
                 if len(self.valL) > 0:  # print value table
                     hdrL = ["variable", "value", "[value]", "description"]
                     alignL = ["left", "right", "right", "left"]
@@ -200,52 +171,29 @@ class OutputUTF:
                     self.valL = []
                     print(uS.rstrip(" "))
                     self.calcS += " \n"
-                    self.rivtD.update(locals())
-                    continue
                 else:
                     print(" ")
                     self.calcS += "\n"
-                    continue
-            try:
-                if uS[0] == "#":
-                    continue  # remove comment
-            except:
-                print(" ")  # if uS[0] throws error
-                self.calcS += "\n"
                 continue
-            if re.search(_rgx, uS):  # check for tag
-                utgS = self._tags(uS, tagL)
+            if kindS == "tag":
+                utgS = self._tags(uS, tagL, uL)
                 print(utgS.rstrip())
                 self.calcS += utgS.rstrip() + "\n"
                 continue
-            if typeS == "values":
-                self.setcmdD["saveB"] = False
-                if "=" in uS and uS.strip()[-2] == "||":  # set save flag
-                    uS = uS.replace("||", " ")
-                    self.setcmdD["saveB"] = True
-                if "=" in uS:  # just assign value
-                    uL = uS.split("|")
-                    self._vassign(uL)
-                    continue
-            if typeS == "table":
-                if uS[0:2] == "||":  # check for command
-                    uL = uS[2:].split("|")
-                    indxI = cmdL.index(uL[0].strip())
-                    methL[indxI](uL)
-                    continue
-                else:
-                    exec(uS)  # otherwise exec Python code
-                    continue
-            if uS[0:2] == "||":  # check for command
-                uL = uS[2:].split("|")
+            if kindS == "assign":
+                self.setcmdD["saveB"] = uS.rstrip()[-2:] == "||"
+                self._vassign(uL)
+                continue
+            if kindS == "code":
+                self.rivtD.exec(uS)  # table-string code
+                continue
+            if kindS == "cmd":
                 indxI = cmdL.index(uL[0].strip())
                 methL[indxI](uL)
                 continue
-
             if typeS != "table":  # skip table print
                 print(uS)
                 self.calcS += uS.rstrip() + "\n"
-            self.rivtD.update(locals())
 
     def r_utf(self) -> str:
         """parse repository string
@@ -407,21 +355,15 @@ class OutputUTF:
         if len(iL) < 4:
             iL += [""] * (4 - len(iL))  # pad parameters
         utfS = ""
-        contentL = []
         sumL = []
         fileS = iL[1].strip()
         calpS = self.setsectD["fnumS"]
         tfileS = Path(self.folderD["cpathcur"] / fileS)
-        extS = fileS.split(".")[1]
-        if extS == "csv":
-            with open(tfileS, "r") as csvfile:  # read csv file
-                readL = list(csv.reader(csvfile))
-        elif extS == "xlsx":
-            pDF1 = pd.read_excel(tfileS, header=None)
-            readL = pDF1.values.tolist()
-        else:
+        tableO = _rv_table.read_table(tfileS)
+        if tableO is None:
             return
-        incl_colL = list(range(len(readL[1])))
+        self.resD["tableO"] = tableO
+        incl_colL = list(range(tableO.width(1)))
         widthI = self.setcmdD["cwidthI"]
         alignS = self.setcmdD["calignS"]
         saS = alignD[alignS]
@@ -432,46 +374,21 @@ class OutputUTF:
             saS = alignD[alignS]  # new align
             self.setcmdD.update({"cwidthI": widthI})
             self.setcmdD.update({"calignS": alignS})
+        incl_colL = _rv_table.columns(iL[3], len(incl_colL))  # columns
         totalL = [""] * len(incl_colL)
-        if iL[3].strip():  # columns
-            if iL[3].strip() == "[:]":
-                totalL = [""] * len(incl_colL)
-            else:
-                incl_colL = eval(iL[3].strip())
-                totalL = [""] * len(incl_colL)
-        ttitleS = readL[0][0].strip() + " [t]_"
+        ttitleS = str(tableO.cell(0, 0)).strip() + " [t]_"
         utgS = self._tags(ttitleS, itagL)
         print(utgS.rstrip() + "\n")
         self.calcS += utgS.rstrip() + "\n\n"
-        for row in readL[1:]:
-            contentL.append([row[i] for i in incl_colL])
-        wcontentL = []
-        for rowL in contentL:  # wrap columns
-            wrowL = []
-            for iS in rowL:
-                templist = textwrap.wrap(str(iS), int(widthI))
-                templist = [i.replace("""\\n""", """\n""") for i in templist]
-                wrowL.append("""\n""".join(templist))
-            wcontentL.append(wrowL)
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        output.write(
-            tabulate(
-                wcontentL,
-                tablefmt="rst",
-                headers="firstrow",
-                numalign="decimal",
-                stralign=saS,
-            )
-        )
-        utfS = output.getvalue()
-        sys.stdout = old_stdout
-
         print(str(tfileS))
-        print(utfS)
         self.calcS += str(tfileS) + "\n"
-        self.calcS += utfS + "\n"
+
+        def writeF(textS):
+            sys.stdout.write(textS)
+            self.calcS += textS
+
+        _rv_table.write_table(
+            writeF, tableO, incl_colL, saS, int(widthI), "rst")
 
     def _iimage(self, iL: list):
         """insert one or two images from file
@@ -497,7 +414,7 @@ class OutputUTF:
             for fS in [img1S, img2S]:
                 utfS += "Figure path: " + fS + "\n"
                 try:
-                    _display(_Image(fS))
+                    _ipd.display(_ipd.Image(fS))
                 except:
                     pass
             print(utfS)
@@ -511,7 +428,7 @@ class OutputUTF:
             img1S = str(Path(self.folderD["dpathcur"] / file1S))
             utfS += "Figure path: " + img1S + "\n"
             try:
-                _display(_Image(img1S))
+                _ipd.display(_ipd.Image(img1S))
             except:
                 pass
             print(utfS)
@@ -558,7 +475,6 @@ class OutputUTF:
             exportS (list): value strings for export
         """
 
-        locals().update(self.rivtD)
         vcmdL = ["config", "value", "data", "func", "text", "table", "image"]
         vmethL = [
             self._vconfig,
@@ -587,7 +503,6 @@ class OutputUTF:
         ]
 
         self._parseUTF("values", vcmdL, vmethL, vtagL)
-        self.rivtD.update(locals())
         return self.calcS, self.setsectD, self.setcmdD, self.rivtD, self.exportS
 
     def _vconfig(self, vL: list):
@@ -601,51 +516,94 @@ class OutputUTF:
         self.setcmdD["trmrI"] = vL[2].split(",")[0].strip()
         self.setcmdD["trmtI"] = vL[2].split(",")[1].strip()
 
+    def _units(self, unitS: str) -> tuple:
+        """return primary and secondary unit strings
+
+        Args:
+            unitS (str): unit field (unit, alt unit)
+
+        Returns:
+            tuple: primary unit, secondary unit (primary if missing)
+        """
+        unitL = unitS.split(",")
+        unit1S = unitL[0].strip()
+        unit2S = unitL[1].strip() if len(unitL) > 1 else unit1S
+        return unit1S, unit2S or unit1S
+
     def _vassign(self, vL: list):
         """assign values to variables and equations
 
+        If the assignment and the variables it reads are unchanged since
+        the previous run, the value and formatted text of that run are
+        reused; otherwise the assignment is evaluated and formatted.
+
         Args:
             vL (list): list of assignments
         """
-        locals().update(self.rivtD)
         rprecS = str(self.setcmdD["trmrI"])  # trim numbers
-        tprecS = str(self.setcmdD["trmtI"])
-        fltfmtS = "." + rprecS.strip() + "f"
-        exec("set_printoptions(precision=" + rprecS + ")")
-        exec("Unum.set_format(value_format = '%." + rprecS + "f')")
+        _rv_eval.set_precision(int(rprecS))
+        varS = vL[0].split("=")[0].strip()
+        valS = vL[0].split("=", 1)[1].strip()
+        depO = self.rivtD.deps
+        keyT = depO.key(varS)
+        srcS = repr((vL, rprecS, self.setcmdD["subB"]))
+        readT = depO.reads(self.rivtD, [valS] + list(self._units(vL[1])))
+        prevD = depO.lookup(self.rivtD, keyT, srcS, readT)
+        if prevD is None:
+            outO, self.calcS = self.calcS, OutBuf()
+            self._veval(vL, varS, valS, rprecS)
+            textS, self.calcS = self.calcS.getvalue(), outO
+            resD = {k: v for k, v in self.resD.items() if k in _RESL}
+            valO = self.rivtD.get(varS.split("[")[0].split(".")[0].strip())
+            depO.record(self.rivtD, keyT, srcS, readT, valO, resD, textS, False)
+        else:
+            self.rivtD.bind(varS, prevD["valO"])
+            textS = prevD["textS"]
+            self.resD.update(prevD["resD"])
+            if "rowL" in prevD["resD"]:
+                self.valL.append(prevD["resD"]["rowL"])
+            if textS:
+                print(textS)
+            depO.record(self.rivtD, keyT, srcS, readT, prevD["valO"],
+                        prevD["resD"], textS, True)
+        self.calcS += textS
+        if self.setcmdD["saveB"] == True:
+            if len(vL) <= 2:
+                pyS = vL[0] + vL[1] + "  # equation" + "\n"
+            else:
+                pyS = vL[0] + vL[1] + vL[2] + "\n"
+            self.exportS += pyS
+
+    def _veval(self, vL: list, varS: str, valS: str, rprecS: str):
+        """evaluate and format an assignment
+
+        The right hand side is compiled once and evaluated once; display
+        values are derived from the result.
+
+        Args:
+            vL (list): list of assignments
+            varS (str): variable
+            valS (str): expression
+            rprecS (str): result precision
+        """
         if len(vL) <= 2:  # equation
-            varS = vL[0].split("=")[0].strip()
-            valS = vL[0].split("=")[1].strip()
             if vL[1].strip() != "DC" and vL[1].strip() != "":
-                unitL = vL[1].split(",")
-                unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
-                val1U = val2U = array(eval(valS))
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                unit1S, unit2S = self._units(vL[1])
+                valU = self.engine.assign(varS, valS, unit1S)
+                if isinstance(valU, QArray):
+                    val1U = valU.cast_unit(self.engine.eval(unit1S))
                 else:
-                    cmdS = varS + "= " + valS
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS).cast_unit(eval(unit1S))
-                    valdec = ("%." + str(rprecS) + "f") % valU.number()
-                    val1U = str(valdec) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                    unitU = valU.cast_unit(self.engine.eval(unit1S))
+                    valdec = ("%." + str(rprecS) + "f") % unitU.number()
+                    val1U = str(valdec) + " " + str(unitU.unit())
+                val2U = valU.cast_unit(self.engine.eval(unit2S))
             else:  # no units
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
-                exec(cmdS, globals(), locals())
-                # valU = eval(varS).cast_unit(eval(unit1S))
-                # valdec = ("%." + str(rprecS) + "f") % valU.number()
-                # val1U = str(valdec) + " " + str(valU.unit())
-                val1U = eval(varS)
-                val1U = val1U.simplify_unit()
+                val1U = self.engine.assign(varS, valS).simplify_unit()
                 val2U = val1U
-            utfS = vL[0]
-            spS = "Eq(" + varS + ",(" + valS + "))"
-            utfS = sp.pretty(sp.sympify(spS, _clash2, evaluate=False))
+            utfS = _rv_sym.eq_pretty(varS, valS)
             print("\n" + utfS + "\n")  # pretty print equation
             self.calcS += "\n" + utfS + "\n"
-            eqS = sp.sympify(valS)
-            eqatom = eqS.atoms(sp.Symbol)
+            eqatom = _rv_sym.eq_atoms(valS)
             if self.setcmdD["subB"]:  # substitute into equation
                 self._vsub(vL)
             else:  # write equation table
@@ -655,54 +613,38 @@ class OutputUTF:
                 valL.append(str(val1U) + "  [" + str(val2U) + "]")
                 for sym in eqatom:
                     hdrL.append(str(sym))
-                    symU = eval(str(sym))
-                    valL.append(str(symU.simplify_unit()))
+                    symU = self.engine.eval(str(sym))
+                    if hasattr(symU, "simplify_unit"):
+                        symU = symU.simplify_unit()
+                    valL.append(str(symU))
                 alignL = ["center"] * len(valL)
                 self._vtable([valL], hdrL, "rst", alignL)
-            if self.setcmdD["saveB"] == True:
-                pyS = vL[0] + vL[1] + "  # equation" + "\n"
-                # print(pyS)
-                self.exportS += pyS
-            locals().update(self.rivtD)
+                self.resD.update({"hdrL": hdrL, "valL": valL})
         elif len(vL) >= 3:  # value
             descripS = vL[2].strip()
-            varS = vL[0].split("=")[0].strip()
-            valS = vL[0].split("=")[1].strip()
-            val1U = val2U = array(eval(valS))
             if vL[1].strip() != "" and vL[1].strip() != "-":
-                unitL = vL[1].split(",")
-                unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                unit1S, unit2S = self._units(vL[1])
+                valU = self.engine.assign(varS, valS, unit1S)
+                if isinstance(valU, QArray):
+                    val1U = valU
                 else:
-                    cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
                     val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                val2U = valU.cast_unit(self.engine.eval(unit2S))
             else:
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
-                exec(cmdS, globals(), locals())
-                valU = eval(varS)
-                # val1U = str(valU.number()) + " " + str(valU.unit())
+                valU = self.engine.assign(varS, valS)
+                val1U = array(valU.number())
                 val2U = valU
             self.valL.append([varS, val1U, val2U, descripS])
-            if self.setcmdD["saveB"] == True:
-                pyS = vL[0] + vL[1] + vL[2] + "\n"
-                # print(pyS)
-                self.exportS += pyS
-        self.rivtD.update(locals())
+            self.resD["rowL"] = self.valL[-1]
 
     def _vtable(self, tbl, hdrL, tblfmt, alignL):
         """write value table"""
 
-        locals().update(self.rivtD)
         sys.stdout.flush()
         old_stdout = sys.stdout
         output = StringIO()
         output.write(
-            tabulate(
+            _tab.tabulate(
                 tbl, tablefmt=tblfmt, headers=hdrL, showindex=False, colalign=alignL
             )
         )
@@ -711,7 +653,6 @@ class OutputUTF:
         sys.stdout.flush()
         print(utfS)
         self.calcS += utfS + "\n"
-        self.rivtD.update(locals())
 
     def _vvalue(self, vL: list):
         """import values from files
@@ -720,15 +661,12 @@ class OutputUTF:
             vL (list): value command arguments
         """
 
-        locals().update(self.rivtD)
         valL = []
         if len(vL) < 5:
             vL += [""] * (5 - len(vL))  # pad command
         calpS = "c" + self.setsectD["cnumS"]
         vfileS = Path(self.folderD["cpathcur"] / vL[1].strip())
-        with open(vfileS, "r") as csvfile:
-            readL = list(csv.reader(csvfile))
-        for vaL in readL[1:]:
+        for vaL in _rv_table.read_table(vfileS).rows(1):
             if len(vaL) < 5:
                 vaL += [""] * (5 - len(vL))  # pad values
             varS = vaL[0].strip()
@@ -738,22 +676,20 @@ class OutputUTF:
             if not len(varS):
                 valL.append(["---------", " ", " ", " "])  # totals
                 continue
-            val1U = val2U = array(eval(valS))
             if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                valU = self.engine.assign(varS, valS, unit1S)
+                if isinstance(valU, QArray):
+                    val1U = valU
                 else:
-                    cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
                     val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                val2U = valU.cast_unit(self.engine.eval(unit2S or unit1S))
+            else:
+                val1U = val2U = array(self.engine.eval(valS))
             valL.append([varS, val1U, val2U, descripS])
         hdrL = ["variable", "value", "[value]", "description"]
         alignL = ["left", "right", "right", "left"]
         self._vtable(valL, hdrL, "rst", alignL)
-        self.rivtD.update(locals())
+        self.resD["valL"] = valL
 
     def _vdata(self, vL: list):
         """import data from files
@@ -762,28 +698,23 @@ class OutputUTF:
             vL (list): data command arguments
         """
 
-        locals().update(self.rivtD)
         valL = []
         if len(vL) < 5:
             vL += [""] * (5 - len(vL))  # pad command
         valL.append(["variable", "values"])
         vfileS = Path(self.folderD["cpath"] / vL[2].strip())
-        vecL = eval(vL[3].strip())
-        with open(vfileS, "r") as csvF:
-            reader = csv.reader(csvF)
-        vL = list(reader)
-        for i in vL:
+        vecL = self.rivtD.eval(vL[3].strip())
+        for i in _rv_table.read_table(vfileS).rows():
             varS = i[0]
             varL = array(i[1:])
-            cmdS = varS + "=" + str(varL)
-            exec(cmdS, globals(), locals())
+            self.rivtD.bind(varS, varL)
             if len(varL) > 4:
-                varL = str((varL[:2]).append(["..."]))
+                varL = str(list(varL[:2]) + ["..."])
             valL.append([varS, varL])
         hdrL = ["variable", "values"]
         alignL = ["left", "right"]
         self._vtable(valL, hdrL, "rst", alignL)
-        self.rivtD.update(locals())
+        self.resD["valL"] = valL
 
     def _vsub(self, eqL: list, eqS: str):
         """substitute numbers for variables in printed output
@@ -804,7 +735,7 @@ class OutputUTF:
         try:
             eqS = "Eq(" + eqL[0] + ",(" + eqL[1] + "))"
             # sps = sps.encode('unicode-escape').decode()
-            utfs = sp.pretty(sp.sympify(eqS, _clash2, evaluate=False))
+            utfs = sp.pretty(sp.sympify(eqS, _abc._clash2, evaluate=False))
             print(utfs)
             self.calcl.append(utfs)
         except:
@@ -867,7 +798,7 @@ class OutputUTF:
         """
 
         tcmdL = ["text", "table", "image", "latex"]
-        tmethL = [self._itext, self._itable, self._iimage, self.ilatex]
+        tmethL = [self._itext, self._itable, self._iimage, self._ilatex]
         ttagL = [
             "[page]_",
             "[line]_",
@@ -0,0 +1,128 @@
+#! python
+"""benchmark equation rendering - rv_eqn fast path against sympy
+
+Collects the equations of V() strings (assignments with one unit field) from
+the calc files of a project, or uses built-in sample equations, and renders
+each with sympy and with the rv_eqn fast path. The render cache is not used.
+With --diff the fast path renderings that differ from sympy are listed.
+
+    python bench_eqn.py [project folder or calc files] [-n repeats] [--diff]
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+import rivtcalc.rv_eqn as _rv_eqn  # noqa: E402
+import rivtcalc.rv_sym as _rv_sym  # noqa: E402
+from rivtcalc.rv_batch import find_calcs, find_project  # noqa: E402
+
+_eqrgx = re.compile(r"^\s*([A-Za-z_]\w*)\s*=\s*([^|]+?)\s*\|[^|]*$")
+SAMPLEL = [
+    ("v1", "x1 + 4*y1"), ("aa2", "a11*4"), ("M", "w*L**2/8"),
+    ("fb", "M*c/I1"), ("fa", "P/A"), ("f1", "P/A + M*c/I1"),
+    ("wu", "1.2*D + 1.6*L"), ("Mn", "Fy*Zx/12"), ("Mu", "wu*L**2/8"),
+    ("d1", "5*w*L**4/(384*Es*I1)"), ("Vc", "2*sqrt(f)*b*d"),
+    ("r1", "(x1 + y1)**2"), ("h2", "sin(t1)*h1"), ("s1", "M/(b*d**2/6)"),
+    ("a3", "a - b/c"), ("m1", "w1*x1"), ("p1", "x + 2*y/3 - z"),
+    ("phiMn", "phi*Mn"), ("e1", "exp(k*t)"), ("s2", "(b*d**2/6)/M"),
+    ("s3", "M/(b/c)"), ("s4", "P/(A*c**-1)"),
+]
+
+
+def calc_equations(fileL: list) -> list:
+    """return (variable, expression) of the equations in calc files
+
+    Args:
+        fileL (list): calc file paths
+
+    Returns:
+        list: equations
+    """
+    eqL = []
+    for fileP in fileL:
+        for lineS in Path(fileP).read_text(encoding="UTF-8").splitlines():
+            mO = _eqrgx.match(lineS)
+            if mO:
+                eqL.append(mO.groups())
+
+    return eqL
+
+
+def bench(eqL: list, repeatI: int, diffB: bool = False) -> str:
+    """time sympy and fast path rendering
+
+    Args:
+        eqL (list): (variable, expression) equations
+        repeatI (int): renders of each equation
+        diffB (bool): list fast path renderings that differ from sympy
+
+    Returns:
+        str: report
+    """
+    sp, _abc = _rv_sym.sp, _rv_sym._abc
+    sp.pretty  # import sympy before timing
+    fastI = sameI = 0
+    diffL = []
+    symF = fastF = 0.0
+    for varS, valS in eqL:
+        eqS = "Eq(" + varS + ",(" + valS + "))"
+        t1F = time.perf_counter()
+        for i in range(repeatI):
+            eqO = sp.sympify(eqS, _abc._clash2, evaluate=False)
+            symT = (sp.pretty(eqO), sp.latex(eqO, mul_symbol="dot"))
+        t2F = time.perf_counter()
+        for i in range(repeatI):
+            outT = _rv_eqn.render(varS, valS)
+        t3F = time.perf_counter()
+        symF += t2F - t1F
+        if outT is None:
+            fastF += t2F - t1F  # sympy fallback
+            continue
+        fastF += t3F - t2F
+        fastI += 1
+        sameI += outT == symT
+        if diffB and outT != symT:
+            diffL.extend(["", varS + " = " + valS, outT[0], symT[0]])
+
+    nI = max(len(eqL) * repeatI, 1)
+    rptL = [
+        "equations: {}   fast path: {}   same text as sympy: {}".format(
+            len(eqL), fastI, sameI),
+        "sympy ms per equation:     {:.3f}".format(symF * 1000 / nI),
+        "fast path ms per equation: {:.3f}".format(fastF * 1000 / nI),
+        "speedup: {:.1f}x".format(symF / fastF if fastF else 0.0),
+    ]
+    if diffL:
+        rptL += ["", "fast path / sympy"] + diffL
+
+    return "\n".join(rptL)
+
+
+def main(argL: list = None):
+    parserO = argparse.ArgumentParser(description="benchmark equation rendering")
+    parserO.add_argument(
+        "paths", nargs="*",
+        help="project folder or calc files (default: sample equations)")
+    parserO.add_argument("-n", "--repeat", type=int, default=5)
+    parserO.add_argument(
+        "--diff", action="store_true",
+        help="list fast path renderings that differ from sympy")
+    argsO = parserO.parse_args(argL)
+
+    fileL = []
+    for pathS in argsO.paths:
+        pathP = Path(pathS)
+        if pathP.is_dir():
+            fileL.extend(find_calcs(find_project(pathP)))
+        else:
+            fileL.append(pathP)
+    eqL = calc_equations(fileL) if fileL else SAMPLEL
+    print(bench(eqL, argsO.repeat, argsO.diff))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#! python
+"""benchmark tag lexing and dispatch over a long insert-string
+
+Builds an insert-string of text and tagged lines and times the legacy tag
+lookup (uncompiled re.search per line, set intersection of split words,
+if/elif chain) against the precompiled lexer and dictionary dispatch, then
+times the parse and the UTF and reST walks of the whole string.
+
+    python bench_tags.py [-n lines]
+"""
+
+import io
+import re
+import sys
+import time
+import argparse
+import contextlib
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+import rivtcalc.rv_parse as _rv_parse  # noqa: E402
+import rivtcalc.rv_eval as _rv_eval  # noqa: E402
+from rivtcalc.rv_utf import OutputUTF  # noqa: E402
+from rivtcalc.rv_rst import Rivt2rSt  # noqa: E402
+
+TAGL = ["[page]_", "[line]_", "[link]_", "[literal]_", "[foot]_", "[s]_",
+        "[x]_", "[r]_", "[c]_", "[e]_", "[t]_", "[f]_", "[#]_"]
+LINEL = [
+    "    plain text line with several words of description",
+    "    load combination {} [e]_",
+    "    member schedule {} [t]_",
+    "    framing plan {} [f]_",
+    "    right adjusted note {} [r]_",
+    "    centered note {} [c]_",
+    "    text that mentions a ratio of 1:2 and a [bracket] but no tag",
+    "    [line]_",
+]
+
+
+def insert_string(linesI: int) -> str:
+    """return insert-string with linesI lines"""
+    lineL = ["[01]_ Benchmark insert string", ""]
+    for i in range(linesI):
+        lineL.append(LINEL[i % len(LINEL)].format(i))
+    return "\n".join(lineL)
+
+
+def legacy_tag(lineS: str, tagL: list) -> str:
+    """tag lookup as done before the lexer"""
+    if not re.search(r"\[([^\]]+)]_", lineS):
+        return None
+    try:
+        tagS = list(set(tagL).intersection(lineS.split()))[0]
+    except IndexError:
+        return None
+    for chainS in TAGL:  # if/elif chain
+        if tagS == chainS:
+            return tagS.join(lineS.strip().split(tagS)[0:1]).strip()
+    return None
+
+
+def fast_tag(lineS: str, tagL) -> str:
+    """tag lookup with the lexer and dictionary dispatch"""
+    tagT = _rv_parse.split_tag(lineS, tagL)
+    if tagT is None:
+        return None
+    return _HANDLERD[tagT[0]](tagT[1])
+
+
+_HANDLERD = {tagS: (lambda textS: textS) for tagS in TAGL}
+
+
+def _settings() -> tuple:
+    setsectD = {"swidthI": 80, "cnumS": "0101", "enumI": 0, "tnumI": 0,
+                "fnumI": 0, "ftqueL": deque([1]), "snumS": "01"}
+    setcmdD = {"trmrI": 2, "trmtI": 2, "subB": False, "saveB": False}
+    return setsectD, setcmdD
+
+
+def _time(funcF) -> float:
+    t1F = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcF()
+    return time.perf_counter() - t1F
+
+
+def main(argL: list = None):
+    parserO = argparse.ArgumentParser(description="benchmark tag dispatch")
+    parserO.add_argument("-n", "--lines", type=int, default=10000)
+    argsO = parserO.parse_args(argL)
+
+    rxS = insert_string(argsO.lines)
+    lineL = [i[4:] for i in rxS.split("\n")[2:]]
+    tagS = frozenset(TAGL)
+    legF = _time(lambda: [legacy_tag(i, TAGL) for i in lineL])
+    fastF = _time(lambda: [fast_tag(i, tagS) for i in lineL])
+    parseF = _time(lambda: _rv_parse.parse_rivt(rxS, "insert"))
+
+    nodeL = _rv_parse.parse_rivt(rxS, "insert")
+    setsectD, setcmdD = _settings()
+    utfO = OutputUTF(nodeL, {}, setcmdD, setsectD, _rv_eval.Namespace(), "")
+    utfF = _time(utfO.i_utf)
+    setsectD, setcmdD = _settings()
+    rstO = Rivt2rSt(nodeL, {}, setcmdD, setsectD, _rv_eval.Namespace(), "")
+    rstF = _time(rstO.i_rst)
+
+    print("lines:                      {}".format(len(lineL)))
+    print("legacy tag lookup ms:       {:.1f}".format(legF * 1000))
+    print("lexer and dispatch ms:      {:.1f}".format(fastF * 1000))
+    print("lookup speedup:             {:.1f}x".format(legF / fastF))
+    print("parse_rivt ms:              {:.1f}".format(parseF * 1000))
+    print("UTF walk ms:                {:.1f}".format(utfF * 1000))
+    print("reST walk ms:               {:.1f}".format(rstF * 1000))
+
+
+if __name__ == "__main__":
+    main()
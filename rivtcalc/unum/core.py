@@ -12,9 +12,226 @@ UnitDefinition = collections.namedtuple(
     'UnitDefinition', ['definition', 'level', 'name'])
 
 
+class UnitSignature(object):
+    """
+    Immutable, interned unit of a Unum: {unit symbol : exponent}.
+
+    Equal units share one instance, so unit equality is an identity check.
+    Products, quotients and powers of signatures are cached, so Unum
+    arithmetic on known units does not build dictionaries.
+    """
+
+    __slots__ = ('_items', '_dict', '_hash')
+
+    _interned = {}
+    _mul_cache = {}
+    _div_cache = {}
+    _pow_cache = {}
+
+    @classmethod
+    def of(cls, unit):
+        """
+        Return the signature of a unit given as a signature or dict.
+        """
+
+        if unit.__class__ is cls:
+            return unit
+
+        items = tuple(sorted((u, exp) for u, exp in dict(unit).items() if exp))
+        sig = cls._interned.get(items)
+
+        if sig is None:
+            sig = object.__new__(cls)
+            sig._items = items
+            sig._dict = dict(items)
+            sig._hash = hash(items)
+            cls._interned[items] = sig
+
+        return sig
+
+    def mul(self, other):
+        """
+        Return the signature of the product of self and other.
+        """
+
+        key = (self, other)
+        try:
+            return self._mul_cache[key]
+        except KeyError:
+            pass
+
+        unit = self._dict.copy()
+        for u, exp in other._items:
+            exp += unit.get(u, 0)
+            if exp:
+                unit[u] = exp
+            else:
+                del unit[u]
+
+        result = self._mul_cache[key] = UnitSignature.of(unit)
+        return result
+
+    def div(self, other):
+        """
+        Return the signature of the quotient of self and other.
+        """
+
+        key = (self, other)
+        try:
+            return self._div_cache[key]
+        except KeyError:
+            pass
+
+        unit = self._dict.copy()
+        for u, exp in other._items:
+            exp = unit.get(u, 0) - exp
+            if exp:
+                unit[u] = exp
+            else:
+                unit.pop(u, None)
+
+        result = self._div_cache[key] = UnitSignature.of(unit)
+        return result
+
+    def pow(self, exponent):
+        """
+        Return the signature of self raised to a number.
+        """
+
+        try:
+            key = (self, exponent)
+            return self._pow_cache[key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable exponent
+            key = None
+
+        result = UnitSignature.of(
+            dict((u, exp * exponent) for u, exp in self._items))
+
+        if key is not None:
+            self._pow_cache[key] = result
+        return result
+
+    def without(self, symbol):
+        """
+        Return the signature with symbol removed.
+        """
+
+        return UnitSignature.of(
+            dict((u, exp) for u, exp in self._items if u != symbol))
+
+    def items(self):
+        return self._items
+
+    def keys(self):
+        return self._dict.keys()
+
+    def values(self):
+        return self._dict.values()
+
+    def get(self, symbol, default=None):
+        return self._dict.get(symbol, default)
+
+    def copy(self):
+        return self
+
+    def as_dict(self):
+        return self._dict.copy()
+
+    def __getitem__(self, symbol):
+        return self._dict[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self._dict
+
+    def __iter__(self):
+        return iter(self._dict)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        if isinstance(other, UnitSignature):
+            return self is other
+        if isinstance(other, dict):
+            return self is UnitSignature.of(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return UnitSignature.of, (self._dict.copy(),)
+
+    def __repr__(self):
+        return 'UnitSignature(%r)' % (self._dict,)
+
+
+NO_UNIT = UnitSignature.of({})
+
+# (unit signature, forDisplay) : (scale factor, simplified unit signature)
+_SIMPLIFY_CACHE = {}
+# (from unit signature, to unit signature) : scale factor, None if incompatible
+_CONVERSION_CACHE = {}
+# (unit signature, unit signature) : True if the second unit is preferred
+_MATCH_CACHE = {}
+
+
+def clear_unit_caches():
+    """
+    Clear results that depend on the unit table. Called when a unit is added.
+    """
+
+    _SIMPLIFY_CACHE.clear()
+    _CONVERSION_CACHE.clear()
+    _MATCH_CACHE.clear()
+
+
+def _conversion(from_unit, to_unit):
+    key = (from_unit, to_unit)
+    try:
+        return _CONVERSION_CACHE[key]
+    except KeyError:
+        pass
+
+    ratio = Unum(1, from_unit.div(to_unit)).simplify_unit()
+    factor = _CONVERSION_CACHE[key] = None if ratio._unit else ratio._value
+    return factor
+
+
+def conversion_factor(from_unit, to_unit):
+    """
+    Return the factor f where 1 from_unit = f to_unit.
+
+    Units are UnitSignatures or {unit symbol : exponent} dicts. Factors are
+    computed once per pair of units and shared by the process.
+
+    Raises IncompatibleUnitsError if the units can't be converted.
+    """
+
+    from_unit = UnitSignature.of(from_unit)
+    to_unit = UnitSignature.of(to_unit)
+    factor = _conversion(from_unit, to_unit)
+
+    if factor is None:
+        raise IncompatibleUnitsError(Unum(1, from_unit), Unum(1, to_unit))
+    return factor
+
+
 class UnitTable(dict):
     def reset(self, table=None):
         self.clear()
+        clear_unit_caches()
 
         if table is not None:
             self.update(table)
@@ -41,6 +258,7 @@ class UnitTable(dict):
             level = equivalent.max_level() + 1
 
         self[symbol] = UnitDefinition(equivalent, level, name)
+        clear_unit_caches()
 
         return Unum(1, {symbol: 1}, normal=True)
 
@@ -168,7 +386,11 @@ class Formatter(object):
 
 def uniform_unum(func):
     def decorator(self, value):
-        return func(self, Unum.uniform(value))
+        if value.__class__ is not Unum:
+            if getattr(value, '_UNUM_DEFER', False):
+                return NotImplemented  # let a quantity array handle it
+            value = Unum.uniform(value)
+        return func(self, value)
 
     return decorator
 
@@ -208,22 +430,27 @@ class Unum(object):
     def __init__(self, value, unit=None, normal=False):
         """
         :param value: number or other object represents the mathematical value (e.g. numpy array)
-        :param dict unit: {unit symbol : exponent} for example for 1 m/s2 should give {'m': 1, 's': -2}
+        :param dict unit: {unit symbol : exponent} for example for 1 m/s2 should give {'m': 1, 's': -2},
+            or a UnitSignature
         """
 
         self._value = value
-        self._unit = {} if unit is None else dict(unit)
+        if unit is None:
+            unit = NO_UNIT
+        elif unit.__class__ is not UnitSignature:
+            unit = UnitSignature.of(unit)
+        self._unit = unit
         self._normal = normal
 
     def unit(self):
-        return Unum(1, self._unit.copy())
+        return Unum(1, self._unit)
 
     def copy(self, normalized=False):
         """
         Return a copy of this Unum, normalizing the copy if specified.
         """
 
-        result = Unum(self._value, self._unit.copy())
+        result = Unum(self._value, self._unit)
 
         if normalized:
             result.simplify_unit()
@@ -242,8 +469,13 @@ class Unum(object):
         if not other.is_basic():
             raise NonBasicUnitError(other)
 
-        s, o = self.match_units(other)
-        res = Unum(s._value / o._value, other._unit)
+        if self._unit is other._unit or self._value == 0:
+            res = Unum(self._value, other._unit)
+        else:
+            factor = _conversion(self._unit, other._unit)
+            if factor is None:
+                raise IncompatibleUnitsError(self, other)
+            res = Unum(self._value * factor, other._unit)
         res._normal = True
 
         return res
@@ -262,9 +494,7 @@ class Unum(object):
 
         exponent = self._unit[symbol]
 
-        res = self.copy() * definition ** exponent
-        del res._unit[symbol]
-        return res
+        return Unum(self._value, self._unit.without(symbol)) * definition ** exponent
 
     def simplify_unit(self, forDisplay=False):
         """
@@ -274,32 +504,58 @@ class Unum(object):
         while making the fewest substitutions.
 
         If forDisplay is True, then prefer a single unit to no unit.
+
+        The simplified unit and its scale factor are cached per unit, so
+        only the first simplification of a unit searches the substitutions.
+        """
+
+        key = (self._unit, forDisplay)
+        try:
+            factor, unit = _SIMPLIFY_CACHE[key]
+        except KeyError:
+            factor, unit = _SIMPLIFY_CACHE[key] = \
+                Unum(1, self._unit)._simplify_search(forDisplay)
+
+        if unit is not self._unit:
+            self._value = self._value * factor
+            self._unit = unit
+        return self
+
+    def _simplify_search(self, forDisplay):
+        """
+        Return (value, unit) of self with the fewest units.
+
+        Breadth first search over substitutions of derived units by their
+        definitions.
         """
 
         # TODO: example of forDisplay.
-        # TODO: simplify normalize so it fits in 80 columns...
 
-        previous_length = len(self._unit)
-        new_subst_unums = [({}, self.copy())]
+        value, unit = self._value, self._unit
+        previous_length = len(unit)
+        new_subst_unums = [({}, self)]
 
         while new_subst_unums:
             subst_unums, new_subst_unums = new_subst_unums, []
+            seen = set()
             for subst_dict, subst_unum in subst_unums:
                 for symbol, exponent in subst_unum._derived_units():
                     new_subst_dict = subst_dict.copy()
                     new_subst_dict[symbol] = exponent + \
                         new_subst_dict.get(symbol, 0)
 
-                    if all(new_subst_dict != subst_dict2 for subst_dict2, subst_unum2 in new_subst_unums):
+                    subst_key = frozenset(new_subst_dict.items())
+                    if subst_key not in seen:
+                        seen.add(subst_key)
                         reduced = subst_unum.replaced(
                             symbol, UNIT_TABLE.get_definition(symbol))  # replace by definition
                         new_subst_unums.append((new_subst_dict, reduced))
 
                         new_length = len(reduced._unit)
                         if new_length < previous_length and not (forDisplay and new_length == 0 and previous_length == 1):
-                            self._value, self._unit = reduced._value, reduced._unit
+                            value, unit = reduced._value, reduced._unit
                             previous_length = new_length
-        return self
+        return value, unit
 
     def _derived_units(self):
         return [(symbol, self._unit[symbol]) for symbol in self._unit if UNIT_TABLE.is_derived(symbol)]
@@ -355,7 +611,7 @@ class Unum(object):
         """
         assert isinstance(other, Unum)
 
-        if self._unit == other._unit:
+        if self._unit is other._unit:
             return self, other
 
         if self._value == 0:
@@ -364,30 +620,26 @@ class Unum(object):
         if other._value == 0:
             return self, Unum(other._value, self._unit)
 
-        s = self.copy()
-        o = other.copy()
-
-        s_length, o_length = len(s._unit), len(o._unit)
-
-        revert = (s_length > o_length or
-                  (s_length == o_length and s.max_level() < o.max_level()))
+        key = (self._unit, other._unit)
+        try:
+            revert = _MATCH_CACHE[key]
+        except KeyError:
+            s_length, o_length = len(self._unit), len(other._unit)
+            revert = _MATCH_CACHE[key] = (
+                s_length > o_length or
+                (s_length == o_length and self.max_level() < other.max_level()))
 
         if revert:
-            s, o = o, s
-
-        target_unum = Unum(1, s._unit)
-        o /= target_unum
-        o.simplify_unit()
+            factor = _conversion(self._unit, other._unit)
+        else:
+            factor = _conversion(other._unit, self._unit)
 
-        if o._unit:
+        if factor is None:
             raise IncompatibleUnitsError(self, other)
 
-        o._unit = s._unit
-
         if revert:
-            s, o = o, s
-
-        return s, o
+            return Unum(self._value * factor, other._unit), other
+        return self, Unum(other._value * factor, self._unit)
 
     def format_number(self, func):
         return func(self._value)
@@ -413,49 +665,31 @@ class Unum(object):
 
     @uniform_unum
     def __mul__(self, other):
-        if not self._unit:
+        if self._unit is NO_UNIT:
             unit = other._unit
-        elif not other._unit:
+        elif other._unit is NO_UNIT:
             unit = self._unit
         else:
-            unit = self._unit.copy()
-            for u, exp in other._unit.items():
-                exp += unit.get(u, 0)
-                if exp:
-                    unit[u] = exp
-                else:
-                    del unit[u]
+            unit = self._unit.mul(other._unit)
 
         return Unum(self._value * other._value, unit)
 
     @uniform_unum
     def __div__(self, other):
-        if not other._unit:
+        if other._unit is NO_UNIT:
             unit = self._unit
         else:
-            unit = self._unit.copy()
-            for u, exp in list(other._unit.items()):
-                exp -= unit.get(u, 0)
-                if exp:
-                    unit[u] = -exp
-                else:
-                    del unit[u]
+            unit = self._unit.div(other._unit)
         return Unum(self._value / other._value, unit)
 
     __truediv__ = __div__  # Python 3.0 compatibility.
 
     @uniform_unum
     def __floordiv__(self, other):
-        if not other._unit:
+        if other._unit is NO_UNIT:
             unit = self._unit
         else:
-            unit = self._unit.copy()
-            for u, exp in list(other._unit.items()):
-                exp -= unit.get(u, 0)
-                if exp:
-                    unit[u] = -exp
-                else:
-                    del unit[u]
+            unit = self._unit.div(other._unit)
         return Unum(self._value // other._value, unit)
 
     @uniform_unum
@@ -463,9 +697,7 @@ class Unum(object):
         if other._value:
             other = other.copy(True)
             other.assert_no_unit()
-            unit = self._unit.copy()
-            for u in list(self._unit.keys()):
-                unit[u] *= other._value
+            unit = self._unit.pow(other._value)
         else:
             unit = None
         return Unum(self._value ** other._value, unit)
@@ -563,7 +795,8 @@ class Unum(object):
     __repr__ = __str__
 
     def __getstate__(self):
-        return self._value, self._unit.copy(), self._normal
+        return self._value, self._unit.as_dict(), self._normal
 
     def __setstate__(self, state):
-        self._value, self._unit, self._normal = state
+        self._value, unit, self._normal = state
+        self._unit = UnitSignature.of(unit)
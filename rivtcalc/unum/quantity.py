@@ -0,0 +1,233 @@
+from __future__ import division, unicode_literals
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+from .core import (NO_UNIT, Unum, UnitSignature, _conversion,
+                   conversion_factor)
+from .exceptions import (IncompatibleUnitsError, NonBasicUnitError,
+                         ShouldBeUnitlessError)
+
+# ufuncs that need operands in the same unit and keep the unit
+_SAME_UNIT = {np.add, np.subtract, np.maximum, np.minimum, np.fmax, np.fmin,
+              np.hypot, np.remainder, np.fmod}
+# ufuncs that need operands in the same unit and return plain values
+_COMPARE = {np.less, np.less_equal, np.greater, np.greater_equal, np.equal,
+            np.not_equal}
+# ufuncs of one operand that keep the unit
+_KEEP_UNIT = {np.negative, np.positive, np.absolute, np.fabs, np.rint,
+              np.floor, np.ceil, np.trunc, np.conjugate}
+# ufuncs of one operand that return plain values
+_PLAIN = {np.isfinite, np.isinf, np.isnan, np.sign, np.signbit}
+
+
+def _split(value):
+    """
+    Return (numbers, unit signature) of a QArray, Unum or number.
+    """
+
+    if isinstance(value, QArray):
+        return value._value, value._unit
+    if isinstance(value, Unum):
+        return value._value, value._unit
+    return value, NO_UNIT
+
+
+def _scaled(value, from_unit, to_unit, operands):
+    if from_unit is to_unit:
+        return value
+
+    factor = _conversion(from_unit, to_unit)
+    if factor is None:
+        raise IncompatibleUnitsError(*operands)
+    return value * factor
+
+
+class QArray(NDArrayOperatorsMixin):
+    """
+    A float64 numpy array with one unit.
+
+    Arithmetic, comparisons and numpy ufuncs operate on the whole array
+    and combine the unit once, so there are no per-element Unum objects.
+    """
+
+    __slots__ = ('_value', '_unit')
+
+    _UNUM_DEFER = True  # Unum operators return NotImplemented for QArray
+
+    def __init__(self, value, unit=None):
+        """
+        :param value: numbers (sequence or numpy array)
+        :param unit: UnitSignature or {unit symbol : exponent}
+        """
+
+        self._value = np.asarray(value, dtype=np.float64)
+        self._unit = NO_UNIT if unit is None else UnitSignature.of(unit)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if kwargs.get('out') is not None:
+            return NotImplemented
+
+        values, units = zip(*[_split(i) for i in inputs])
+
+        if method == 'reduce':
+            if ufunc in (np.add, np.maximum, np.minimum):
+                return QArray(ufunc.reduce(values[0], **kwargs), units[0])
+            return NotImplemented
+
+        if method != '__call__':
+            return NotImplemented
+
+        if ufunc in _SAME_UNIT or ufunc in _COMPARE:
+            a, b = values
+            b = _scaled(b, units[1], units[0], inputs)
+            result = ufunc(a, b, **kwargs)
+            return result if ufunc in _COMPARE else QArray(result, units[0])
+
+        if ufunc is np.multiply:
+            return QArray(ufunc(*values, **kwargs), units[0].mul(units[1]))
+
+        if ufunc in (np.true_divide, np.divide, np.floor_divide):
+            return QArray(ufunc(*values, **kwargs), units[0].div(units[1]))
+
+        if ufunc is np.power:
+            exponent = _scaled(values[1], units[1], NO_UNIT, inputs)
+            if np.ndim(exponent) != 0:
+                return NotImplemented
+            return QArray(ufunc(values[0], exponent, **kwargs),
+                          units[0].pow(float(exponent)))
+
+        if ufunc is np.sqrt:
+            return QArray(ufunc(values[0], **kwargs), units[0].pow(0.5))
+
+        if ufunc is np.square:
+            return QArray(ufunc(values[0], **kwargs), units[0].pow(2))
+
+        if ufunc is np.reciprocal:
+            return QArray(ufunc(values[0], **kwargs), NO_UNIT.div(units[0]))
+
+        if ufunc in _KEEP_UNIT:
+            return QArray(ufunc(values[0], **kwargs), units[0])
+
+        if ufunc in _PLAIN:
+            return ufunc(values[0], **kwargs)
+
+        # other ufuncs (sin, exp, log ...) need unitless operands
+        plain = []
+        for value, unit, operand in zip(values, units, inputs):
+            factor = _conversion(unit, NO_UNIT)
+            if factor is None:
+                raise ShouldBeUnitlessError(operand)
+            plain.append(value if factor == 1 else value * factor)
+        return ufunc(*plain, **kwargs)
+
+    def unit(self):
+        return Unum(1, self._unit)
+
+    def cast_unit(self, other):
+        """
+        Return a QArray with this array's values in the units of other.
+
+        Raises IncompatibleUnitsError if self can't be converted to other.
+        Raises NonBasicUnitError if other isn't a basic unit.
+        """
+
+        other = Unum.uniform(other)
+        if not other.is_basic():
+            raise NonBasicUnitError(other)
+
+        return QArray(self.number(other), other._unit)
+
+    def number(self, unit=None):
+        """
+        Return the numpy array of values, in unit if supplied.
+        """
+
+        if unit is None:
+            return self._value
+
+        unit = Unum.uniform(unit)
+        return (self._value * conversion_factor(self._unit, unit._unit) /
+                unit._value)
+
+    def simplify_unit(self, forDisplay=False):
+        """
+        Normalize our units IN PLACE and return self.
+        """
+
+        simple = Unum(1, self._unit).simplify_unit(forDisplay)
+        if simple._unit is not self._unit:
+            self._value = self._value * simple._value
+            self._unit = simple._unit
+        return self
+
+    def copy(self, normalized=False):
+        result = QArray(self._value.copy(), self._unit)
+
+        if normalized:
+            result.simplify_unit()
+
+        return result
+
+    @property
+    def shape(self):
+        return self._value.shape
+
+    def __len__(self):
+        return len(self._value)
+
+    def __getitem__(self, index):
+        value = self._value[index]
+        if np.ndim(value) == 0:
+            return Unum(float(value), self._unit)
+        return QArray(value, self._unit)
+
+    def __setitem__(self, index, value):
+        value, unit = _split(value)
+        self._value[index] = _scaled(value, unit, self._unit, (self, value))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self._value)))
+
+    def __str__(self):
+        fmt = Unum.formatter
+        numbers = np.array2string(
+            self._value, separator=' ',
+            formatter={'float_kind': lambda x: fmt['value_format'] % x})
+        unit = fmt._format_unit(self._unit)
+        return fmt['indent'].join([numbers, unit]).strip()
+
+    __repr__ = __str__
+
+    def __getstate__(self):
+        return self._value, self._unit.as_dict()
+
+    def __setstate__(self, state):
+        self._value, unit = state
+        self._unit = UnitSignature.of(unit)
+
+
+def qarray(values, unit=None):
+    """
+    Return a QArray of values in unit.
+
+    >>> qarray([10., 12.5], KIPS).cast_unit(LBF)
+    [10000.00 12500.00] lbf
+
+    :param values: numbers (sequence or numpy array), a Unum holding an
+        array or a QArray
+    :param unit: unit of values, a Unum such as KIPS or KIPS/FT
+    :return: QArray
+    """
+
+    if isinstance(values, QArray):
+        return values if unit is None else values.cast_unit(unit)
+
+    values, values_unit = _split(values)
+    result = QArray(values, values_unit)
+
+    if unit is not None:
+        unit = Unum.uniform(unit)
+        result = QArray(result._value * unit._value,
+                        values_unit.mul(unit._unit))
+    return result
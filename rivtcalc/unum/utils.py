@@ -1,4 +1,4 @@
-from .core import Unum
+from .core import Unum, conversion_factor
 from .exceptions import NonBasicUnitError
 
 
@@ -78,6 +78,35 @@ def as_number(value, *args, **kwargs):
     return number
 
 
+def convert(values, from_unit, to_unit):
+    """
+    Convert numbers in one unit to numbers in another unit.
+
+    The conversion factor is looked up once, so a numpy array is converted
+    with a single multiply.
+    >>> convert(array([1000., 2000.]), MM, M)
+    array([1., 2.])
+
+    :param values: number, sequence or numpy array in from_unit, or a Unum
+    :param from_unit: unit of values (ignored if values is a Unum)
+    :param to_unit: unit of result
+    :return: numpy array (or number) in to_unit, a Unum if values is a Unum
+    """
+    from numpy import asarray
+
+    if isinstance(values, Unum):
+        return values.cast_unit(to_unit)
+
+    from_unit, to_unit = Unum.uniform(from_unit), Unum.uniform(to_unit)
+    factor = (from_unit._value *
+              conversion_factor(from_unit._unit, to_unit._unit) /
+              to_unit._value)
+
+    if isinstance(values, (int, float)):
+        return values * factor
+    return asarray(values) * factor
+
+
 def encode(number):
     if isinstance(number, Unum):
         value, unit, normal = number.__getstate__()
@@ -0,0 +1,49 @@
+#! python
+"""batch builds with failing and crashing calcs
+
+rv_batch.batch runs the calcs of a project in a process pool. A calc that
+raises is reported as failed; a calc that kills its worker process must be
+reported as failed without losing the results of the other calcs.
+
+    python -m pytest tests
+"""
+
+import os
+from pathlib import Path
+import pytest
+from rivtcalc import rv_batch
+
+CALCD = {
+    "c0101_first": "Path('first.out').write_text('1')\n",
+    "c0102_crash": "import os\nos._exit(3)\n",
+    "c0103_raise": "raise ValueError('bad input')\n",
+    "c0104_last": "Path('last.out').write_text('4')\n",
+}
+
+
+@pytest.fixture
+def proj(tmp_path):
+    for nameS, srcS in CALCD.items():
+        dirP = Path(tmp_path, "calcs", nameS)
+        os.makedirs(dirP)
+        Path(dirP, nameS + ".py").write_text(
+            "from pathlib import Path\n" + srcS)
+    os.makedirs(Path(tmp_path, "docs"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("workersI", [1, 2])
+def test_crashing_calc(proj, workersI):
+    cwdS = os.getcwd()
+    try:
+        resL = rv_batch.batch(proj, workersI)
+    finally:
+        os.chdir(cwdS)
+    statusD = {i[0]: i[1] for i in resL}
+    assert [i[0] for i in resL] == list(CALCD)
+    assert statusD == {"c0101_first": "ok", "c0102_crash": "failed",
+                       "c0103_raise": "failed", "c0104_last": "ok"}
+    assert "worker process exited" in resL[1][3]
+    assert "ValueError" in resL[2][3]
+    assert Path(proj, "calcs", "c0104_last", "last.out").read_text() == "4"
+    assert "failed: 2" in rv_batch.summary(resL, 1.0)
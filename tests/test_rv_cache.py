@@ -0,0 +1,108 @@
+#! python
+"""build cache keys, restore and eviction
+
+rv_cache.BuildCache keys a doc build on its input files and doc options.
+A calc with a data file and an imported helper module is keyed, stored and
+restored; editing any input must change the key.
+
+    python -m pytest tests
+"""
+
+import os
+from pathlib import Path
+import pytest
+from rivtcalc import rv_cache
+
+CALCS = """import rivtcalc.rivt_lib as rv
+import helper
+from pkg import sub
+rv.I(\"\"\"inputs
+||table | tab1.csv | 60,r
+\"\"\")
+"""
+
+
+@pytest.fixture
+def proj(tmp_path):
+    cpathP = Path(tmp_path, "calcs")
+    curP = Path(cpathP, "c0101_test")
+    docP = Path(tmp_path, "docs")
+    for dirP in (curP, Path(curP, "pkg"), Path(docP, "d0101_test")):
+        os.makedirs(dirP)
+    Path(curP, "c0101_test.py").write_text(CALCS)
+    Path(curP, "tab1.csv").write_text("a,b\n1,2\n")
+    Path(curP, "helper.py").write_text("import common\nk = 1\n")
+    Path(cpathP, "common.py").write_text("g = 9.81\n")
+    Path(curP, "pkg", "__init__.py").write_text("")
+    Path(curP, "pkg", "sub.py").write_text("x = 2\n")
+    folderD = {
+        "cfull": Path(curP, "c0101_test.py"),
+        "cpathcur": curP,
+        "cpath": cpathP,
+        "dpathcur": Path(docP, "d0101_test"),
+        "dpath0": docP,
+    }
+    return folderD
+
+
+def _inputs(folderD):
+    calcS = folderD["cfull"].read_text()
+    return ([folderD["cfull"]] + rv_cache.calc_inputs(calcS, folderD)
+            + rv_cache.calc_modules(calcS, folderD))
+
+
+def test_calc_modules(proj):
+    curP, cpathP = proj["cpathcur"], proj["cpath"]
+    modL = rv_cache.calc_modules(proj["cfull"].read_text(), proj)
+    assert modL == sorted([Path(curP, "helper.py"), Path(cpathP, "common.py"),
+                           Path(curP, "pkg", "__init__.py"),
+                           Path(curP, "pkg", "sub.py")])
+
+
+@pytest.mark.parametrize("nameS", ["c0101_test.py", "tab1.csv", "helper.py",
+                                   "../common.py", "pkg/sub.py"])
+def test_key_input_edit(proj, tmp_path, nameS):
+    cacheO = rv_cache.BuildCache(Path(tmp_path, "cache"))
+    keyS = cacheO.key(_inputs(proj), ["utf8"])
+    assert keyS == cacheO.key(_inputs(proj), ["utf8"])
+    fileP = Path(proj["cpathcur"], nameS)
+    fileP.write_text(fileP.read_text() + "\n# edit\n")
+    assert keyS != cacheO.key(_inputs(proj), ["utf8"])
+
+
+def test_key_options(proj, tmp_path):
+    cacheO = rv_cache.BuildCache(Path(tmp_path, "cache"))
+    fileL = _inputs(proj)
+    assert cacheO.key(fileL, ["utf8"]) != cacheO.key(fileL, ["utf8", "pdf"])
+
+
+def test_store_restore(proj, tmp_path):
+    cacheO = rv_cache.BuildCache(Path(tmp_path, "cache"))
+    keyS = cacheO.key(_inputs(proj), ["utf8"])
+    assert cacheO.restore(keyS) is None
+    outP = Path(proj["dpathcur"], "d0101_test.txt")
+    outP.write_text("calc output")
+    cacheO.store(keyS, [outP, Path(proj["dpathcur"], "missing.pdf")])
+    outP.unlink()
+    assert cacheO.restore(keyS) == [outP]
+    assert outP.read_text() == "calc output"
+    # an incomplete entry is rebuilt
+    for entryP in Path(tmp_path, "cache", keyS).iterdir():
+        if entryP.name != "manifest.json":
+            entryP.unlink()
+    assert cacheO.restore(keyS) is None
+
+
+def test_evict(tmp_path):
+    cacheP = Path(tmp_path, "cache")
+    cacheO = rv_cache.BuildCache(cacheP, maxbytesI=150)
+    os.makedirs(Path(cacheP, "tables"))
+    Path(cacheP, "tables", "t.tbl").write_bytes(b"x" * 500)
+    outP = Path(tmp_path, "out.txt")
+    outP.write_bytes(b"x" * 100)
+    cacheO.store("old", [outP])
+    os.utime(Path(cacheP, "old", "manifest.json"), (1, 1))
+    cacheO.store("new", [outP])
+    assert not Path(cacheP, "old").exists()
+    assert Path(cacheP, "new", "manifest.json").is_file()
+    assert Path(cacheP, "tables", "t.tbl").is_file()
@@ -0,0 +1,163 @@
+#! python
+"""assignment reuse and the code cache
+
+A calc run saves its dependency graph (d00_docs/rvcache/<calc>.dep) and
+compiled code (calc __pycache__/<calc>.<tag>.rvc). The next run reuses an
+assignment only if its text, format settings and the values it reads are
+unchanged. Calcs are run as scripts, as from the command line, and the
+reused and evaluated counts are read from the calc log.
+
+    python -m pytest tests
+"""
+
+import os
+import re
+import sys
+import pickle
+import marshal
+import subprocess
+import importlib.util
+from pathlib import Path
+import pytest
+import rivtcalc
+import rivtcalc.rv_unit  # unum module path for pickled values
+
+CALCS = '''from rivtcalc import rv_calc as rv
+rv.D("utf8", cacheS="nocache")
+
+rv.T("""[01]_ Funcs
+
+    def f(x): return x*{fS}
+    kk = {kkS}
+    """
+)
+rv.V("""[02]_ Values
+{cfgS}
+    a1 = 10.1    | FT, IN | length a
+
+    m1 = f(a1)  | FT, IN{dS}
+
+    m2 = a1*kk  | FT, IN{dS}
+
+    m3 = a1*2  | FT, IN{dS}
+
+    """
+)
+'''
+_countrgx = re.compile(r"assignments reused: (\d+)\s+evaluated: (\d+)")
+
+
+class Calc:
+    """calc in a temporary project"""
+
+    def __init__(self, projP: Path):
+        self.calcP = Path(projP, "calcs", "c0101_dep", "c0101_dep.py")
+        self.docP = Path(projP, "docs", "d00_docs")
+        for dirP in (self.calcP.parent, self.docP, Path(projP, "docs",
+                                                        "d01_div")):
+            os.makedirs(dirP)
+        self.depP = Path(self.docP, "rvcache", "c0101_dep.dep")
+        self.rvcP = Path(self.calcP.parent, "__pycache__", ".".join(
+            ["c0101_dep", sys.implementation.cache_tag, "rvc"]))
+
+    def run(self, fS="5", kkS="7", cfgS="", dS="") -> tuple:
+        """write and run the calc, return (reused, evaluated, utf text)"""
+        self.calcP.write_text(CALCS.format(fS=fS, kkS=kkS, cfgS=cfgS, dS=dS))
+        envD = dict(os.environ, PYTHONPATH=str(
+            Path(rivtcalc.__file__).parents[1]))
+        procO = subprocess.run(
+            [sys.executable, self.calcP.name], cwd=self.calcP.parent,
+            env=envD, capture_output=True, text=True)
+        assert procO.returncode == 0, procO.stdout + procO.stderr
+        logS = Path(self.docP, "c0101_dep.logging").read_text()
+        reuseI, evalI = map(int, _countrgx.findall(logS)[-1])
+        return reuseI, evalI, self.calcP.with_suffix(".txt").read_text()
+
+
+@pytest.fixture
+def calc(tmp_path):
+    return Calc(tmp_path)
+
+
+def test_reuse(calc):
+    assert calc.run()[:2] == (0, 4)
+    textS = calc.run()[2]
+    reuseI, evalI, text2S = calc.run()
+    assert (reuseI, evalI) == (3, 1)  # m1 reads function f
+    assert text2S == textS
+
+
+def test_read_edit(calc):
+    calc.run()
+    reuseI, evalI, textS = calc.run(kkS="8")
+    assert (reuseI, evalI) == (2, 2)  # a1 and m3 do not read kk
+    assert "80.80 ft" in textS and "70.70 ft" not in textS
+
+
+def test_function_edit(calc):
+    calc.run()
+    reuseI, evalI, textS = calc.run(fS="6")
+    assert (reuseI, evalI) == (3, 1)
+    assert "60.60 ft" in textS and "50.50 ft" not in textS
+
+
+def test_precision_edit(calc):
+    calc.run()
+    cfgS = "    ||config | nosub | 3,3\n"
+    reuseI, evalI, textS = calc.run(cfgS=cfgS)
+    assert (reuseI, evalI) == (0, 4)
+    assert "50.500 ft" in textS
+    assert calc.run(cfgS=cfgS) == (3, 1, textS)
+
+
+def test_sub_edit(calc):
+    # values, not equations - sub only changes how equations are written
+    calc.run(dS=" | result")
+    cfgS = "    ||config | sub | 2,2\n"
+    assert calc.run(cfgS=cfgS, dS=" | result")[:2] == (0, 4)
+    assert calc.run(cfgS=cfgS, dS=" | result")[:2] == (3, 1)
+
+
+def _stale(depP):
+    depP.write_bytes(b"not a pickle")
+
+
+def _stamp(depP):
+    with open(depP, "rb") as f1:
+        stampS, nodeD = pickle.load(f1)
+    with open(depP, "wb") as f1:
+        pickle.dump(("older rivtcalc", nodeD), f1)
+
+
+def _values(depP):
+    with open(depP, "rb") as f1:
+        stampS, nodeD = pickle.load(f1)
+    for nodD in nodeD.values():
+        nodD["valB"] = b"not a pickle"
+    with open(depP, "wb") as f1:
+        pickle.dump((stampS, nodeD), f1)
+
+
+@pytest.mark.parametrize("editF", [_stale, _stamp, _values])
+def test_bad_dep(calc, editF):
+    textS = calc.run()[2]
+    editF(calc.depP)
+    assert calc.run() == (0, 4, textS)
+    assert calc.run()[:2] == (3, 1)  # graph saved again
+
+
+@pytest.mark.parametrize("dataB", [
+    b"",
+    importlib.util.MAGIC_NUMBER,
+    importlib.util.MAGIC_NUMBER + b"not marshal data",
+    b"\x00\x00\r\n" + marshal.dumps({}),
+])
+def test_bad_code_cache(calc, dataB):
+    textS = calc.run()[2]
+    calc.rvcP.write_bytes(dataB)
+    assert calc.run()[2] == textS
+    with open(calc.rvcP, "rb") as f1:
+        magicB = f1.read(len(importlib.util.MAGIC_NUMBER))
+        assert magicB == importlib.util.MAGIC_NUMBER
+        codeD = marshal.load(f1)
+    assert ("a1*kk", "eval") in codeD
@@ -0,0 +1,178 @@
+#! python
+"""compare rv_table formatting with tabulate
+
+rv_table.table_lines replaced tabulate(..., headers="firstrow",
+numalign="decimal", stralign=align) for csv and xlsx tables. Random tables
+of numbers, text, blank and multi-line cells are formatted both ways for
+each rivt alignment (S, D, C, R, L) as reST and LaTeX tables.
+
+Parsed tables are also saved to a disk cache (.tbl); a stale or corrupt
+cache file falls back to parsing the table file.
+
+    python -m pytest tests
+"""
+
+import os
+import pickle
+import random
+import textwrap
+from pathlib import Path
+import pytest
+from rivtcalc import rv_table
+
+tabulate = pytest.importorskip("tabulate")
+
+ALIGNL = ["", "decimal", "center", "right", "left"]
+CELLL = [
+    "1", "2.5", "-3.25", "1e5", "abc", "hello world foo", "", "  ", "True",
+    "1,000", "1,000.5", "nan", "inf", "007", " 12", "3.14159", "a\\nb",
+    "x y z long text that wraps around", "12345678.9", "_&%$", "<b>",
+    "0.000", "v1.25", "ab.c", " 2.5 ", None, 2, 3.5, True, 1e-7,
+]
+
+
+def _wrap(cellO, widthI: int) -> str:
+    lineL = textwrap.wrap(str(cellO), widthI)
+    return "\n".join(i.replace("\\n", "\n") for i in lineL)
+
+
+def _tables(seedI: int, countI: int):
+    randO = random.Random(seedI)
+    for i in range(countI):
+        colI = randO.randint(1, 4)
+        poolL = CELLL if randO.random() > 0.3 else CELLL[:8] + [None, 2, 3.5]
+        rowL = [["title"] + [""] * (colI - 1)]
+        rowL += [[randO.choice(poolL) for j in range(colI)]
+                 for k in range(randO.randint(2, 6))]
+        yield rv_table.Table.from_rows(rowL), colI, randO.choice([0, 5, 12])
+
+
+def _expected(tableO, colI: int, alignS: str, wrapI: int, fmtS: str) -> str:
+    rowL = [list(i) for i in tableO.rows(1, list(range(colI)))]
+    if wrapI:
+        rowL = [[_wrap(i, wrapI) for i in row] for row in rowL]
+    return tabulate.tabulate(rowL, tablefmt=fmtS, headers="firstrow",
+                             numalign="decimal", stralign=alignS) + "\n"
+
+
+def _formatted(tableO, colI: int, alignS: str, wrapI: int, fmtS: str):
+    lineLL = rv_table.table_lines(tableO, list(range(colI)), alignS, wrapI,
+                                  fmtS)
+    return "".join(i + "\n" for lineL in lineLL for i in lineL)
+
+
+@pytest.mark.parametrize("alignS", ALIGNL)
+def test_rst(alignS):
+    for tableO, colI, wrapI in _tables(1, 400):
+        wrapI = wrapI or 8
+        assert (_formatted(tableO, colI, alignS, wrapI, "rst")
+                == _expected(tableO, colI, alignS, wrapI, "rst"))
+
+
+@pytest.mark.parametrize("alignS", ALIGNL)
+def test_latex(alignS):
+    for tableO, colI, wrapI in _tables(2, 400):
+        gotS = _formatted(tableO, colI, alignS, wrapI, "latex")
+        expS = _expected(tableO, colI, alignS, wrapI, "latex")
+        if wrapI and any("\n" in _wrap(i, wrapI) for row in
+                         tableO.rows(1, list(range(colI))) for i in row):
+            # tabulate pads multi-line cells by wcwidth, which is -1 for a
+            # newline; the padding is not part of the LaTeX table
+            gotS, expS = " ".join(gotS.split()), " ".join(expS.split())
+        assert gotS == expS
+
+
+def test_tabulary():
+    for tableO, colI, wrapI in _tables(3, 100):
+        latexL = _formatted(tableO, colI, "decimal", 0, "latex").split("\n")
+        tabL = _formatted(tableO, colI, "decimal", 0, "tabulary").split("\n")
+        assert tabL[0].startswith("\\begin{tabulary}{1.0\\textwidth}{")
+        assert tabL[1:-2] == latexL[1:-2]
+        assert tabL[-2] == "\\end{tabulary}"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    csvP = Path(tmp_path, "tab1.csv")
+    csvP.write_text("a,b\n1,2.5\n3,x\n")
+    rv_table.set_cache(Path(tmp_path, "tables"))
+    rv_table._tableD.clear()
+    yield csvP
+    rv_table.set_cache(None)
+    rv_table._tableD.clear()
+
+
+def _read(csvP):
+    rv_table._tableD.clear()  # a new calc process
+    return [list(i) for i in rv_table.read_table(csvP).rows()]
+
+
+def test_disk_cache(cache):
+    rowL = [["a", "b"], ["1", "2.5"], ["3", "x"]]
+    assert _read(cache) == rowL
+    diskP = rv_table._disk_file(cache.resolve())
+    assert diskP.is_file()
+    with open(diskP, "rb") as f1:
+        assert isinstance(pickle.load(f1)[2], rv_table.Table)
+    assert _read(cache) == rowL
+
+
+@pytest.mark.parametrize("dataB", [
+    b"", b"not a pickle", pickle.dumps((0, 0, "not a table")),
+    pickle.dumps(("size", "mtime")),
+])
+def test_disk_cache_bad(cache, dataB):
+    _read(cache)
+    diskP = rv_table._disk_file(cache.resolve())
+    diskP.write_bytes(dataB)
+    if dataB.startswith(b"\x80"):
+        statO = os.stat(cache)
+        diskP.write_bytes(pickle.dumps(
+            (statO.st_size, statO.st_mtime_ns) + pickle.loads(dataB)[2:]))
+    assert _read(cache) == [["a", "b"], ["1", "2.5"], ["3", "x"]]
+    with open(diskP, "rb") as f1:
+        assert isinstance(pickle.load(f1)[2], rv_table.Table)
+
+
+def test_disk_cache_stale(cache):
+    _read(cache)
+    cache.write_text("a,b\n1,2.5\n3,x\n4,y\n")
+    assert _read(cache)[-1] == ["4", "y"]
+
+
+def _itable_peak(tmp_path, rowsI: int) -> int:
+    """return peak traced memory of a csv || table streamed to a utf file"""
+    import copy
+    import contextlib
+    import tracemalloc
+    from rivtcalc import rv_calc, rv_eval, rv_utf
+    from rivtcalc.rv_buf import OutBuf
+
+    csvP = Path(tmp_path, "t" + str(rowsI) + ".csv")
+    with open(csvP, "w") as f1:
+        f1.write("title,,\nname,value,note\n")
+        for i in range(rowsI):
+            f1.write("w{0},{0}.5,text {0}\n".format(i))
+    setsectD, setcmdD = copy.deepcopy(rv_calc._set0T)
+    outP = csvP.with_suffix(".txt")
+    with open(os.devnull, "w") as f1, contextlib.redirect_stdout(f1):
+        tracemalloc.start()
+        outO = OutBuf(outP)
+        utfO = rv_utf.OutputUTF([], {"cpathcur": tmp_path}, setcmdD,
+                                setsectD, rv_eval.Namespace(), "", outO)
+        utfO._itable(["table", csvP.name, "30,L", "[:]"])
+        outO.close()
+        peakI = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    assert outP.read_text().rstrip().split("\n")[-2].startswith(
+        "w" + str(rowsI - 1) + " ")
+    return peakI
+
+
+def test_stream_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(rv_table, "SIDEBYTES", 0)  # sidecar for any size
+    rv_table._tableD.clear()
+    peak1I = _itable_peak(tmp_path, 5000)
+    peak2I = _itable_peak(tmp_path, 20000)
+    rv_table._tableD.clear()
+    assert peak2I < 1.5 * peak1I + 2 ** 20  # not linear in the row count
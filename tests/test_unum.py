@@ -0,0 +1,106 @@
+#! python
+"""unum unit signatures and unit caches
+
+Unum units are interned UnitSignatures; products, simplified units,
+conversion factors and match_units choices are cached per unit and
+cleared when the unit table changes. Cached results must equal the
+uncached ones and stale entries must not survive a table change.
+
+    python -m pytest tests
+"""
+
+import pytest
+from rivtcalc.rv_unit import M, FT, IN, LBF, KIPS, KSI, N, SEC
+from unum.core import (UNIT_TABLE, Unum, UnitDefinition, UnitSignature,
+                       conversion_factor, new_unit)
+from unum import core
+from unum.exceptions import IncompatibleUnitsError
+
+
+@pytest.fixture
+def table():
+    """restore the unit table after a test changes it"""
+    savedD = dict(UNIT_TABLE)
+    yield UNIT_TABLE
+    UNIT_TABLE.reset(savedD)
+
+
+def test_signature_interned():
+    assert (FT * LBF)._unit is (LBF * FT)._unit
+    assert (FT / SEC / SEC)._unit is (FT * SEC ** -2)._unit
+    assert (FT / FT)._unit is core.NO_UNIT
+    assert UnitSignature.of({"ft": 1, "s": 0}) is FT._unit
+    assert (FT._unit, LBF._unit) in UnitSignature._mul_cache
+
+
+def test_cast_unit():
+    assert (2 * FT).cast_unit(IN)._value == pytest.approx(24.0)
+    assert (3 * KIPS).cast_unit(LBF)._value == pytest.approx(3000.0)
+    zeroO = (0 * KIPS).cast_unit(FT)
+    assert zeroO._value == 0 and zeroO._unit is FT._unit
+    with pytest.raises(IncompatibleUnitsError):
+        (2 * KIPS).cast_unit(FT)
+
+
+def test_conversion_cache():
+    core._CONVERSION_CACHE.clear()
+    assert conversion_factor(FT._unit, IN._unit) == pytest.approx(12.0)
+    assert core._CONVERSION_CACHE[(FT._unit, IN._unit)] == pytest.approx(12.0)
+    assert conversion_factor({"ft": 1}, {"in": 1}) == pytest.approx(12.0)
+    with pytest.raises(IncompatibleUnitsError):
+        conversion_factor(KIPS._unit, FT._unit)
+    assert core._CONVERSION_CACHE[(KIPS._unit, FT._unit)] is None
+    with pytest.raises(IncompatibleUnitsError):
+        conversion_factor(KIPS._unit, FT._unit)
+
+
+def test_match_cache():
+    core._MATCH_CACHE.clear()
+    for i in range(2):
+        sumO = 2 * FT + 6 * IN
+        assert sumO._unit is FT._unit
+        assert sumO._value == pytest.approx(2.5)
+        sumO = 6 * IN + 2 * FT
+        assert sumO._unit is IN._unit
+        assert sumO._value == pytest.approx(30.0)
+    assert (FT._unit, IN._unit) in core._MATCH_CACHE
+    assert (0 * KIPS + 2 * LBF)._value == pytest.approx(2.0)
+    with pytest.raises(IncompatibleUnitsError):
+        KIPS + FT
+
+
+def test_simplify_cache():
+    core._SIMPLIFY_CACHE.clear()
+    for i in range(2):
+        stressO = (KSI * IN * IN).simplify_unit()
+        assert stressO._unit is KIPS._unit
+        assert stressO._value == pytest.approx(1.0)
+    assert ((KSI * IN * IN)._unit, False) in core._SIMPLIFY_CACHE
+    forceO = (2 * KIPS / LBF).simplify_unit()
+    assert forceO._unit is core.NO_UNIT
+    assert forceO._value == pytest.approx(2000.0)
+
+
+def test_new_unit_clears(table):
+    conversion_factor(FT._unit, IN._unit)
+    (2 * FT + 6 * IN).simplify_unit()
+    assert core._CONVERSION_CACHE and core._MATCH_CACHE
+    assert core._SIMPLIFY_CACHE
+    testO = new_unit("tst_u", 2 * M, "test unit")
+    assert not (core._CONVERSION_CACHE or core._MATCH_CACHE
+                or core._SIMPLIFY_CACHE)
+    assert (3 * testO).cast_unit(M)._value == pytest.approx(6.0)
+    sumO = M + testO  # the higher level unit is preferred
+    assert sumO._unit is testO._unit and sumO._value == pytest.approx(1.5)
+
+
+def test_reset_invalidates(table):
+    testO = new_unit("tst_r", 2 * M, "test unit")
+    assert conversion_factor(testO._unit, M._unit) == pytest.approx(2.0)
+    assert (testO * N / M).simplify_unit()._unit is N._unit
+    changedD = dict(table)
+    changedD["tst_r"] = UnitDefinition(
+        Unum.uniform(3 * M), table["tst_r"].level, "test unit")
+    table.reset(changedD)
+    assert conversion_factor(testO._unit, M._unit) == pytest.approx(3.0)
+    assert (testO * N / M).simplify_unit()._value == pytest.approx(3.0)